@@ -59,6 +59,45 @@ curl -sL "$BASE_URL/scripts/scenario_runner.py" -o "$SCRIPTS_DIR/scenario_runner
 echo "  >> generate_report.py 다운로드..."
 curl -sL "$BASE_URL/scripts/generate_report.py" -o "$SCRIPTS_DIR/generate_report.py"
 
+echo "  >> async_runner.py 다운로드..."
+curl -sL "$BASE_URL/scripts/async_runner.py" -o "$SCRIPTS_DIR/async_runner.py"
+
+echo "  >> browser_daemon.py 다운로드..."
+curl -sL "$BASE_URL/scripts/browser_daemon.py" -o "$SCRIPTS_DIR/browser_daemon.py"
+
+echo "  >> event_log.py 다운로드..."
+curl -sL "$BASE_URL/scripts/event_log.py" -o "$SCRIPTS_DIR/event_log.py"
+
+echo "  >> result_store.py 다운로드..."
+curl -sL "$BASE_URL/scripts/result_store.py" -o "$SCRIPTS_DIR/result_store.py"
+
+echo "  >> network_profile.py 다운로드..."
+curl -sL "$BASE_URL/scripts/network_profile.py" -o "$SCRIPTS_DIR/network_profile.py"
+
+echo "  >> prefix_tree.py 다운로드..."
+curl -sL "$BASE_URL/scripts/prefix_tree.py" -o "$SCRIPTS_DIR/prefix_tree.py"
+
+echo "  >> account_pool.py 다운로드..."
+curl -sL "$BASE_URL/scripts/account_pool.py" -o "$SCRIPTS_DIR/account_pool.py"
+
+echo "  >> auth_preflight.py 다운로드..."
+curl -sL "$BASE_URL/scripts/auth_preflight.py" -o "$SCRIPTS_DIR/auth_preflight.py"
+
+echo "  >> shard_node.py 다운로드..."
+curl -sL "$BASE_URL/scripts/shard_node.py" -o "$SCRIPTS_DIR/shard_node.py"
+
+echo "  >> process_pool.py 다운로드..."
+curl -sL "$BASE_URL/scripts/process_pool.py" -o "$SCRIPTS_DIR/process_pool.py"
+
+echo "  >> scheduler.py 다운로드..."
+curl -sL "$BASE_URL/scripts/scheduler.py" -o "$SCRIPTS_DIR/scheduler.py"
+
+echo "  >> dry_run.py 다운로드..."
+curl -sL "$BASE_URL/scripts/dry_run.py" -o "$SCRIPTS_DIR/dry_run.py"
+
+echo "  >> report_manifest.py 다운로드..."
+curl -sL "$BASE_URL/scripts/report_manifest.py" -o "$SCRIPTS_DIR/report_manifest.py"
+
 echo "  OK: 파일 설치 완료"
 
 # ── 4. 설치 확인 ──
@@ -88,6 +127,97 @@ else
     ALL_OK=false
 fi
 
+if [ -f "$SCRIPTS_DIR/async_runner.py" ]; then
+    echo "  OK: async_runner.py"
+else
+    echo "  !! async_runner.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/browser_daemon.py" ]; then
+    echo "  OK: browser_daemon.py"
+else
+    echo "  !! browser_daemon.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/event_log.py" ]; then
+    echo "  OK: event_log.py"
+else
+    echo "  !! event_log.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/result_store.py" ]; then
+    echo "  OK: result_store.py"
+else
+    echo "  !! result_store.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/network_profile.py" ]; then
+    echo "  OK: network_profile.py"
+else
+    echo "  !! network_profile.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/prefix_tree.py" ]; then
+    echo "  OK: prefix_tree.py"
+else
+    echo "  !! prefix_tree.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/account_pool.py" ]; then
+    echo "  OK: account_pool.py"
+else
+    echo "  !! account_pool.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/auth_preflight.py" ]; then
+    echo "  OK: auth_preflight.py"
+else
+    echo "  !! auth_preflight.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/shard_node.py" ]; then
+    echo "  OK: shard_node.py"
+else
+    echo "  !! shard_node.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/process_pool.py" ]; then
+    echo "  OK: process_pool.py"
+else
+    echo "  !! process_pool.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/scheduler.py" ]; then
+    echo "  OK: scheduler.py"
+else
+    echo "  !! scheduler.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/dry_run.py" ]; then
+    echo "  OK: dry_run.py"
+else
+    echo "  !! dry_run.py 없음"
+    ALL_OK=false
+fi
+
+if [ -f "$SCRIPTS_DIR/report_manifest.py" ]; then
+    echo "  OK: report_manifest.py"
+else
+    echo "  !! report_manifest.py 없음"
+    ALL_OK=false
+fi
+
 echo ""
 if [ "$ALL_OK" = true ]; then
     echo "=========================================="
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+테스트 계정 풀 (--account-pool)
+- counsel 해피패스는 계정마다 진행 중인 상담이 하나뿐이라, 계정 1개로는 순차 실행할 수밖에 없음
+- 계정(인증 상태 파일 + 유저 변수)을 여러 개 등록하면 워커마다 계정 1개를 독점으로 임대해 병렬 실행
+  → 계정 N개 ≈ 처리량 N배, 같은 계정의 상담을 서로 취소하는 충돌 없음
+
+풀 파일 (JSON 배열, 또는 {"accounts": [...]}):
+  [
+    {"name": "qa-1", "authState": "/tmp/instech_auth_state_qa1.json",
+     "variables": {"userId": "...", "userName": "...", "userPhone": "...", "userBirthDate": "...", "userGender": "1"}},
+    ...
+  ]
+  - authState: 해당 계정으로 로그인해 저장한 Playwright storage state 파일
+  - variables: 계정 고유 유저 변수. 시나리오 defaults / --var 보다 우선 (계정과 다른 유저 정보로 신청하지 않도록)
+"""
+
+import json
+import os
+
+# 계정마다 달라야 하는 유저 변수 — 빠진 계정은 경고만 (시나리오가 쓰지 않으면 문제없음)
+ACCOUNT_VARIABLES = ("userId", "userName", "userPhone", "userBirthDate", "userGender")
+
+
+def load_account_pool(path):
+    """풀 파일 → [{"name", "authState", "variables"}]. 형식 오류 / 인증 파일 없음 / 이름 중복이면 ValueError"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"계정 풀 파일을 읽을 수 없습니다: {path} ({e})")
+
+    entries = data.get("accounts") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"계정 풀이 비어 있습니다: {path}")
+
+    accounts = []
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get("authState"):
+            raise ValueError(f"계정 #{i}: authState 가 없습니다")
+        auth_state = os.path.expanduser(entry["authState"])
+        if not os.path.exists(auth_state):
+            raise ValueError(f"계정 #{i}: 인증 상태 파일 없음: {auth_state}")
+        variables = entry.get("variables") or {}
+        if not isinstance(variables, dict):
+            raise ValueError(f"계정 #{i}: variables 는 객체여야 합니다")
+        accounts.append({
+            "name": entry.get("name") or f"account-{i}",
+            "authState": auth_state,
+            "variables": {k: str(v) for k, v in variables.items()},
+        })
+
+    names = [account["name"] for account in accounts]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"계정 이름 중복: {', '.join(duplicated)}")
+    for account in accounts:
+        missing = [k for k in ACCOUNT_VARIABLES if k not in account["variables"]]
+        if missing:
+            print(f"  [WARN] 계정 {account['name']}: 유저 변수 없음 ({', '.join(missing)}) — 다른 계정과 같은 값이 쓰일 수 있음")
+    return accounts
@@ -0,0 +1,799 @@
+#!/usr/bin/env python3
+"""
+instech 시나리오 asyncio 러너
+- playwright.async_api 기반으로 execute_step / run_scenario 를 코루틴으로 실행
+- Chromium 프로세스 1개를 공유하고 시나리오마다 브라우저 컨텍스트만 생성
+- scenario_runner.run_all(engine="async") 에서 사용
+- 셀렉터 / URL / 결과 조립 / 스케줄 기록 등 순수 로직은 scenario_runner 와 공유 — 이 모듈에는 await 하는 호출만 둔다
+"""
+
+import asyncio
+import time
+from playwright.async_api import async_playwright
+
+from auth_preflight import AuthExpiredError, auth_storage_state, remember_auth_state
+from browser_daemon import daemon_endpoint
+from network_profile import apply_har_async, apply_network_profile_async, har_replaying, resolve_network_profile
+from prefix_tree import (
+    RESTORE_STORES_JS, SNAPSHOT_JS, STORES_READY_JS, PrefixNode, restore_session_script, shared_screenshot_prefix,
+)
+from scenario_runner import (
+    ACTION_SETTLE_MS, ASYNC_MAX_CONCURRENCY, COUNSEL_API_TIMEOUT_MS, COUNSEL_CANCEL_BUTTON, COUNSEL_CONFIRM_BUTTON,
+    COUNSEL_MODAL, COUNSEL_UI_MAX_CANCELS, EXPECT_TIMEOUT_MS, GA_REQUEST_TIMEOUT_MS, GA_ROUTE, PAGE_TIMEOUT_MS,
+    RESPONSE_FALLBACK_MS, SETTLE_JS, SETTLE_QUIET_MS, TERMS_DIALOG, WAIT_FOR_TIMEOUT_MS,
+    _auth_failure, _auth_state_target, _begin_shared_task, _begin_step, _cancel_ui_result, _cancellable_counsel_ids,
+    _clear_screenshots, _counsel_api_fallback, _counsel_api_result, _counsel_api_unavailable, _counsel_api_urls,
+    _counsel_cancel_unusable, _counsel_history_page, _counsel_history_unusable, _emit, _enabled_result,
+    _error_screenshot_target, _expect_url_result, _extend_shared, _fail, _field_selector, _fill_missing_results,
+    _finish_step, _fork_failure, _fork_jobs, _ga_attempt, _ga_click_failed, _ga_matched, _ga_options,
+    _ga_replay_missing, _ga_replay_result, _ga_request_timeout, _ga_result, _hidden_result, _hook_to_run,
+    _inject_store_js, _inject_user_info_js, _left_counsel_history, _log_ga_mismatch, _manual_result, _merge_replayed,
+    _missing_user_data, _navigate_result, _node_banner, _order_longest_first, _pass, _pre_cancel_api_done,
+    _pre_cancel_step, _preflight_failure, _prefix_root_jobs, _print_hook_result, _record_scheduled, _record_skipped,
+    _response_seen, _scenario_banner, _scenario_meta, _scenario_result, _selector_candidates, _session_storage_js,
+    _shared_failure_results, _shared_task_result, _step_context, _step_error_result, _step_screenshot_target,
+    _target_ga_id, _terms_result, _timed, _unknown_step_result, _url_matches, _url_predicate, _user_info_result,
+    _visible_result, _wait_mode, attach_page_listeners, compile_scenario, lease_task, scheduled_task,
+    worker_failure_result,
+)
+
+
+# ── 브라우저 ──
+
+async def launch_browser(p):
+    """scenario_runner.launch_browser 의 async 버전 — 데몬이 있으면 붙고, 없으면 새로 실행"""
+    endpoint = daemon_endpoint()
+    if endpoint:
+        try:
+            return await p.chromium.connect_over_cdp(endpoint)
+        except Exception as e:
+            print(f"  [WARN] 브라우저 데몬 연결 실패, 새로 실행: {e}")
+    return await p.chromium.launch(headless=True)
+
+
+# ── 대기 (이벤트 기반) ──
+
+async def _settle(page, context, cap_ms):
+    """scenario_runner._settle 의 async 버전"""
+    deadline = time.monotonic() + cap_ms / 1000
+    try:
+        await page.evaluate(SETTLE_JS, {"quietMs": SETTLE_QUIET_MS, "timeoutMs": cap_ms})
+    except Exception:
+        return
+    while context.get("inflight", 0) > 0 and time.monotonic() < deadline:
+        await page.wait_for_timeout(50)
+
+
+async def pause(page, context, fixed_ms):
+    """scenario_runner.pause 의 async 버전"""
+    with _timed(context, "wait"):
+        if _wait_mode(context) == "fixed":
+            await page.wait_for_timeout(fixed_ms)
+        else:
+            await _settle(page, context, fixed_ms)
+
+
+async def wait_for_state(page, context, locator, state, fixed_ms):
+    """scenario_runner.wait_for_state 의 async 버전"""
+    with _timed(context, "wait"):
+        if _wait_mode(context) == "fixed":
+            await page.wait_for_timeout(fixed_ms)
+            return
+        try:
+            await locator.wait_for(state=state, timeout=fixed_ms)
+        except Exception:
+            pass
+
+
+# ── 약관 동의 공통 처리 ──
+
+async def handle_terms(page, context=None):
+    """약관 동의 바텀시트 처리 - scenario_runner.handle_terms 의 async 버전"""
+    context = context if context is not None else {}
+    dialog = page.locator(TERMS_DIALOG)
+    await wait_for_state(page, context, dialog.first, "visible", 1000)
+    if await dialog.count() > 0 and await dialog.first.is_visible():
+        checkboxes = dialog.locator("input[type='checkbox']")
+        for i in range(await checkboxes.count()):
+            cb = checkboxes.nth(i)
+            if await cb.is_visible() and not await cb.is_checked():
+                await cb.click(force=True)
+                await pause(page, context, 300)
+
+        await pause(page, context, 500)
+        agree_btn = dialog.locator("button").last
+        if await agree_btn.is_visible() and await agree_btn.is_enabled():
+            await agree_btn.click()
+            await wait_for_state(page, context, dialog.first, "hidden", 1000)
+            return "약관 동의 완료"
+        return "동의 버튼 비활성"
+    return "약관 바텀시트 미노출 (이미 동의됨)"
+
+
+# ── Step 실행 ──
+# scenario_runner 의 step 핸들러와 1:1 대응하는 async 버전.
+# 셀렉터 / URL / 결과 조립은 scenario_runner 의 공통 순수 함수를 쓰고, 여기에는 await 하는 Playwright 호출만 둔다.
+
+async def _step_noop(page, step, context):
+    return _pass(step)
+
+
+async def _step_navigate(page, step, context):
+    with _timed(context, "network"):
+        await page.goto(step.get("url", ""))
+        await page.wait_for_load_state("networkidle")
+    return _navigate_result(step, page.url)
+
+
+async def _step_fill(page, step, context):
+    await page.locator(_field_selector(step)).first.fill(step.get("value", ""))
+    await pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+async def _step_blur(page, step, context):
+    await page.locator(_field_selector(step)).first.blur()
+    await pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+async def _step_clear(page, step, context):
+    await page.locator(_field_selector(step)).first.fill("")
+    await pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+async def _step_click(page, step, context):
+    await page.locator(step.get("selector", "")).first.click()
+    await pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+async def _step_screenshot(page, step, context):
+    path = _step_screenshot_target(context)
+    if path:
+        with _timed(context, "screenshot"):
+            await page.screenshot(path=path, full_page=True)
+    return _pass(step)
+
+
+async def _expect_url(page, step, context):
+    return _expect_url_result(step, page.url)
+
+
+async def _expect_visible(page, step, context):
+    for sel in _selector_candidates(step):
+        try:
+            await page.locator(sel).first.wait_for(state="visible", timeout=EXPECT_TIMEOUT_MS)
+            return _visible_result(step, True)
+        except Exception:
+            continue
+    return _visible_result(step, False)
+
+
+async def _is_shown(loc):
+    return await loc.count() > 0 and await loc.first.is_visible()
+
+
+async def _expect_hidden(page, step, context):
+    try:
+        loc = page.locator(step.get("selector", ""))
+        if not await _is_shown(loc):
+            return _pass(step)
+        await wait_for_state(page, context, loc.first, "hidden", 1000)
+        return _hidden_result(step, await _is_shown(loc))
+    except Exception:
+        return _pass(step)
+
+
+async def _expect_enabled_state(page, step, expect_enabled):
+    try:
+        loc = page.locator(step.get("selector", "")).first
+        await loc.wait_for(state="attached", timeout=EXPECT_TIMEOUT_MS)
+        enabled = await loc.is_enabled() if expect_enabled else not await loc.is_disabled()
+        return _enabled_result(step, expect_enabled, enabled)
+    except Exception as e:
+        return _fail(step, str(e))
+
+
+async def _expect_disabled(page, step, context):
+    return await _expect_enabled_state(page, step, False)
+
+
+async def _expect_enabled(page, step, context):
+    return await _expect_enabled_state(page, step, True)
+
+
+EXPECT_HANDLERS = {
+    "url": _expect_url,
+    "visible": _expect_visible,
+    "hidden": _expect_hidden,
+    "disabled": _expect_disabled,
+    "enabled": _expect_enabled,
+}
+
+
+async def _step_expect(page, step, context):
+    return await EXPECT_HANDLERS[step.get("type", "")](page, step, context)
+
+
+async def _step_wait_for_navigation(page, step, context):
+    with _timed(context, "network"):
+        await page.wait_for_load_state("networkidle")
+    return _pass(step)
+
+
+async def _step_wait_for(page, step, context):
+    with _timed(context, "wait"):
+        await page.locator(step.get("selector", "")).first.wait_for(state=step.get("state", "visible"),
+                                                                    timeout=WAIT_FOR_TIMEOUT_MS)
+    return _pass(step)
+
+
+async def _step_wait_for_response(page, step, context):
+    url_pattern = step.get("urlPattern", "")
+    if _wait_mode(context) == "fixed" or not url_pattern:
+        with _timed(context, "wait"):
+            await page.wait_for_timeout(RESPONSE_FALLBACK_MS)
+        return _pass(step)
+    if not _response_seen(context, url_pattern):
+        with _timed(context, "network"):
+            await page.wait_for_event("response", predicate=lambda r: _url_matches(r.url, url_pattern),
+                                      timeout=step.get("timeout", 10000))
+    return _pass(step)
+
+
+async def _step_wait_for_timeout(page, step, context):
+    timeout = step.get("timeout", 1000)
+    if step.get("fixed"):
+        with _timed(context, "wait"):
+            await page.wait_for_timeout(timeout)
+    else:
+        await pause(page, context, timeout)
+    return _pass(step)
+
+
+async def _step_wait_for_url(page, step, context):
+    with _timed(context, "network"):
+        await page.wait_for_url(_url_predicate(step), timeout=step.get("timeout", 30000))
+    return _pass(step)
+
+
+async def _step_handle_terms(page, step, context):
+    return _terms_result(step, await handle_terms(page, context))
+
+
+async def _step_inject_store_data(page, step, context):
+    await page.evaluate(_inject_store_js(step))
+    return _pass(step)
+
+
+async def _step_fetch_and_inject_user_info(page, step, context):
+    return _missing_user_data(step) or _user_info_result(step, await page.evaluate(_inject_user_info_js(step)))
+
+
+async def _step_set_session_storage(page, step, context):
+    script = _session_storage_js(step)
+    if page.url == "about:blank":
+        await context["browser_context"].add_init_script(script)
+        context.setdefault("init_scripts", []).append(script)
+    else:
+        await page.evaluate(script)
+    return _pass(step)
+
+
+async def _step_save_state(page, step, context):
+    path = _auth_state_target(context)
+    remember_auth_state(path, await context["browser_context"].storage_state(path=path))
+    return _pass(step)
+
+
+async def _step_retry_until_ga(page, step, context):
+    """scenario_runner._step_retry_until_ga 의 async 버전 — 라우트 1회 설치 + 핸들러 안에서 route.fetch() 재요청"""
+    max_retries, click_selector = _ga_options(step)
+    target_ga_id, error = _target_ga_id(step)
+    if error:
+        return error
+    if har_replaying(context["options"]):
+        return await _retry_until_ga_replay(page, step, context, target_ga_id, click_selector)
+
+    attempts = []
+    handled = asyncio.Event()
+
+    async def handle_route(route):
+        try:
+            while len(attempts) < max_retries:
+                started = time.perf_counter()
+                response = await route.fetch()
+                attempts.append(_ga_attempt((await response.json()).get("data", {}), started))
+                if _ga_matched(attempts, target_ga_id):
+                    await route.fulfill(response=response)
+                    return
+                _log_ga_mismatch(attempts, max_retries)
+            await route.abort()
+        except Exception as e:
+            attempts.append({"error": str(e)})
+            try:
+                await route.abort()
+            except Exception:
+                pass
+        finally:
+            handled.set()
+
+    clicks = 0
+    await page.route(GA_ROUTE, handle_route)
+    try:
+        while len(attempts) < max_retries:
+            handled.clear()
+            try:
+                await page.locator(click_selector).first.click()
+            except Exception as e:
+                return _ga_click_failed(step, e, attempts)
+            clicks += 1
+            try:
+                with _timed(context, "network"):
+                    await asyncio.wait_for(handled.wait(), GA_REQUEST_TIMEOUT_MS / 1000)
+            except asyncio.TimeoutError:
+                return _ga_request_timeout(step, attempts)
+            if _ga_matched(attempts, target_ga_id):
+                await pause(page, context, 1500)
+                break
+            await pause(page, context, 500)
+    finally:
+        await page.unroute(GA_ROUTE)
+    return _ga_result(step, target_ga_id, attempts, clicks, max_retries)
+
+
+async def _retry_until_ga_replay(page, step, context, target_ga_id, click_selector):
+    """scenario_runner._retry_until_ga_replay 의 async 버전"""
+    try:
+        async with page.expect_response(GA_ROUTE) as response_info:
+            await page.locator(click_selector).first.click()
+        response = await response_info.value
+        data = (await response.json()).get("data", {})
+    except Exception as e:
+        return _ga_replay_missing(step, e)
+    await pause(page, context, 1500)
+    return _ga_replay_result(step, target_ga_id, data)
+
+
+async def cancel_counsels_via_api(request, step, base_url=None):
+    """scenario_runner.cancel_counsels_via_api 의 async 버전. 반환: (실제 취소 건수, 사용 불가 사유)"""
+    history_url, cancel_url = _counsel_api_urls(step, base_url)
+    if history_url in _counsel_api_unavailable:
+        return 0, _counsel_api_unavailable[history_url]
+    cancelled = 0
+    try:
+        response = await request.get(history_url, timeout=COUNSEL_API_TIMEOUT_MS)
+        unusable = _counsel_history_unusable(response)
+        if unusable:
+            return _counsel_api_fallback(history_url, *unusable)
+        ids, unusable = _cancellable_counsel_ids(await response.json(), step)
+        if unusable:
+            return _counsel_api_fallback(history_url, *unusable)
+        for counsel_id in ids:
+            response = await request.post(cancel_url, data={"id": counsel_id}, timeout=COUNSEL_API_TIMEOUT_MS)
+            if not response.ok:
+                return _counsel_api_fallback(history_url, *_counsel_cancel_unusable(counsel_id, response, cancelled),
+                                             cancelled)
+            cancelled += 1
+        return cancelled, None
+    except Exception as e:
+        return _counsel_api_fallback(history_url, f"API 에러: {str(e).splitlines()[0]}", False, cancelled)
+
+
+async def _step_cancel_existing_counsel(page, step, context):
+    if _counsel_api_urls(step) and not har_replaying(context["options"]):
+        with _timed(context, "network"):
+            api_result = _counsel_api_result(
+                step, *await cancel_counsels_via_api(context["browser_context"].request, step))
+        if api_result:
+            return api_result
+    return await _cancel_counsels_ui(page, step, context)
+
+
+async def _cancel_counsels_ui(page, step, context):
+    with _timed(context, "network"):
+        await page.goto(_counsel_history_page(step))
+        await page.wait_for_load_state("networkidle")
+    await pause(page, context, 1000)
+
+    if _left_counsel_history(page.url):
+        return _cancel_ui_result(step, None)
+
+    cancelled = 0
+    for _ in range(COUNSEL_UI_MAX_CANCELS):
+        cancel_btn = page.locator(COUNSEL_CANCEL_BUTTON).first
+        try:
+            await cancel_btn.wait_for(state="visible", timeout=3000)
+        except Exception:
+            break
+
+        await cancel_btn.click()
+        await pause(page, context, 500)
+
+        modal = page.locator(COUNSEL_MODAL)
+        if await modal.count() > 0:
+            confirm_btn = modal.locator(COUNSEL_CONFIRM_BUTTON).first
+            try:
+                await confirm_btn.wait_for(state="visible", timeout=3000)
+                await confirm_btn.click()
+                await pause(page, context, 1500)
+                cancelled += 1
+            except Exception:
+                break
+
+        if _left_counsel_history(page.url):
+            break
+
+    return _cancel_ui_result(step, cancelled)
+
+
+async def _step_manual_action(page, step, context):
+    return _manual_result(step)
+
+
+STEP_HANDLERS = {
+    "loadState": _step_noop,
+    "launchBrowser": _step_noop,
+    "navigate": _step_navigate,
+    "fill": _step_fill,
+    "blur": _step_blur,
+    "clear": _step_clear,
+    "click": _step_click,
+    "screenshot": _step_screenshot,
+    "expect": _step_expect,
+    "waitForNavigation": _step_wait_for_navigation,
+    "waitFor": _step_wait_for,
+    "waitForResponse": _step_wait_for_response,
+    "waitForTimeout": _step_wait_for_timeout,
+    "waitForUrl": _step_wait_for_url,
+    "handleTermsAgreement": _step_handle_terms,
+    "injectStoreData": _step_inject_store_data,
+    "fetchAndInjectUserInfo": _step_fetch_and_inject_user_info,
+    "setSessionStorage": _step_set_session_storage,
+    "saveState": _step_save_state,
+    "retryUntilGa": _step_retry_until_ga,
+    "cancelExistingCounsel": _step_cancel_existing_counsel,
+    "manualAction": _step_manual_action,
+}
+
+
+async def execute_step(page, step, context):
+    """단일 step을 실행하고 결과를 반환 - scenario_runner.execute_step 의 async 버전"""
+    return _unknown_step_result(step, STEP_HANDLERS) or await STEP_HANDLERS[step["action"]](page, step, context)
+
+
+# ── 시나리오 실행 ──
+
+async def _new_scenario_context(browser, scenario, auth_state_path, options, storage_state=None):
+    """scenario_runner._new_scenario_context 의 async 버전"""
+    if storage_state is not None:
+        ctx = await browser.new_context(storage_state=storage_state)
+    elif scenario.get("requiresAuth", False):
+        ctx = await browser.new_context(storage_state=auth_storage_state(auth_state_path))
+    else:
+        ctx = await browser.new_context()
+    await apply_har_async(ctx, options, scenario.get("id", ""))
+    await apply_network_profile_async(ctx, resolve_network_profile(options, scenario))
+    return ctx
+
+
+async def _open_page(ctx, screenshot_prefix, auth_state_path, options):
+    page = await ctx.new_page()
+    page.set_default_timeout(PAGE_TIMEOUT_MS)
+    context = _step_context(ctx, screenshot_prefix, auth_state_path, options)
+    attach_page_listeners(page, context)
+    return page, context
+
+
+async def _run_steps(page, context, plan_steps, options, lines, scenario=None):
+    """scenario_runner._run_steps 의 async 버전 — 출력은 lines 에 모은다"""
+    results = []
+    for plan_step in plan_steps:
+        started = _begin_step(context, plan_step)
+        try:
+            result = await plan_step.handler(page, plan_step.step, context)
+        except Exception as e:
+            try:
+                with _timed(context, "screenshot"):
+                    await page.screenshot(path=_error_screenshot_target(context), full_page=True)
+            except Exception:
+                pass
+            result = _step_error_result(plan_step, e)
+        results.append(result)
+        if not _finish_step(context, plan_step, result, started, options, scenario, lines.append):
+            return results, "fail"
+    return results, "pass"
+
+
+async def run_scenario(browser, scenario, variables, auth_state_path, screenshot_prefix, round_label="", options=None,
+                       plan=None):
+    """단일 시나리오를 실행하고 결과 반환 - scenario_runner.run_scenario 의 async 버전.
+    출력은 시나리오 단위로 모아서 한 번에 찍는다 (동시 실행 시 줄이 섞이지 않도록).
+    """
+    _clear_screenshots(screenshot_prefix)
+    started = time.monotonic()
+    lines = _scenario_banner(scenario, round_label)
+
+    plan = plan or compile_scenario(scenario, variables, STEP_HANDLERS)
+    failure = _preflight_failure(scenario, plan, options, log=lines.append)
+    if failure:
+        print("\n".join(lines))
+        return failure
+
+    _emit(options, "scenario_start", **_scenario_meta(scenario))
+
+    try:
+        ctx = await _new_scenario_context(browser, scenario, auth_state_path, options)
+    except AuthExpiredError as e:
+        failure = _auth_failure(scenario, e, options, log=lines.append)
+        print("\n".join(lines))
+        return failure
+    page, context = await _open_page(ctx, screenshot_prefix, auth_state_path, options)
+    results, scenario_status = await _run_steps(page, context, plan.steps, options, lines, scenario)
+
+    await ctx.close()
+    print("\n".join(lines))
+    return _scenario_result(scenario, results, scenario_status, time.monotonic() - started, options)
+
+
+# ── 공통 prefix 공유 실행 (--share-prefix) ──
+
+async def _take_snapshot(page, ctx, context):
+    data = await page.evaluate(SNAPSHOT_JS)
+    return {"url": page.url, "storage": await ctx.storage_state(), "session": data["session"],
+            "stores": data["stores"], "init_scripts": list(context.get("init_scripts", []))}
+
+
+async def _fork_context(browser, scenario, auth_state_path, options, fork, lines):
+    """scenario_runner._fork_context 의 async 버전"""
+    snapshot = fork.snapshot
+    ctx = await _new_scenario_context(browser, scenario, auth_state_path, options, storage_state=snapshot["storage"])
+    for script in snapshot["init_scripts"]:
+        await ctx.add_init_script(script)
+    if snapshot["session"]:
+        await ctx.add_init_script(restore_session_script(snapshot["url"], snapshot["session"]))
+    page, context = await _open_page(ctx, None, auth_state_path, options)
+    context["init_scripts"] = list(snapshot["init_scripts"])
+
+    replayed, status = await _run_steps(page, context, fork.replay, options, lines)
+    if status == "fail":
+        return ctx, page, context, replayed, None
+    try:
+        with _timed(context, "network"):
+            await page.goto(snapshot["url"])
+            await page.wait_for_load_state("networkidle")
+        if snapshot["stores"]:
+            await page.wait_for_function(STORES_READY_JS, arg=list(snapshot["stores"]), timeout=5000)
+            await page.evaluate(RESTORE_STORES_JS, snapshot["stores"])
+            await _settle(page, context, ACTION_SETTLE_MS)
+    except Exception as e:
+        return ctx, page, context, replayed, str(e)
+    return ctx, page, context, replayed, None
+
+
+async def _run_prefix_job(browser, job, jobs, results, auth_state_path, options):
+    """scenario_runner._run_prefix_job 의 async 버전"""
+    item, fork = job
+    if isinstance(item, dict) and fork.snapshot is None:
+        results[item["index"]] = await run_scenario(browser, item["scenario"], item["variables"], auth_state_path,
+                                                    item["screenshot_prefix"], options=options, plan=item.get("plan"))
+        return
+
+    lead = item if isinstance(item, dict) else item.all_tasks()[0]
+    lines = []
+    line_started = time.monotonic()
+    shared, replay, seconds = list(fork.shared), list(fork.replay), fork.seconds
+    if fork.snapshot is None:
+        ctx = await _new_scenario_context(browser, lead["scenario"], auth_state_path, options)
+        page, context = await _open_page(ctx, None, auth_state_path, options)
+    else:
+        ctx, page, context, replayed, error = await _fork_context(browser, lead["scenario"], auth_state_path, options,
+                                                                  fork, lines)
+        shared = _merge_replayed(shared, fork.replay, replayed)
+        failed = _fork_failure(item, shared, seconds, replayed, error, options)
+        if failed:
+            results.update(failed)
+            print("\n".join(lines))
+            await ctx.close()
+            return
+    fork_seconds = time.monotonic() - line_started
+
+    try:
+        while isinstance(item, PrefixNode):
+            node = item
+            context["screenshot_path"] = shared_screenshot_prefix(node)
+            lines += _node_banner(node)
+            node_started = time.monotonic()
+            node_results, status = await _run_steps(page, context, node.steps, options, lines)
+            seconds += time.monotonic() - node_started
+            _extend_shared(node, node_results, context["screenshot_path"], shared, replay)
+            if status == "fail":
+                results.update(_shared_failure_results(node.all_tasks(), shared, seconds, options))
+                return
+
+            continuations = node.continuations()
+            if len(continuations) > 1:
+                snapshot = await _take_snapshot(page, ctx, context)
+                for fork_job in _fork_jobs(continuations, snapshot, shared, replay, seconds):
+                    jobs.put_nowait(fork_job)
+            item = continuations[0]
+
+        task = item
+        own_started = time.monotonic()
+        _begin_shared_task(task, shared, options, log=lines.append)
+        context["screenshot_path"] = task["screenshot_prefix"]
+        own_results, status = await _run_steps(page, context, task["plan"].steps[len(shared):], options, lines,
+                                               task["scenario"])
+        duration = seconds + fork_seconds + (time.monotonic() - own_started)
+        results[task["index"]] = _shared_task_result(task, shared, own_results, status, duration, options)
+    finally:
+        print("\n".join(lines))
+        await ctx.close()
+
+
+async def _run_prefix_forest(browser, tasks, auth_state_path, concurrency, options):
+    """scenario_runner._run_prefix_forest 의 async 버전 — 브라우저 1개 + 워커 코루틴 concurrency 개"""
+    jobs = asyncio.LifoQueue()
+    for job in _prefix_root_jobs(tasks, options):
+        jobs.put_nowait(job)
+
+    results = {}
+
+    async def worker():
+        while True:
+            job = await jobs.get()
+            try:
+                await _run_prefix_job(browser, job, jobs, results, auth_state_path, options)
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+            finally:
+                jobs.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(tasks))))]
+    await jobs.join()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    return [results[i] for i in range(len(tasks)) if i in results]
+
+
+async def _pre_cancel_counsel(p, browser, base_url, auth_state_path, options=None):
+    """scenario_runner._pre_cancel_counsel 의 async 버전 — API 경로가 지정되지 않았거나 쓸 수 없으면
+    같은 브라우저에서 컨텍스트 1개로 화면에서 취소"""
+    step = _pre_cancel_step(base_url)
+    if _counsel_api_urls(step):
+        try:
+            request = await p.request.new_context(storage_state=auth_storage_state(auth_state_path))
+            try:
+                api_result = await cancel_counsels_via_api(request, step)
+            finally:
+                await request.dispose()
+        except Exception as e:
+            api_result = 0, str(e)
+        if _pre_cancel_api_done(step, *api_result):
+            return
+
+    ctx = None
+    try:
+        ctx = await browser.new_context(storage_state=auth_storage_state(auth_state_path))
+        await apply_network_profile_async(ctx, resolve_network_profile(options))
+        page, context = await _open_page(ctx, None, auth_state_path, options)
+        context["step_num"] = 0
+        _print_hook_result(await execute_step(page, step, context))
+    except Exception as e:
+        print(f"  [FAIL] 상담 취소 실패: {e}")
+    finally:
+        if ctx is not None:
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+
+
+# ── 태스크 실행 ──
+
+async def _run_tasks(tasks, auth_state_path, concurrency, pre_cancel_base_url, options, share_prefix=False,
+                     accounts=None):
+    results = [None] * len(tasks)
+    semaphore = asyncio.Semaphore(max(1, len(accounts) if accounts else concurrency))
+    # 계정 풀: 슬롯 수 = 계정 수라서 세마포어를 통과하면 항상 빈 계정이 있음
+    free_accounts = asyncio.Queue()
+    for account in accounts or []:
+        free_accounts.put_nowait(account)
+
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
+        if pre_cancel_base_url:
+            await _pre_cancel_counsel(p, browser, pre_cancel_base_url, auth_state_path, options)
+        if share_prefix:
+            shared_results = await _run_prefix_forest(browser, tasks, auth_state_path, concurrency, options)
+            await browser.close()
+            return shared_results
+
+        async def run_one(i, task):
+            async with semaphore:
+                account = free_accounts.get_nowait() if accounts else None
+                try:
+                    if account:
+                        task = lease_task(task, account, STEP_HANDLERS)
+                    results[i] = await run_scenario(
+                        browser, task["scenario"], task["variables"],
+                        account["authState"] if account else auth_state_path, task["screenshot_prefix"],
+                        options=options, plan=task.get("plan")
+                    )
+                    if account:
+                        results[i]["account"] = account["name"]
+                except Exception as e:
+                    print(f"  워커 에러: {e}")
+                    results[i] = worker_failure_result(task, str(e), options)
+                finally:
+                    if account:
+                        free_accounts.put_nowait(account)
+
+        # 세마포어 대기열은 FIFO → 긴 시나리오부터 코루틴을 만들어 먼저 슬롯을 잡게 한다
+        order = {id(task): i for i, task in enumerate(tasks)}
+        await asyncio.gather(*(run_one(order[id(task)], task) for task in _order_longest_first(tasks)))
+        await browser.close()
+
+    return _fill_missing_results(tasks, results, "워커가 결과를 남기지 못했습니다", options)
+
+
+async def _run_scheduled(scheduler, count, base_url, auth_state_path, concurrency, options):
+    results = {}
+    wakeup = asyncio.Event()  # 작업이 끝나 잠금이 풀리면 대기 중인 슬롯을 깨움
+
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
+
+        async def run_job(job):
+            ok = False
+            try:
+                if job["kind"] == "hook":
+                    if _hook_to_run(job, options) == "cancel-counsels":
+                        await _pre_cancel_counsel(p, browser, base_url, auth_state_path, options)
+                    ok = True
+                elif job["skip"]:
+                    _record_skipped(job, results, options)
+                else:
+                    task, task_auth = scheduled_task(job, auth_state_path, STEP_HANDLERS)
+                    ok = _record_scheduled(job, await run_scenario(browser, task["scenario"], task["variables"],
+                                                                   task_auth, task["screenshot_prefix"],
+                                                                   options=options, plan=task.get("plan")), results)
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+            finally:
+                scheduler.done(job, ok)
+                wakeup.set()
+
+        async def slot():
+            while not scheduler.finished:
+                job = scheduler.next_ready()
+                if job is None:
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                await run_job(job)
+            wakeup.set()  # 마지막 작업이 끝나면 대기 중인 슬롯도 종료
+
+        await asyncio.gather(*(slot() for _ in range(max(1, min(concurrency, count)))))
+        await browser.close()
+
+    return [results[i] for i in range(count) if i in results]
+
+
+def run_scheduled(scheduler, count, base_url, auth_state_path, concurrency=ASYNC_MAX_CONCURRENCY, options=None):
+    """scenario_runner.run_scheduled 의 async 버전 — 컨텍스트 슬롯 concurrency 개가 스케줄러 작업을 나눠 실행"""
+    return asyncio.run(_run_scheduled(scheduler, count, base_url, auth_state_path, concurrency, options))
+
+
+def run_tasks(tasks, auth_state_path, concurrency=ASYNC_MAX_CONCURRENCY, pre_cancel_base_url=None, options=None,
+              share_prefix=False, accounts=None):
+    """태스크 리스트를 Chromium 1개 + 컨텍스트 최대 concurrency 개로 동시 실행하고 결과 리스트 반환.
+    concurrency=1 이면 순차 실행과 같다. pre_cancel_base_url 지정 시 실행 전에 기존 상담을 1회 취소.
+    share_prefix: 공통 prefix 를 공유해 실행 (scenario_runner._run_prefix_forest 참고)
+    accounts: 계정 풀 — 시나리오마다 빈 계정 1개를 임대해 그 인증 상태/유저 변수로 실행 (동시 실행 수 = 계정 수)
+    """
+    return asyncio.run(_run_tasks(tasks, auth_state_path, concurrency, pre_cancel_base_url, options, share_prefix,
+                                  accounts))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+인증 사전 점검 (preflight)
+- 세션이 만료된 인증 상태로 실행하면 시나리오마다 컨텍스트를 띄우고 navigate 후 /web-login 에서야 실패함
+  → 워커를 띄우기 전에 한 번만 확인하고, 만료면 재로그인 안내와 함께 바로 중단
+- 점검 1: storage state JSON 의 쿠키 만료 시각 (대상 호스트 쿠키가 모두 만료면 요청 없이 만료 판정)
+- 점검 2: 인증 상태로 만든 APIRequestContext 로 가벼운 요청 1회 (브라우저 없이) — /web-login 리다이렉트 / 401 / 403 이면 만료
+- 통과한 storage state 는 메모리에 캐시 → 모든 워커가 파일을 다시 읽지 않고 같은 dict 로 컨텍스트 생성
+"""
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+LOGIN_PATH = "/web-login"
+AUTH_PROBE_TIMEOUT_MS = 10000
+AUTH_EXPIRY_WARN_SEC = 600  # 쿠키 만료가 이 시간 안이면 실행 도중 만료될 수 있다고 경고
+
+_auth_states = {}  # 인증 상태 파일 경로 → storage state dict (워커 공유)
+_auth_states_lock = threading.Lock()
+
+
+class AuthExpiredError(Exception):
+    """인증 상태 없음 / 세션 만료 — 재로그인 필요"""
+
+    def __init__(self, auth_state_path, reason, base_url=None, account=None):
+        self.auth_state_path = auth_state_path
+        self.reason = reason
+        self.base_url = base_url
+        self.account = account
+        super().__init__(reason)
+
+    def relogin_message(self):
+        who = f" (계정 {self.account})" if self.account else ""
+        login_url = f"{self.base_url}{LOGIN_PATH}" if self.base_url else LOGIN_PATH
+        return "\n".join([
+            f"[ERROR] 인증이 필요합니다{who} — {self.reason}",
+            f"  인증 상태 파일: {self.auth_state_path}",
+            f"  → 재로그인하세요: headed 브라우저로 {login_url} 에서 카카오 로그인 후 위 파일에 인증 상태를 저장",
+            "    (scenarios/_setup/login.json 의 saveState) 한 뒤 다시 실행하세요.",
+        ])
+
+
+def read_auth_state(path):
+    """인증 상태 파일 → storage state dict. 없거나 깨졌으면 AuthExpiredError"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except OSError:
+        raise AuthExpiredError(path, "인증 상태 파일이 없습니다")
+    except ValueError as e:
+        raise AuthExpiredError(path, f"인증 상태 파일을 읽을 수 없습니다 ({e})")
+    if not isinstance(state, dict):
+        raise AuthExpiredError(path, "인증 상태 파일 형식이 올바르지 않습니다")
+    return state
+
+
+def auth_storage_state(path):
+    """컨텍스트 생성용 storage state — 캐시에 있으면 그대로, 없으면 파일을 한 번 읽어 캐시"""
+    with _auth_states_lock:
+        state = _auth_states.get(path)
+        if state is None:
+            state = _auth_states[path] = read_auth_state(path)
+        return state
+
+
+def remember_auth_state(path, state):
+    """saveState 등으로 인증 상태가 바뀌면 캐시도 갱신 (이후 컨텍스트는 새 상태로 생성)"""
+    with _auth_states_lock:
+        _auth_states[path] = state
+
+
+def _cookie_matches(cookie, host):
+    domain = (cookie.get("domain") or "").lstrip(".")
+    return bool(domain) and (host == domain or host.endswith("." + domain))
+
+
+def check_cookie_expiry(state, base_url, now=None):
+    """대상 호스트 쿠키의 만료 점검 → (만료 판정 사유 또는 None, 경고 리스트).
+    expires -1 은 세션 쿠키 (만료 시각 없음). localStorage 만 있는 경우는 요청 점검에 맡김.
+    """
+    now = time.time() if now is None else now
+    host = urlparse(base_url).hostname or ""
+    cookies = [c for c in state.get("cookies", []) if _cookie_matches(c, host)]
+    origins = [o for o in state.get("origins", []) if urlparse(o.get("origin", "")).hostname == host]
+    if not cookies:
+        return (None if origins else f"{host} 인증 쿠키가 없습니다"), []
+
+    expiring = [c for c in cookies if (c.get("expires") or -1) > 0]
+    expired = [c for c in expiring if c["expires"] <= now]
+    if expired and len(expired) == len(cookies):
+        latest = max(c["expires"] for c in expired)
+        return f"쿠키가 모두 만료되었습니다 ({time.strftime('%Y-%m-%d %H:%M', time.localtime(latest))})", []
+
+    warnings = []
+    if expired:
+        warnings.append(f"만료된 쿠키: {', '.join(sorted(c['name'] for c in expired))}")
+    alive = [c["expires"] for c in expiring if c["expires"] > now]
+    if alive and min(alive) - now < AUTH_EXPIRY_WARN_SEC:
+        warnings.append(f"쿠키가 {int((min(alive) - now) // 60)}분 안에 만료됩니다 — 실행 도중 세션이 끊길 수 있음")
+    return None, warnings
+
+
+def probe_session(request, probe_url):
+    """인증된 요청 1회 → (만료 판정 사유 또는 None, 요청 자체가 실패한 경우의 경고)"""
+    try:
+        response = request.get(probe_url, timeout=AUTH_PROBE_TIMEOUT_MS)
+    except Exception as e:
+        return None, f"인증 확인 요청 실패 ({probe_url}): {e} — 점검 없이 진행"
+    if LOGIN_PATH in response.url:
+        return f"{LOGIN_PATH} 로 리다이렉트됨 — {probe_url}", None
+    if response.status in (401, 403):
+        return f"HTTP {response.status} — {probe_url}", None
+    return None, None
+
+
+def preflight_auth(p, base_url, auth_state_path, probe_url=None, account=None):
+    """인증 상태 1개 점검 (쿠키 만료 → 인증 요청). 통과하면 캐시에 넣고 storage state 반환, 만료면 AuthExpiredError"""
+    try:
+        state = read_auth_state(auth_state_path)
+    except AuthExpiredError as e:
+        raise AuthExpiredError(auth_state_path, e.reason, base_url, account)
+    who = f" [{account}]" if account else ""
+
+    reason, warnings = check_cookie_expiry(state, base_url)
+    if reason:
+        raise AuthExpiredError(auth_state_path, reason, base_url, account)
+    request = p.request.new_context(storage_state=state)
+    try:
+        reason, warning = probe_session(request, probe_url or base_url)
+    finally:
+        request.dispose()
+    if reason:
+        raise AuthExpiredError(auth_state_path, f"세션 만료 ({reason})", base_url, account)
+    if warning:
+        warnings.append(warning)
+
+    for warning in warnings:
+        print(f"  [WARN] 인증{who}: {warning}")
+    print(f"  [OK] 인증 확인{who}: {os.path.basename(auth_state_path)}")
+    remember_auth_state(auth_state_path, state)
+    return state
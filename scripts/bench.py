@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+instech 시나리오 러너 벤치마크
+- 로컬 대역 앱(bench_app.py)을 띄우고 실제 scenarios/ 파일을 재생
+- 엔진 × 워커 수 조합별 처리량(시나리오/분), 시나리오 소요 시간 p50/p95, 최대 RSS 측정
+- 결과 이력(SQLite), 학습된 소요 시간, 이벤트 로그에는 기록하지 않음 (run_all 을 거치지 않음)
+
+사용법:
+  python3 bench.py [--feature counsel/] [--label happy-path] [--engines sync,async,process] [--workers 1,2,4]
+                   [--wait event|fixed] [--latency 50] [--jitter 20] [--page-latency 10]
+                   [--share-prefix] [--accounts N] [--terms-agreed] [--no-birthdate] [--no-capacity] [--output path]
+
+  --accounts N: 대역 앱 세션 N개를 계정 풀로 사용 (계정마다 bench_sid 쿠키가 다른 인증 상태 파일).
+                워커 수 W 조합에서는 계정 W개를 임대해 실행 → 계정 풀 크기별 해피패스 처리량 비교
+
+  대역 앱은 실제 서비스의 일부 화면/API 만 흉내내므로, 전제조건(precondition)이
+  대역 앱 상태와 맞지 않는 시나리오는 실패할 수 있음 → 통과 수를 함께 출력
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import bench_app
+from scenario_runner import ENGINES, LOCAL_SCENARIOS_DIR, _matches_labels, _run_tasks, compile_tasks, percentile
+
+BENCH_OUTPUT_PATH = "/tmp/instech_bench_results.json"
+BENCH_AUTH_STATE_PATH = "/tmp/instech_bench_auth_state.json"
+BENCH_SCREENSHOT_DIR = "/tmp/instech_bench"
+BENCH_ACCOUNT_DIR = "/tmp/instech_bench_accounts"
+RSS_SAMPLE_INTERVAL = 0.2  # 초
+
+# 대역 앱용 테스트 변수 (scenarios/ 의 {{변수}} 를 모두 채움)
+BENCH_VARIABLES = {
+    "userId": "bench-user",
+    "userName": "홍길동",
+    "userPhone": "01012345678",
+    "userBirthDate": "19900101",
+    "userGender": "1",
+    "testBirthDate": "19900615",
+    "newBirthDate": "19850320",
+    "targetGaCompanyId": "1",
+}
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _rss_bytes_proc():
+    """현재 프로세스 + 자식 프로세스(브라우저)의 RSS 합계. psutil 이 없으면 /proc 직접 읽기 (Linux)"""
+    if psutil:
+        try:
+            me = psutil.Process()
+            procs = [me] + me.children(recursive=True)
+            total = 0
+            for proc in procs:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    rss = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(pid)] = int(fields[1])
+            rss[int(pid)] = int(fields[21]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = {os.getpid()}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    return sum(rss.get(pid, 0) for pid in tree)
+
+
+class RssSampler:
+    """실행 중 프로세스 트리 RSS 를 주기적으로 샘플링해 최대값 기록"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _sample(self):
+        value = _rss_bytes_proc()
+        if value:
+            self.peak = max(self.peak, value)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+
+def load_local_scenarios(feature_path, labels=None):
+    """로컬 scenarios/ 에서 벤치마크 대상 시나리오 로드 (setup 제외). [(meta, scenario)]"""
+    with open(os.path.join(LOCAL_SCENARIOS_DIR, "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    selected = []
+    for meta in index["scenarios"]:
+        if meta["type"] not in ("test", "state-setup") or not meta["path"].startswith(feature_path):
+            continue
+        if labels and not _matches_labels(meta.get("labels", []), labels):
+            continue
+        with open(os.path.join(LOCAL_SCENARIOS_DIR, meta["path"]), encoding="utf-8") as f:
+            selected.append((meta, json.load(f)))
+    return selected
+
+
+def build_tasks(scenarios, base_url):
+    tasks = []
+    for meta, scenario in scenarios:
+        variables = {"baseUrl": base_url}
+        variables.update(scenario.get("defaults") or {})
+        variables.update(BENCH_VARIABLES)
+        tasks.append({
+            "scenario": scenario,
+            "variables": variables,
+            "screenshot_prefix": os.path.join(BENCH_SCREENSHOT_DIR, f"scenario_{scenario['id']}"),
+            "labels": meta.get("labels", []),
+        })
+    return tasks
+
+
+def make_bench_accounts(base_url, count):
+    """대역 앱용 계정 풀 — 계정마다 고정 bench_sid 쿠키(= 서버 세션)를 가진 인증 상태 파일 + 유저 변수"""
+    os.makedirs(BENCH_ACCOUNT_DIR, exist_ok=True)
+    host = urlparse(base_url).hostname
+    accounts = []
+    for i in range(1, count + 1):
+        path = os.path.join(BENCH_ACCOUNT_DIR, f"account_{i}.json")
+        cookie = {"name": "bench_sid", "value": f"bench-account-{i}", "domain": host, "path": "/", "expires": -1,
+                  "httpOnly": False, "secure": False, "sameSite": "Lax"}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"cookies": [cookie], "origins": []}, f)
+        accounts.append({"name": f"bench-{i}", "authState": path,
+                         "variables": {"userId": f"bench-user-{i}", "userPhone": f"010{i:08d}"}})
+    return accounts
+
+
+def run_case(scenarios, base_url, engine, workers, wait_mode, share_prefix=False, accounts=None):
+    """엔진/워커 수 1개 조합 실행 → 측정값 dict. accounts 가 있으면 그중 workers 개를 계정 풀로 사용"""
+    tasks, failures = compile_tasks(build_tasks(scenarios, base_url), engine)
+    options = {"wait": wait_mode, "share_prefix": share_prefix}
+    pool = accounts[:workers] if accounts else None
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        results = _run_tasks(tasks, BENCH_AUTH_STATE_PATH, workers, engine, options=options, accounts=pool)
+        wall = time.perf_counter() - started
+    results = list(failures) + results
+    durations = [r.get("duration", 0) for r in results]
+    return {
+        "engine": engine,
+        "workers": workers,
+        "scenarios": len(results),
+        "passed": sum(1 for r in results if r.get("status") == "pass"),
+        "wall_sec": round(wall, 2),
+        "per_minute": round(len(results) / wall * 60, 1) if wall else 0.0,
+        "p50_sec": round(percentile(durations, 50), 2),
+        "p95_sec": round(percentile(durations, 95), 2),
+        "peak_rss_mb": round(sampler.peak / 1024 / 1024, 1) if sampler.peak else None,
+    }
+
+
+def print_table(rows):
+    print(f"\n{'엔진':<6} {'워커':>4} {'통과':>7} {'소요(s)':>8} {'시나리오/분':>10} {'p50(s)':>7} {'p95(s)':>7} {'RSS(MB)':>8}")
+    for row in rows:
+        rss = f"{row['peak_rss_mb']:.1f}" if row["peak_rss_mb"] else "-"
+        passed = f"{row['passed']}/{row['scenarios']}"
+        print(f"{row['engine']:<6} {row['workers']:>4} {passed:>7} {row['wall_sec']:>8.2f} "
+              f"{row['per_minute']:>10.1f} {row['p50_sec']:>7.2f} {row['p95_sec']:>7.2f} {rss:>8}")
+
+
+if __name__ == "__main__":
+    feature_path = ""
+    labels = []
+    engines = ["sync", "async"]
+    worker_counts = [1, 2, 4]
+    wait_mode = "event"
+    share_prefix = False
+    account_count = 0
+    output_path = BENCH_OUTPUT_PATH
+    app_options = {}
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg == "--feature" and value:
+            feature_path = value
+        elif arg == "--label" and value:
+            labels.append(value)
+        elif arg == "--engines" and value:
+            engines = [e.strip() for e in value.split(",") if e.strip()]
+        elif arg == "--workers" and value:
+            worker_counts = [int(w) for w in value.split(",") if w.strip()]
+        elif arg == "--wait" and value in ("event", "fixed"):
+            wait_mode = value
+        elif arg == "--latency" and value:
+            app_options["latency_ms"] = int(value)
+        elif arg == "--jitter" and value:
+            app_options["jitter_ms"] = int(value)
+        elif arg == "--page-latency" and value:
+            app_options["page_latency_ms"] = int(value)
+        elif arg == "--accounts" and value:
+            account_count = int(value)
+        elif arg == "--output" and value:
+            output_path = value
+        elif arg == "--share-prefix":
+            share_prefix = True
+            i += 1
+            continue
+        elif arg == "--terms-agreed":
+            app_options["terms_agreed"] = True
+            i += 1
+            continue
+        elif arg == "--no-birthdate":
+            app_options["birthdate_saved"] = False
+            i += 1
+            continue
+        elif arg == "--no-capacity":
+            app_options["over51_capacity"] = False
+            i += 1
+            continue
+        else:
+            print(__doc__)
+            sys.exit(1)
+        i += 2
+
+    if any(e not in ENGINES for e in engines):
+        print(f"[ERROR] --engines 는 {', '.join(ENGINES)} 중에서 선택하세요.")
+        sys.exit(1)
+
+    scenarios = load_local_scenarios(feature_path, labels or None)
+    if not scenarios:
+        print("벤치마크할 시나리오가 없습니다.")
+        sys.exit(1)
+
+    os.makedirs(BENCH_SCREENSHOT_DIR, exist_ok=True)
+    with open(BENCH_AUTH_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"cookies": [], "origins": []}, f)
+
+    server, base_url = bench_app.start_in_thread(**app_options)
+    accounts = make_bench_accounts(base_url, account_count) if account_count else None
+    if accounts and max(worker_counts) > len(accounts):
+        print(f"  [INFO] 계정 {len(accounts)}개 — 워커 수가 더 큰 조합은 계정 {len(accounts)}개로 실행")
+    print(f"[OK] 대역 앱: {base_url}  (시나리오 {len(scenarios)}개, 대기 모드 {wait_mode}"
+          f"{', 공유 prefix' if share_prefix else ''})")
+    if psutil is None:
+        print("  [INFO] psutil 미설치 — /proc 기반으로 RSS 측정")
+
+    rows = []
+    try:
+        for engine in engines:
+            for workers in worker_counts:
+                print(f"\n── {engine} / 워커 {workers} ──")
+                rows.append(run_case(scenarios, base_url, engine, workers, wait_mode, share_prefix, accounts))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_table(rows)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"app": dict(app_options, baseUrl=base_url), "wait": wait_mode, "sharePrefix": share_prefix,
+                   "accounts": account_count,
+                   "feature": feature_path, "labels": labels, "results": rows}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과: {output_path}")
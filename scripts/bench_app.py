@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 instech 대역(stand-in) 웹앱
+- 실제 서버 없이 scenarios/ 의 age-calculation / counsel 시나리오를 재생할 수 있을 만큼만 흉내낸 로컬 SPA
+- window.__COUNSEL_STORE__ (setState/getState/subscribe), 약관 동의 바텀시트, available-ga API 포함
+- API / 페이지 응답 지연을 설정할 수 있어 러너 성능을 네트워크 조건별로 측정 가능
+- 세션(쿠키)별 상태: 약관 동의, 저장된 생년월일, 상담 신청 내역. 브라우저 컨텍스트마다 새 세션
+- 상담 이력/취소 API(/api/counsel/history, /api/counsel/cancel)와 응답 형식은 가정한 것 — 실제 서비스 확인이 아님.
+  러너는 스텝의 historyApi / cancelApi (또는 COUNSEL_*_API) 를 지정했을 때만 이 API 를 씀
+
+사용법 (단독 실행 — 브라우저로 직접 확인):
+  python3 bench_app.py [port] [--latency 50] [--jitter 20] [--page-latency 10]
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8765
+GA_COMPANY_COUNT = 5
+
+APP_HTML = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>instech (bench)</title>
+<style>
+  body { font-family: -apple-system, 'Noto Sans KR', sans-serif; margin: 0; padding: 20px; max-width: 480px; }
+  button { display: block; width: 100%; padding: 12px; margin-top: 12px; font-size: 15px; }
+  input { padding: 8px; font-size: 15px; }
+  .option, .select, .item { border: 1px solid #ddd; border-radius: 8px; padding: 12px; margin: 8px 0; cursor: pointer; }
+  .error { color: #ef4444; font-size: 13px; min-height: 18px; margin: 2px 0 8px; }
+  .sheet { position: fixed; left: 0; right: 0; bottom: 0; background: white; padding: 20px;
+           border-top: 1px solid #ddd; box-shadow: 0 -4px 16px rgba(0,0,0,.1); }
+  .row { display: flex; gap: 8px; align-items: center; }
+  svg { width: 16px; height: 16px; cursor: pointer; }
+</style>
+</head>
+<body>
+<div id="app"></div>
+<script>
+const CONFIG = __CONFIG__;
+
+function createStore(initial) {
+  let state = initial;
+  const listeners = new Set();
+  return {
+    getState: () => state,
+    setState(partial) {
+      state = Object.assign({}, state, typeof partial === "function" ? partial(state) : partial);
+      listeners.forEach((listener) => listener(state));
+    },
+    subscribe(listener) { listeners.add(listener); return () => listeners.delete(listener); },
+  };
+}
+window.__COUNSEL_STORE__ = createStore({ userInfo: null, topics: [], type: null, region: null, time: null });
+const store = window.__COUNSEL_STORE__;
+
+async function api(path, options) {
+  const response = await fetch("/api" + path, Object.assign({ credentials: "same-origin" }, options));
+  if (!response.ok) throw new Error("HTTP " + response.status);
+  return (await response.json()).data;
+}
+const post = (path, body) => api(path, { method: "POST", headers: { "Content-Type": "application/json" },
+                                         body: JSON.stringify(body || {}) });
+
+function h(tag, attrs, ...children) {
+  const el = document.createElement(tag);
+  for (const [key, value] of Object.entries(attrs || {})) {
+    if (key.startsWith("on")) el.addEventListener(key.slice(2), value);
+    else if (value === true) el.setAttribute(key, "");
+    else if (value !== false && value != null) el.setAttribute(key, value);
+  }
+  for (const child of children.flat()) {
+    if (child != null) el.append(child.nodeType ? child : document.createTextNode(String(child)));
+  }
+  return el;
+}
+const pencil = (onclick) => {
+  const svg = document.createElementNS("http://www.w3.org/2000/svg", "svg");
+  svg.setAttribute("viewBox", "0 0 16 16");
+  svg.innerHTML = '<path d="M2 12l8-8 2 2-8 8H2z"/>';
+  svg.addEventListener("click", onclick);
+  return svg;
+};
+
+function go(path, replace) {
+  history[replace ? "replaceState" : "pushState"]({}, "", path);
+  render();
+}
+window.addEventListener("popstate", render);
+
+function mount(...children) {
+  document.querySelectorAll(".sheet").forEach((el) => el.remove());
+  const app = document.getElementById("app");
+  app.replaceChildren(...children);
+}
+
+function openSheet(attrs, ...children) {
+  const sheet = h("div", Object.assign({ class: "sheet", role: "dialog" }, attrs), ...children);
+  document.body.append(sheet);
+  return sheet;
+}
+
+// ── 약관 동의 바텀시트 ──
+function showTerms(onAgree) {
+  const agree = h("button", { disabled: true, onclick: async () => {
+    await post("/terms/agree");
+    sheet.remove();
+    onAgree();
+  } }, "동의하고 계속하기");
+  const boxes = ["[필수] 서비스 이용약관 동의", "[필수] 개인정보 수집·이용 동의"].map((label) =>
+    h("label", { class: "row" }, h("input", { type: "checkbox", onchange: () => {
+      agree.disabled = !boxes.every((box) => box.querySelector("input").checked);
+    } }), label));
+  const sheet = openSheet({ "aria-modal": "true" }, h("h3", {}, "약관에 동의해 주세요"), ...boxes,
+                          h("button", { onclick: () => sheet.remove() }, "닫기"), agree);
+}
+
+async function withTerms(next) {
+  const terms = await api("/terms");
+  if (terms.agreed) next(); else showTerms(next);
+}
+
+// ── 보험 나이 계산 ──
+function validBirth(value) {
+  if (!/^\\d{8}$/.test(value)) return false;
+  const [y, m, d] = [+value.slice(0, 4), +value.slice(4, 6), +value.slice(6)];
+  const date = new Date(y, m - 1, d);
+  return date.getFullYear() === y && date.getMonth() === m - 1 && date.getDate() === d && date <= new Date();
+}
+
+async function ageLanding() {
+  mount(h("p", {}, "불러오는 중..."));
+  const saved = await api("/user/birthdate");
+  go(saved.birthDate ? "/age-calculation/result" : "/age-calculation/input", true);
+}
+
+function ageInput() {
+  const input = h("input", { placeholder: "YYYYMMDD", inputmode: "numeric" });
+  const error = h("p", { class: "error" });
+  const check = () => { error.textContent = validBirth(input.value) ? "" : "올바른 생년월일을 입력해 주세요"; };
+  input.addEventListener("blur", check);
+  mount(h("h2", {}, "생년월일을 입력해 주세요"), input, error,
+        h("button", { onclick: async () => {
+          check();
+          if (error.textContent) return;
+          await api("/insurance/age?birthDate=" + input.value);
+          go("/age-calculation/result");
+        } }, "지금 확인하기"));
+}
+
+async function ageResult() {
+  const saved = await api("/user/birthdate");
+  const terms = await api("/terms");
+  const birthDate = saved.birthDate || "19900101";
+  const ageText = h("span", { "data-testid": "insurance-age" }, "??세");
+  const birthText = h("span", {}, "??");
+  const upText = h("span", {}, "??");
+  const load = async (value) => {
+    const age = await api("/insurance/age?birthDate=" + value);
+    ageText.textContent = age.insuranceAge + "세";
+    birthText.textContent = value.slice(0, 4) + "." + value.slice(4, 6) + "." + value.slice(6);
+    upText.textContent = age.ageUpDate + " (" + age.daysLeft + "일 남았어요)";
+  };
+  const edit = () => {
+    const input = h("input", { value: birthText.textContent.replaceAll(".", "") });
+    const sheet = openSheet({}, h("h3", {}, "생년월일 수정"), input,
+                            h("button", { onclick: async () => { sheet.remove(); await load(input.value); } },
+                              "입력 완료"));
+  };
+  mount(h("h2", {}, "내 보험 나이"), h("div", {}, ageText),
+        h("div", { class: "row" }, h("span", {}, "생년월일"), birthText, pencil(edit)),
+        h("div", { class: "row" }, h("span", {}, "보험 나이 오르는 날"), upText));
+  if (terms.agreed) await load(birthDate);
+  else showTerms(() => load(birthDate));
+}
+
+// ── 상담 신청 ──
+const TYPES = [
+  { id: "chat", label: "카카오톡", desc: "채팅으로 부담 없이 질문해요" },
+  { id: "phone", label: "전화", desc: "이동 없이 전화로 간단히 상담해요" },
+  { id: "inperson", label: "만나서 상담", desc: "보험 점검에 추천드려요" },
+];
+const REGIONS = { "서울": ["강남구", "서초구", "마포구"], "경기": ["성남시", "수원시"], "세종특별자치시": [] };
+
+function ageOf(birthDate) {
+  if (!birthDate) return 0;
+  const today = new Date();
+  let age = today.getFullYear() - +birthDate.slice(0, 4);
+  if (today.getMonth() + 1 < +birthDate.slice(4, 6)) age -= 1;
+  return age;
+}
+
+function counselTopics() {
+  const next = h("button", { disabled: true, onclick: async () => {
+    const topics = boxes.filter((box) => box.querySelector("input").checked).map((box) => box.textContent);
+    store.setState({ topics });
+    const userInfo = store.getState().userInfo || {};
+    if (ageOf(userInfo.birthDate) >= 51) {
+      const capacity = await api("/counsel/capacity");
+      if (!capacity.available) return showOver51Limit();
+      store.setState({ type: "inperson" });
+      return go("/counsel/schedule");
+    }
+    go("/counsel/types");
+  } }, "다음");
+  const boxes = ["보장 분석", "보험료 절약", "보험금 청구"].map((topic) =>
+    h("label", { class: "item row" }, h("input", { type: "checkbox", onchange: () => {
+      next.disabled = !boxes.some((box) => box.querySelector("input").checked);
+    } }), topic));
+  mount(h("h2", {}, "어떤 상담이 필요하세요?"), ...boxes, next);
+}
+
+function showOver51Limit() {
+  const sheet = openSheet({ "aria-modal": "true" }, h("h3", {}, "상담이 어려워요"), h("p", {}, "다음 달에 신청해 주세요"),
+                          h("button", {}, "신청 가능할 때 알림 받기"),
+                          h("button", { onclick: () => sheet.remove() }, "닫기"));
+}
+
+function counselTypes() {
+  if (!store.getState().topics.length) return go("/counsel/topics", true);
+  const next = h("button", { disabled: true, onclick: () => {
+    const { type, userInfo } = store.getState();
+    if (type === "inperson") go("/counsel/schedule");
+    else if (!(userInfo && userInfo.gender)) go("/counsel/user-edit/" + type);
+    else requestGa();
+  } }, "다음");
+  const options = TYPES.map((type) => {
+    const desc = h("p", { hidden: true }, type.desc);
+    return h("div", { class: "option", onclick: () => {
+      store.setState({ type: type.id });
+      options.forEach((option) => { option.querySelector("p").hidden = true; });
+      desc.hidden = false;
+      next.disabled = false;
+    } }, h("strong", {}, type.label), desc);
+  });
+  mount(h("h2", {}, "어떻게 상담 받을까요?"), ...options, next);
+}
+
+function counselSchedule() {
+  const select = h("div", { class: "select" }, "편한 지역을 선택해주세요");
+  const list = h("div", {});
+  const times = h("div", { hidden: true });
+  const next = h("button", { hidden: true, disabled: true, onclick: () => {
+    const { userInfo } = store.getState();
+    if (!(userInfo && userInfo.gender)) go("/counsel/user-edit/inperson");
+    else requestGa();
+  } }, "다음");
+  const done = (region) => {
+    store.setState({ region });
+    select.textContent = region;
+    list.replaceChildren();
+    times.hidden = false;
+    next.hidden = false;
+  };
+  select.addEventListener("click", () => {
+    list.replaceChildren(...Object.keys(REGIONS).map((city) => h("div", { class: "item", onclick: () => {
+      if (!REGIONS[city].length) return done(city);
+      list.replaceChildren(...REGIONS[city].map((district) =>
+        h("div", { class: "item", onclick: () => done(city + " " + district) }, district)));
+    } }, city)));
+  });
+  times.append(...["오전", "오후", "시간 상관없음"].map((label) => h("button", { onclick: () => {
+    store.setState({ time: label });
+    next.disabled = false;
+  } }, label)));
+  mount(h("h2", {}, "만나기 편한 지역이 어디인가요?"), select, list, times, next);
+}
+
+function validName(value) { return /^([가-힣]{2,}|[A-Za-z][A-Za-z ]+)$/.test(value); }
+function validPhone(value) { return /^01\\d{8,9}$/.test(value); }
+function fullBirth(birth, code) {
+  if (!/^\\d{6}$/.test(birth)) return null;
+  const century = code === "3" || code === "4" ? "20" : "19";
+  return century + birth;
+}
+
+function counselUserEdit(type) {
+  if (!TYPES.some((t) => t.id === type)) return go("/counsel/types", true);
+  store.setState({ type });
+  const user = store.getState().userInfo || {};
+  const fields = {
+    name: h("input", { placeholder: "이름", value: user.name || "" }),
+    phone: h("input", { placeholder: "휴대폰 번호", value: user.phoneNumber || "" }),
+    birth: h("input", { placeholder: "생년월일", maxlength: 6, value: (user.birthDate || "").slice(2) }),
+    gender: h("input", { "aria-label": "주민등록번호 뒷자리 첫 번째 숫자", maxlength: 1, value: user.gender || "" }),
+  };
+  const initial = JSON.stringify(Object.values(fields).map((f) => f.value));
+  const errors = { name: h("p", { class: "error" }), phone: h("p", { class: "error" }), birth: h("p", { class: "error" }) };
+  const next = h("button", { disabled: true, onclick: () => {
+    store.setState({ userInfo: Object.assign({}, user, { name: fields.name.value, phoneNumber: fields.phone.value,
+      birthDate: fullBirth(fields.birth.value, fields.gender.value), gender: fields.gender.value }) });
+    withTerms(submitCounsel);
+  } }, "다음");
+  const validate = () => {
+    const { name, phone, birth, gender } = fields;
+    errors.name.textContent = validName(name.value) ? "" : "올바른 이름을 입력해 주세요";
+    errors.phone.textContent = validPhone(phone.value) ? "" : "올바른 휴대폰 번호를 입력해 주세요";
+    const full = fullBirth(birth.value, gender.value);
+    if (birth.value && !(full && validBirth(full.slice(0, 2) === "20" ? "19" + birth.value : full))) {
+      errors.birth.textContent = "올바른 생년월일을 입력해 주세요";
+    } else if (gender.value && (!/^[1-4]$/.test(gender.value) || !validBirth(full))) {
+      errors.birth.textContent = "올바른 주민등록번호 뒷자리를 입력해 주세요";
+    } else {
+      errors.birth.textContent = "";
+    }
+    const complete = Object.values(fields).every((f) => f.value);
+    const changed = JSON.stringify(Object.values(fields).map((f) => f.value)) !== initial;
+    next.disabled = !(complete && changed && Object.values(errors).every((e) => !e.textContent));
+  };
+  Object.values(fields).forEach((field) => field.addEventListener("blur", validate));
+  mount(h("h2", {}, "정보를 확인해 주세요"), fields.name, errors.name, fields.phone, errors.phone,
+        h("div", { class: "row" }, fields.birth, "-", fields.gender, "●●●●●●"), errors.birth, next);
+}
+
+async function requestGa() {
+  let ga;
+  try {
+    ga = await api("/counsel/available-ga");
+  } catch (e) {
+    return;  // 실패 시 현재 화면 유지 (다시 '다음'을 눌러 재시도)
+  }
+  const user = store.getState().userInfo || {};
+  const sheet = openSheet({}, h("h3", {}, "정보 확인"),
+                          h("p", {}, (user.name || "") + " / " + (user.phoneNumber || "") + " / " + ga.gaCompanyName),
+                          h("button", { onclick: () => { sheet.remove(); withTerms(submitCounsel); } }, "확인했어요"));
+}
+
+async function submitCounsel() {
+  const { type, topics, region, time } = store.getState();
+  await post("/counsel", { type, topics, region, time });
+  go("/counsel/complete");
+}
+
+function counselComplete() {
+  mount(h("h2", {}, "상담 신청 완료"), h("p", {}, "담당 설계사가 곧 연락드릴게요."));
+}
+
+async function counselHistory() {
+  const items = (await api("/counsel/history")).filter((item) => item.status === "REQUESTED");
+  if (!items.length) return history.back();
+  mount(h("h2", {}, "상담 신청 내역"), ...items.map((item) => h("div", { class: "item" }, item.type,
+    h("button", { onclick: () => {
+      const sheet = openSheet({ "aria-modal": "true" }, h("h3", {}, "상담을 취소할까요?"),
+                              h("button", { onclick: async () => {
+                                await post("/counsel/cancel", { id: item.id });
+                                sheet.remove();
+                                counselHistory();
+                              } }, "상담 취소"));
+    } }, "상담 취소하기"))));
+}
+
+function render() {
+  const path = location.pathname;
+  if (path === "/age-calculation/landing") return ageLanding();
+  if (path === "/age-calculation/input") return ageInput();
+  if (path === "/age-calculation/result") return ageResult();
+  if (path === "/counsel/topics") return counselTopics();
+  if (path === "/counsel/types") return counselTypes();
+  if (path === "/counsel/schedule") return counselSchedule();
+  if (path.startsWith("/counsel/user-edit/")) return counselUserEdit(path.split("/").pop());
+  if (path === "/counsel/complete") return counselComplete();
+  if (path === "/car-insurance/history") return counselHistory();
+  mount(h("h2", {}, "instech (bench)"));
+}
+render();
+</script>
+</body>
+</html>
+"""
+
+
+def insurance_age(birth_date, today=None):
+    """보험 나이 = 만 나이, 마지막 생일로부터 6개월이 지났으면 +1. (보험 나이, 다음 상령일)"""
+    today = today or date.today()
+    birth = date(int(birth_date[:4]), int(birth_date[4:6]), int(birth_date[6:8]))
+    age = today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+    last_birthday = date(birth.year + age, birth.month, min(birth.day, 28))
+    half = last_birthday + timedelta(days=183)
+    if today >= half:
+        return age + 1, half + timedelta(days=365)
+    return age, half
+
+
+class BenchState:
+    """세션(쿠키) 단위 서버 상태 + 지연 설정"""
+
+    def __init__(self, latency_ms=50, jitter_ms=20, page_latency_ms=10, terms_agreed=False, birthdate_saved=True,
+                 over51_capacity=True):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_latency_ms = page_latency_ms
+        self.terms_agreed = terms_agreed
+        self.birthdate_saved = birthdate_saved
+        self.over51_capacity = over51_capacity
+        self.sessions = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def session(self, sid):
+        with self._lock:
+            self.requests += 1
+            if sid not in self.sessions:
+                self.sessions[sid] = {
+                    "termsAgreed": self.terms_agreed,
+                    "birthDate": "19900101" if self.birthdate_saved else None,
+                    # 완료된 상담 1건 — 이력 API 는 취소할 수 없는 상담도 함께 내려준다고 가정
+                    "counsels": [{"id": "done0000", "type": "phone", "status": "COMPLETED"}],
+                }
+            return self.sessions[sid]
+
+    def delay(self, base_ms):
+        if base_ms or self.jitter_ms:
+            time.sleep((base_ms + random.uniform(0, self.jitter_ms)) / 1000)
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    state = None  # make_server 에서 BenchState 주입
+
+    def log_message(self, format, *args):
+        pass  # 벤치마크 출력에 섞이지 않도록
+
+    def _sid(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            key, _, value = part.strip().partition("=")
+            if key == "bench_sid" and value:
+                return value, False
+        return uuid.uuid4().hex, True
+
+    def _send(self, status, body, content_type, sid, new_sid):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        if new_sid:
+            self.send_header("Set-Cookie", f"bench_sid={sid}; Path=/; SameSite=Lax")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _json(self, data, sid, new_sid, status=200):
+        self._send(status, json.dumps({"data": data}, ensure_ascii=False), "application/json; charset=utf-8",
+                   sid, new_sid)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        state = self.state
+        url = urlparse(self.path)
+        sid, new_sid = self._sid()
+        session = state.session(sid)
+
+        if not url.path.startswith("/api/"):
+            state.delay(state.page_latency_ms)
+            config = json.dumps({"latencyMs": state.latency_ms})
+            self._send(200, APP_HTML.replace("__CONFIG__", config), "text/html; charset=utf-8", sid, new_sid)
+            return
+
+        state.delay(state.latency_ms)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        route = (method, url.path[len("/api"):])
+        if route == ("GET", "/terms"):
+            self._json({"agreed": session["termsAgreed"]}, sid, new_sid)
+        elif route == ("POST", "/terms/agree"):
+            session["termsAgreed"] = True
+            self._json({"agreed": True}, sid, new_sid)
+        elif route == ("GET", "/user/birthdate"):
+            self._json({"birthDate": session["birthDate"]}, sid, new_sid)
+        elif route == ("GET", "/insurance/age"):
+            birth_date = query.get("birthDate", "")
+            try:
+                age, up_date = insurance_age(birth_date)
+            except (ValueError, IndexError):
+                self._json({"message": "invalid birthDate"}, sid, new_sid, status=400)
+                return
+            session["birthDate"] = birth_date
+            self._json({"insuranceAge": age, "ageUpDate": up_date.isoformat(),
+                        "daysLeft": (up_date - date.today()).days}, sid, new_sid)
+        elif route == ("GET", "/counsel/capacity"):
+            self._json({"available": state.over51_capacity}, sid, new_sid)
+        elif route == ("GET", "/counsel/available-ga"):
+            ga_id = random.randint(1, GA_COMPANY_COUNT)
+            self._json({"gaCompanyId": ga_id, "gaCompanyName": f"벤치 GA {ga_id}"}, sid, new_sid)
+        elif route == ("GET", "/counsel/history"):
+            self._json(session["counsels"], sid, new_sid)
+        elif route == ("POST", "/counsel"):
+            counsel = dict(body, id=uuid.uuid4().hex[:8], status="REQUESTED")
+            session["counsels"].append(counsel)
+            self._json(counsel, sid, new_sid)
+        elif route == ("POST", "/counsel/cancel"):
+            counsel = next((c for c in session["counsels"] if c["id"] == body.get("id")), None)
+            if not counsel or counsel["status"] != "REQUESTED":
+                self._json({"message": "not cancellable"}, sid, new_sid, status=409)
+                return
+            counsel["status"] = "CANCELLED"
+            self._json({"cancelled": counsel["id"]}, sid, new_sid)
+        else:
+            self._json({"message": "not found"}, sid, new_sid, status=404)
+
+
+def make_server(port=0, **state_options):
+    """대역 앱 서버 생성 (port=0 이면 빈 포트). 반환: (server, base_url) — serve_forever 는 호출자가 실행"""
+    handler = type("BoundBenchHandler", (BenchHandler,), {"state": BenchState(**state_options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def start_in_thread(port=0, **state_options):
+    """백그라운드 스레드에서 서버 실행. 반환: (server, base_url) — 종료는 server.shutdown()"""
+    server, base_url = make_server(port, **state_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+
+if __name__ == "__main__":
+    port = DEFAULT_PORT
+    options = {}
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        if arg in ("--latency", "--jitter", "--page-latency") and i + 1 < len(sys.argv):
+            key = {"--latency": "latency_ms", "--jitter": "jitter_ms", "--page-latency": "page_latency_ms"}[arg]
+            options[key] = int(sys.argv[i + 1])
+            i += 2
+        elif arg.isdigit():
+            port = int(arg)
+            i += 1
+        else:
+            print("Usage: bench_app.py [port] [--latency ms] [--jitter ms] [--page-latency ms]")
+            sys.exit(1)
+
+    server, base_url = make_server(port, **options)
+    print(f"[OK] 벤치마크 대역 앱: {base_url}/counsel/topics , {base_url}/age-calculation/landing")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
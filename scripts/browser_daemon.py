@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+instech 시나리오 러너용 상주 브라우저 데몬
+- headless Chromium 1개를 띄워두고 CDP 엔드포인트를 상태 파일에 기록
+- scenario_runner / async_runner 는 데몬이 살아 있으면 connect_over_cdp 로 붙어서 컨텍스트만 생성
+  (Chromium 콜드 스타트 생략 → 단일 시나리오 반복 실행 시 수 초 → 수십 ms)
+
+사용법:
+  python3 browser_daemon.py start [port]   # 포그라운드 실행 (백그라운드는 & 또는 nohup)
+  python3 browser_daemon.py status
+  python3 browser_daemon.py stop
+"""
+
+import json
+import os
+import signal
+import sys
+import time
+import urllib.request
+
+DAEMON_STATE_PATH = "/tmp/instech_browser_daemon.json"
+DEFAULT_PORT = 9333
+
+
+def _read_state():
+    try:
+        with open(DAEMON_STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _fetch_ws_endpoint(port, timeout=0.5):
+    """Chromium DevTools HTTP 엔드포인트에서 browser websocket URL 조회"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))["webSocketDebuggerUrl"]
+
+
+def daemon_endpoint():
+    """살아 있는 데몬의 CDP 엔드포인트를 반환. 데몬이 없거나 응답이 없으면 None."""
+    state = _read_state()
+    if not state or not _pid_alive(state.get("pid", -1)):
+        return None
+    try:
+        _fetch_ws_endpoint(state["port"])
+    except Exception:
+        return None
+    return state["endpoint"]
+
+
+# ── 데몬 프로세스 ──
+
+def start(port=DEFAULT_PORT):
+    if daemon_endpoint():
+        print(f"[INFO] 데몬이 이미 실행 중입니다: {_read_state()['endpoint']}")
+        return
+
+    from playwright.sync_api import sync_playwright
+
+    stopping = [False]
+
+    def handle_signal(signum, frame):
+        stopping[0] = True
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=[f"--remote-debugging-port={port}"])
+        # CDP 포트가 열릴 때까지 대기
+        endpoint = None
+        for _ in range(50):
+            try:
+                endpoint = _fetch_ws_endpoint(port)
+                break
+            except Exception:
+                time.sleep(0.1)
+        if not endpoint:
+            print(f"[ERROR] CDP 포트 {port} 응답 없음")
+            browser.close()
+            sys.exit(1)
+
+        with open(DAEMON_STATE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "port": port, "endpoint": f"http://127.0.0.1:{port}"}, f)
+        print(f"[OK] 브라우저 데몬 시작 (pid={os.getpid()}, port={port})")
+
+        try:
+            while not stopping[0] and browser.is_connected():
+                time.sleep(0.5)
+        finally:
+            try:
+                os.remove(DAEMON_STATE_PATH)
+            except OSError:
+                pass
+            if browser.is_connected():
+                browser.close()
+    print("[OK] 브라우저 데몬 종료")
+
+
+def stop():
+    state = _read_state()
+    if not state or not _pid_alive(state.get("pid", -1)):
+        print("실행 중인 데몬이 없습니다.")
+        return
+    os.kill(state["pid"], signal.SIGTERM)
+    print(f"[OK] 종료 요청 (pid={state['pid']})")
+
+
+def status():
+    endpoint = daemon_endpoint()
+    if endpoint:
+        print(f"실행 중: {endpoint} (pid={_read_state()['pid']})")
+    else:
+        print("실행 중인 데몬이 없습니다.")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "start":
+        start(int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT)
+    elif command == "stop":
+        stop()
+    elif command == "status":
+        status()
+    else:
+        print("Usage: browser_daemon.py start [port] | status | stop")
+        sys.exit(1)
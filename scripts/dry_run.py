@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+실행 계획 (dry run) — 브라우저 없이 run_all 이 고를 실행 순서와 예상 소요 시간을 출력
+- index.json / 시나리오 JSON 읽기, 라벨 필터, 변수 치환, 컴파일은 run_all 과 동일 (select_tasks)
+- 스텝별 정적 대기 예산 (waitForTimeout, ACTION_SETTLE_MS, retryUntilGa maxRetries, expect/wait 타임아웃) 과
+  result_store 에 쌓인 최근 통과 실행의 스텝 소요 시간을 합쳐 시나리오별 예상/최대 시간을 구하고,
+  run_all 과 같은 규칙 (locks 스케줄러 또는 해피패스 순차 / 엣지케이스 병렬) 으로 워커 배치를 시뮬레이션해 벽시계 시간 추정
+
+사용법 (generate_report.py plan):
+  python3 generate_report.py plan <base_url> <auth_state_path> <feature_folder[,...]> [--label l] [--var k=v]
+      [--engine sync|async|process] [--wait event|fixed] [--repeat N] [--account-pool path] [--only-failed] [--changed]
+
+추정값:
+  예상 — 이력이 있는 스텝은 최근 통과 실행 평균, 없으면 정상 경로 추정 (event 대기는 금방 안정된다고 가정)
+  최대 — 모든 대기가 상한/타임아웃까지 가는 경우
+"""
+
+import heapq
+
+from scenario_runner import (
+    ACTION_SETTLE_MS, COUNSEL_API_TIMEOUT_MS, COUNSEL_UI_MAX_CANCELS, DEFAULT_WAIT_MODE, GA_REQUEST_TIMEOUT_MS,
+    SETTLE_QUIET_MS, _counsel_api_urls, declares_locks, engine_max_workers, expected_durations, incremental_tasks,
+    is_counsel_feature, load_durations, repeat_tasks, select_tasks, split_counsel_tasks,
+)
+from network_profile import har_replaying
+from result_store import step_duration_history
+from scheduler import ResourceScheduler
+
+# 정적 비용 (초) — 러너 핸들러의 대기/타임아웃과 맞춤
+PAGE_TIMEOUT_SEC = 10.0  # _open_page 의 set_default_timeout (셀렉터/네비게이션 기본 타임아웃)
+STEP_OVERHEAD_SEC = 0.05  # 드라이버 왕복 (locator 조회 + 액션 1회)
+EVENT_SETTLE_SEC = SETTLE_QUIET_MS / 1000 + 0.05  # event 모드 대기가 실제로 끝나는 보통 시간 (상한과 별개)
+NAVIGATE_SEC = 1.5  # goto + networkidle
+NETWORK_WAIT_SEC = 0.5  # 응답/URL/요소 대기가 정상적으로 끝나는 시간
+SCREENSHOT_SEC = 0.3  # full_page 스크린샷
+GA_ATTEMPT_SEC = 0.3  # retryUntilGa 재요청 1회 (route.fetch)
+CANCEL_COUNSEL_SEC = 1.0  # 상담 취소 API 경로 (historyApi / cancelApi 를 지정했을 때)
+CANCEL_COUNSEL_UI_SEC = NAVIGATE_SEC + 1.0  # 상담 취소 화면 경로 (기본) — 이력 화면 이동 + 대기, 취소할 상담 없음
+CANCEL_COUNSEL_UI_EACH_SEC = 2.0  # 화면 경로 상담 1건 취소 (버튼 + 모달 확인 + 목록 갱신 대기)
+TERMS_CHECKBOXES = 2  # 약관 바텀시트 체크박스 수 (가정)
+SCENARIO_SETUP_SEC = 0.5  # 컨텍스트/페이지 생성 + 정리 (이력이 있으면 이력 값)
+BROWSER_LAUNCH_SEC = 1.0  # 실행 단계마다 워커 브라우저 기동 (워커끼리는 동시에)
+PLAN_TOP_N = 5  # 예상 시간 비중이 큰 action 출력 개수
+
+
+def _wait_cost(cap_sec, wait_mode):
+    """pause / wait_for_state — fixed 는 상한 그대로, event 는 보통 금방 안정 (최대는 상한)"""
+    return (cap_sec if wait_mode == "fixed" else min(cap_sec, EVENT_SETTLE_SEC)), cap_sec
+
+
+def _expect_cost(step, wait_mode):
+    kind = step.get("type", "")
+    if kind == "visible":
+        # 쉼표로 나뉜 셀렉터를 차례로 5초씩 기다림
+        return STEP_OVERHEAD_SEC, 5.0 * len(step.get("selector", "").split(","))
+    if kind == "hidden":
+        return STEP_OVERHEAD_SEC, STEP_OVERHEAD_SEC + 1.0
+    if kind in ("disabled", "enabled"):
+        return STEP_OVERHEAD_SEC, 5.0
+    return STEP_OVERHEAD_SEC, STEP_OVERHEAD_SEC
+
+
+def _terms_cost(wait_mode):
+    """handleTermsAgreement — 바텀시트 대기 1초, 체크박스마다 300ms, 동의 전 500ms, 닫힘 대기 1초"""
+    waits = [1.0] + [0.3] * TERMS_CHECKBOXES + [0.5, 1.0]
+    clicks = (TERMS_CHECKBOXES + 1) * STEP_OVERHEAD_SEC
+    return (clicks + sum(_wait_cost(w, wait_mode)[0] for w in waits),
+            clicks + sum(waits))
+
+
+def _retry_until_ga_cost(step, wait_mode):
+    """retryUntilGa — 클릭 1번에 핸들러 안에서 재요청. 예상은 절반 시도에서 매칭 + complete 이동 대기 1.5초,
+    최대는 클릭 대기 + available-ga 요청 대기 상한 + 실패 후 바텀시트 대기 500ms"""
+    max_retries = int(step.get("maxRetries", 20) or 20)
+    expected = STEP_OVERHEAD_SEC + max_retries / 2 * GA_ATTEMPT_SEC + _wait_cost(1.5, wait_mode)[0]
+    worst = PAGE_TIMEOUT_SEC + GA_REQUEST_TIMEOUT_MS / 1000 + 0.5
+    return expected, max(expected, worst)
+
+
+def _cancel_cost(step=None):
+    """상담 취소 (cancelExistingCounsel / 전처리 훅). API 를 지정했으면 API 경로 (최대는 목록 조회 + 취소 요청 타임아웃),
+    아니면 화면 경로 (최대는 COUNSEL_UI_MAX_CANCELS 건 취소 + 마지막 버튼 대기)
+    """
+    if _counsel_api_urls(step or {}):
+        return CANCEL_COUNSEL_SEC, COUNSEL_API_TIMEOUT_MS / 1000 * 2
+    return CANCEL_COUNSEL_UI_SEC, CANCEL_COUNSEL_UI_SEC + COUNSEL_UI_MAX_CANCELS * CANCEL_COUNSEL_UI_EACH_SEC + 3.0
+
+
+def step_cost(step, wait_mode=DEFAULT_WAIT_MODE):
+    """컴파일된 스텝 1개의 정적 비용 → (예상 초, 최대 초)"""
+    action = step.get("action", "")
+    if action in ("fill", "blur", "clear", "click"):
+        expected, cap = _wait_cost(ACTION_SETTLE_MS / 1000, wait_mode)
+        return STEP_OVERHEAD_SEC + expected, PAGE_TIMEOUT_SEC + cap
+    if action == "navigate":
+        return NAVIGATE_SEC, PAGE_TIMEOUT_SEC * 2  # goto + networkidle 각각 기본 타임아웃
+    if action == "waitForNavigation":
+        return NETWORK_WAIT_SEC, PAGE_TIMEOUT_SEC
+    if action == "screenshot":
+        return SCREENSHOT_SEC, SCREENSHOT_SEC
+    if action == "waitForTimeout":
+        timeout = step.get("timeout", 1000) / 1000
+        return (timeout, timeout) if step.get("fixed") else _wait_cost(timeout, wait_mode)
+    if action == "waitFor":
+        return NETWORK_WAIT_SEC, 10.0
+    if action == "waitForResponse":
+        if wait_mode == "fixed" or not step.get("urlPattern"):
+            return 3.0, 3.0  # 간이 고정 대기
+        return NETWORK_WAIT_SEC, step.get("timeout", 10000) / 1000
+    if action == "waitForUrl":
+        return NETWORK_WAIT_SEC, step.get("timeout", 30000) / 1000
+    if action == "expect":
+        return _expect_cost(step, wait_mode)
+    if action == "handleTermsAgreement":
+        return _terms_cost(wait_mode)
+    if action == "retryUntilGa":
+        return _retry_until_ga_cost(step, wait_mode)
+    if action == "cancelExistingCounsel":
+        return _cancel_cost(step)
+    if action in ("loadState", "launchBrowser"):
+        return 0.0, 0.0
+    return STEP_OVERHEAD_SEC, STEP_OVERHEAD_SEC
+
+
+def estimate_task(task, wait_mode=DEFAULT_WAIT_MODE, history=None, learned=None):
+    """태스크 1개의 예상 소요 시간.
+    이력(result_store.step_duration_history)이 있는 스텝은 평균값 (같은 번호·같은 action 일 때만), 없으면 정적 추정.
+    스텝 이력이 전혀 없고 학습된 시나리오 소요 시간(load_durations)만 있으면 그 값을 예상으로 사용.
+    반환 {"expected", "worst", "source": "이력" | "이력+정적" | "학습" | "정적", "actions": {action: 예상 초}}
+    """
+    scenario_id = task["scenario"].get("id", "")
+    past = (history or {}).get(scenario_id)
+    past_steps = past["steps"] if past else {}
+    expected = worst = 0.0
+    actions = {}
+    matched = 0
+    for plan_step in task["plan"].steps:
+        static_expected, static_worst = step_cost(plan_step.step, wait_mode)
+        known = past_steps.get(plan_step.num)
+        if known and known[0] == plan_step.action and known[1] is not None:
+            cost = known[1] / 1000
+            matched += 1
+        else:
+            cost = static_expected
+        expected += cost
+        worst += max(static_worst, cost)
+        actions[plan_step.action] = actions.get(plan_step.action, 0.0) + cost
+
+    setup = SCENARIO_SETUP_SEC
+    if matched and past["duration"] is not None:
+        # 시나리오 소요 시간 중 스텝 밖 (컨텍스트 생성/정리) 부분
+        setup = max(0.0, past["duration"] - sum(ms for _, ms in past_steps.values() if ms) / 1000)
+    expected += setup
+    worst += setup
+
+    if matched:
+        source = "이력" if matched == len(task["plan"].steps) else "이력+정적"
+    elif learned and learned.get(scenario_id):
+        source = "학습"
+        expected = learned[scenario_id]
+        worst = max(worst, expected)
+    else:
+        source = "정적"
+    return {"expected": expected, "worst": worst, "source": source, "actions": actions}
+
+
+# ── 실행 배치 시뮬레이션 ──
+
+def _simulate_queue(items, workers, key):
+    """공유 큐 + workers 개 워커 (_run_parallel / 순차 실행과 같은 방식). items 는 꺼낼 순서.
+    반환 (배치 [(시작, 슬롯, item)], 종료 시각)"""
+    slots = [(0.0, n) for n in range(max(1, workers))]
+    heapq.heapify(slots)
+    placed = []
+    for item in items:
+        start, slot = heapq.heappop(slots)
+        placed.append((start, slot, item))
+        heapq.heappush(slots, (start + item[key], slot))
+    return placed, max((free for free, _ in slots), default=0.0)
+
+
+def _simulate_scheduler(tasks, estimates, workers, accounts, options, key):
+    """ResourceScheduler 를 가상 시계로 돌려 잠금/전처리/선행 시나리오를 지킨 배치를 구함.
+    반환 (배치 [(시작, 슬롯, item)], 종료 시각) — item 은 태스크 추정 또는 {"hook", "expected", "worst"}"""
+    scheduler = ResourceScheduler(tasks, accounts, expected=expected_durations())
+    free = list(range(max(1, workers)))
+    running = []  # (종료 시각, 순번, 슬롯, job)
+    placed = []
+    clock = 0.0
+    seq = 0
+    while not scheduler.finished:
+        while free:
+            job = scheduler.next_ready()
+            if job is None:
+                break
+            if job["skip"]:
+                scheduler.done(job, ok=False)
+                continue
+            if job["kind"] == "hook":
+                # 전처리 훅은 현재 cancel-counsels 뿐 (HAR 재생 시에는 실행하지 않음)
+                expected, worst = (0.0, 0.0) if har_replaying(options) else _cancel_cost()
+                item = {"hook": job["hook"], "expected": expected, "worst": worst}
+            else:
+                item = dict(estimates[job["index"]], account=(job["account"] or {}).get("name"))
+            slot = free.pop(0)
+            placed.append((clock, slot, item))
+            heapq.heappush(running, (clock + item[key], seq, slot, job))
+            seq += 1
+        if not running:
+            continue  # 남은 작업은 스케줄러의 교착 방지가 건너뜀 처리
+        clock, _, slot, job = heapq.heappop(running)
+        free.append(slot)
+        free.sort()
+        scheduler.done(job, ok=True)
+    return placed, clock
+
+
+def _phase(title, workers, placed, finish, setup=None):
+    """실행 단계 1개 — 브라우저 기동 + 전처리 + 배치 결과"""
+    setup_sec = BROWSER_LAUNCH_SEC + (setup or 0.0)
+    return {"title": title, "workers": workers, "setup": setup_sec, "placed": placed, "duration": setup_sec + finish}
+
+
+def _legacy_phases(tasks, estimates, feature_path, max_workers, engine_label, accounts, options, key):
+    """locks 선언이 없을 때 run_all 의 규칙 — 해피패스/상태설정 (counsel 은 순차 또는 계정 풀 병렬) 후 엣지케이스 병렬"""
+    by_task = {id(task): estimate for task, estimate in zip(tasks, estimates)}
+    happy, edge = split_counsel_tasks(tasks, feature_path)
+    is_counsel = is_counsel_feature(feature_path)
+    expected = expected_durations()
+
+    def longest_first(group):
+        # _run_parallel 과 같은 순서 (학습된 소요 시간, 없으면 정적 추정 기준 내림차순)
+        return [by_task[id(t)] for t in sorted(group, key=expected, reverse=True)]
+
+    phases = []
+    if happy:
+        if is_counsel and accounts:
+            workers = min(len(accounts), len(happy))
+            title = (f"[계정 풀] 해피패스/상태설정 {len(happy)}개 (계정 {workers}개 {'순차' if workers == 1 else '병렬'}: "
+                     f"{', '.join(account['name'] for account in accounts[:workers])})")
+            items = longest_first(happy)
+        elif is_counsel:
+            workers = 1
+            title = f"[순차] 해피패스/상태설정 {len(happy)}개 ({engine_label} 1개)"
+            items = [by_task[id(t)] for t in happy]
+        else:
+            workers = min(max_workers, len(happy))
+            title = f"시나리오 {len(happy)}개 ({engine_label} {workers}개{' 순차' if workers == 1 else ' 병렬'})"
+            items = longest_first(happy) if workers > 1 else [by_task[id(t)] for t in happy]
+        phases.append(_phase(title, workers, *_simulate_queue(items, workers, key)))
+    if edge:
+        workers = min(max_workers, len(edge))
+        pre_cancel = None if har_replaying(options) else _cancel_cost()[0 if key == "expected" else 1]
+        title = f"[병렬] 엣지케이스 {len(edge)}개 ({engine_label} {workers}개)"
+        if pre_cancel is not None:
+            title += " — 실행 전 기존 상담 취소"
+        phases.append(_phase(title, workers, *_simulate_queue(longest_first(edge), workers, key), setup=pre_cancel))
+    return phases
+
+
+def plan_run(base_url, feature_path, extra_vars=None, labels=None, engine="sync", options=None, repeat=1,
+             accounts=None):
+    """run_all 과 같은 선택/컴파일/배치 규칙으로 실행 계획을 세움 (브라우저·인증 확인 없음). 선택 실패 시 None.
+    반환 {"base_url", "feature", "engine", "wait", "tasks", "compile_failures", "reused", "scheduled",
+          "phases": [{"title", "workers", "setup", "placed", "duration"}] (예상 기준), "expected", "worst", "actions"}
+    """
+    options = options or {}
+    selection = select_tasks(base_url, feature_path, extra_vars, labels, engine, accounts)
+    if selection is None:
+        return None
+    base_url, tasks, compile_failures, _ = selection
+    reused = []
+    if repeat == 1:
+        tasks, reused = incremental_tasks(tasks, base_url, options)
+    if repeat > 1:
+        tasks = repeat_tasks(tasks, repeat)
+
+    wait_mode = options.get("wait", DEFAULT_WAIT_MODE)
+    history = step_duration_history(base_url, sorted({t["scenario"].get("id", "") for t in tasks}), wait_mode)
+    learned = load_durations()
+    estimates = [dict(estimate_task(task, wait_mode, history, learned),
+                      name=task["scenario"].get("name", ""), round=task["scenario"].get("round"))
+                 for task in tasks]
+
+    max_workers = engine_max_workers(engine, len(tasks))
+    engine_label = {"async": "컨텍스트", "process": "프로세스"}.get(engine, "브라우저")
+    scheduled = declares_locks(tasks)
+    totals = {}
+    phases_by_key = {}
+    for key in ("expected", "worst"):
+        if not tasks:
+            phases = []
+        elif scheduled:
+            workers = min(max(max_workers, len(accounts or [])), len(tasks))
+            title = f"[스케줄] {engine_label} 최대 {workers}개 — 잠금이 겹치지 않는 시나리오끼리 병렬"
+            placed, finish = _simulate_scheduler(tasks, estimates, workers, accounts, options, key)
+            phases = [_phase(title, workers, placed, finish)]
+        else:
+            phases = _legacy_phases(tasks, estimates, feature_path, max_workers, engine_label, accounts, options, key)
+        phases_by_key[key] = phases
+        totals[key] = sum(phase["duration"] for phase in phases)
+
+    actions = {}
+    for estimate in estimates:
+        for action, seconds in estimate["actions"].items():
+            actions[action] = actions.get(action, 0.0) + seconds
+    return {
+        "base_url": base_url, "feature": feature_path, "engine": engine, "wait": wait_mode,
+        "tasks": len(tasks), "compile_failures": len(compile_failures), "reused": len(reused),
+        "scheduled": scheduled, "phases": phases_by_key["expected"],
+        "expected": totals["expected"], "worst": totals["worst"], "actions": actions,
+        "sources": [estimate["source"] for estimate in estimates],
+    }
+
+
+def format_seconds(seconds):
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{secs:02d}" if minutes else f"{seconds:.1f}s"
+
+
+def print_plan(plan):
+    """실행 계획 콘솔 출력 — 단계별 배치 (시작 오프셋 / 슬롯 / 예상 시간 / 추정 근거) + 예상 총 소요 시간"""
+    print(f"\n{'='*50}")
+    print("실행 계획 (dry run) — 브라우저를 띄우지 않음")
+    print(f"대상: {plan['base_url']}  기능: {plan['feature']}  엔진: {plan['engine']}  대기: {plan['wait']}")
+    print(f"{'='*50}")
+    extra = []
+    if plan["compile_failures"]:
+        extra.append(f"컴파일 실패 {plan['compile_failures']}개 (실행 안 함)")
+    if plan["reused"]:
+        extra.append(f"이전 결과 재사용 {plan['reused']}개")
+    print(f"실행할 시나리오 {plan['tasks']}개{' — ' + ', '.join(extra) if extra else ''}")
+
+    for phase in plan["phases"]:
+        print(f"\n{phase['title']} — 예상 {format_seconds(phase['duration'])}")
+        if phase["setup"]:
+            print(f"  준비 (브라우저 기동 / 전처리) {format_seconds(phase['setup'])}")
+        for start, slot, item in sorted(phase["placed"], key=lambda p: (p[0], p[1])):
+            offset = f"+{format_seconds(phase['setup'] + start)}"
+            if "hook" in item:
+                print(f"  {offset:>8}  #{slot + 1:<2} {format_seconds(item['expected']):>6}  [전처리] {item['hook']}")
+                continue
+            round_info = f" {item['round']}회차" if item.get("round") else ""
+            account_info = f" @{item['account']}" if item.get("account") else ""
+            print(f"  {offset:>8}  #{slot + 1:<2} {format_seconds(item['expected']):>6}  [{item['source']}] "
+                  f"{item['name']}{round_info}{account_info}")
+
+    if plan["actions"]:
+        total = sum(plan["actions"].values()) or 1.0
+        top = sorted(plan["actions"].items(), key=lambda kv: kv[1], reverse=True)[:PLAN_TOP_N]
+        print("\n스텝 시간 비중: " + " / ".join(f"{action} {seconds / total:.0%}" for action, seconds in top))
+    sources = {}
+    for source in plan["sources"]:
+        sources[source] = sources.get(source, 0) + 1
+    if sources:
+        print("추정 근거: " + ", ".join(f"{source} {count}개" for source, count in sources.items()))
+    print(f"\n예상 총 소요 시간: {format_seconds(plan['expected'])} "
+          f"(최대 {format_seconds(plan['worst'])} — 모든 대기가 타임아웃까지 가는 경우)")
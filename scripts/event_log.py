@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+instech 시나리오 러너 실행 이벤트 로그 (JSONL)
+- 시나리오 시작/종료, 스텝 결과(타이밍, 스크린샷 경로)를 발생 즉시 한 줄씩 기록
+- 리스너를 등록하면 같은 이벤트를 받아 라이브 리포트 등을 갱신할 수 있음
+- 여러 워커 스레드에서 동시에 호출해도 안전 (한 줄 단위로 기록)
+
+이벤트 형식: {"ts": <epoch 초>, "type": "...", ...}
+  run_start      {feature, baseUrl, total}
+  scenario_start {id, name, description, precondition}
+  step           {id, num, status, desc, error?, timing, screenshot?}
+  scenario_end   {id, result}
+  run_end        {passed, failed}
+
+사용법 (진행 상황 보기):
+  tail -f /tmp/instech_events.jsonl
+"""
+
+import json
+import threading
+import time
+
+EVENTS_PATH = "/tmp/instech_events.jsonl"
+
+
+class EventLog:
+    def __init__(self, path=EVENTS_PATH):
+        self.path = path
+        self.listeners = []
+        self._lock = threading.Lock()
+        # 실행마다 새 로그
+        self._file = open(path, "w", encoding="utf-8")
+
+    def add_listener(self, listener):
+        """listener(event) — emit 한 스레드에서 호출됨"""
+        self.listeners.append(listener)
+
+    def emit(self, event_type, **fields):
+        event = {"ts": round(time.time(), 3), "type": event_type, **fields}
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"  [WARN] 이벤트 리스너 에러: {e}")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
@@ -2,15 +2,48 @@
 """
 instech 시나리오 테스트 HTML 리포트 생성기
 - scenario_runner.py 와 연동하여 실행 결과 + 스크린샷을 HTML 리포트로 생성
+- plan 모드: 실행하지 않고 실행 계획 + 예상 소요 시간만 출력 (dry_run.py)
+- 실행 결과는 리포트 옆 매니페스트로도 저장 → render 모드가 다시 실행하지 않고 여러 매니페스트를 합쳐 리포트 생성
 """
 
 import base64
 import glob
 import os
+import shutil
+import threading
+import time
 from datetime import datetime
-from scenario_runner import fetch_scenario, run_all, run_scenario
+
+import scenario_runner
+from scenario_runner import (
+    ENGINES, INCREMENTAL_MODES, TIMING_BUCKETS, TIMING_LABELS, _run_tasks, compile_tasks, engine_max_workers,
+    fetch_scenario, is_serial_scenario, launch_browser, preflight_tasks, print_repeat_summary, record_durations,
+    repeat_tasks, round_screenshot_prefix, run_all, run_scenario, slowest_steps, summarize_repeats, summarize_timing,
+    timing_by_action,
+)
+from account_pool import ACCOUNT_VARIABLES, load_account_pool
+from auth_preflight import AuthExpiredError
+from dry_run import plan_run, print_plan
+from event_log import EventLog
+from network_profile import DEFAULT_NETWORK_PROFILE, HAR_DIR, HAR_MODES, NETWORK_PROFILES
+from report_manifest import load_manifest, manifest_path_for, merge_manifests, write_manifest
+from result_store import content_hash, record_run
+from shard_node import NodeError, parse_nodes, run_sharded
 from playwright.sync_api import sync_playwright
 
+try:
+    from PIL import Image
+except ImportError:  # Pillow 는 선택 의존성: 없으면 원본을 썸네일로 그대로 사용
+    Image = None
+
+REPORT_PATH = "/tmp/instech_test_report.html"
+THUMB_WIDTH = 360
+THUMB_MAX_HEIGHT = 1080  # full_page 스크린샷은 세로로 길어서 상단만 잘라 미리보기
+THUMB_QUALITY = 70
+PROFILE_TOP_N = 10  # 프로파일 섹션의 "가장 느린 스텝" 개수
+LIVE_REFRESH_SEC = 3  # 라이브 리포트 자동 새로고침 주기
+LIVE_RENDER_INTERVAL = 1.0  # 통과 스텝 이벤트로 인한 재작성 최소 간격(초). 시작/종료/실패는 즉시 반영
+
 
 def encode_screenshot(path):
     if not os.path.exists(path):
@@ -19,16 +52,80 @@ def encode_screenshot(path):
         return base64.b64encode(f.read()).decode("utf-8")
 
 
-def find_screenshots(prefix):
-    """prefix 패턴으로 스크린샷 매핑 (step_num → base64)"""
-    screenshots = {}
+def find_screenshot_paths(prefix):
+    """prefix 패턴으로 스크린샷 매핑 (step_num / "N_error" → 파일 경로)"""
+    paths = {}
     for path in glob.glob(f"{prefix}_*.png"):
         basename = os.path.basename(path)
         parts = basename.replace(".png", "").split("_")
         if parts[-1].isdigit():
-            screenshots[int(parts[-1])] = encode_screenshot(path)
+            paths[int(parts[-1])] = path
         elif parts[-1] == "error" and len(parts) >= 2 and parts[-2].isdigit():
-            screenshots[f"{int(parts[-2])}_error"] = encode_screenshot(path)
+            paths[f"{int(parts[-2])}_error"] = path
+    return paths
+
+
+def result_screenshot_paths(result):
+    """결과의 스크린샷 (러너가 저장한 /tmp/scenario_{id}[-r회차]_*.png)"""
+    scenario_id = result.get("id", result["name"].replace(" ", "-"))
+    return find_screenshot_paths(round_screenshot_prefix(f"/tmp/scenario_{scenario_id}", result.get("round")))
+
+
+def assets_dir_for(output_path):
+    """리포트 HTML 옆에 둘 에셋 디렉토리 (/tmp/x.html → /tmp/x_assets)"""
+    return os.path.splitext(output_path)[0] + "_assets"
+
+
+def _make_thumbnail(src, dest):
+    """Pillow 로 폭 THUMB_WIDTH 의 JPEG 썸네일 생성. Pillow 가 없거나 실패하면 False."""
+    if Image is None:
+        return False
+    try:
+        with Image.open(src) as img:
+            ratio = THUMB_WIDTH / img.width
+            height = max(1, int(img.height * ratio))
+            thumb = img.convert("RGB").resize((THUMB_WIDTH, height))
+            if height > THUMB_MAX_HEIGHT:
+                thumb = thumb.crop((0, 0, THUMB_WIDTH, THUMB_MAX_HEIGHT))
+            thumb.save(dest, "JPEG", quality=THUMB_QUALITY, optimize=True)
+        return True
+    except Exception as e:
+        print(f"  [WARN] 썸네일 생성 실패 ({os.path.basename(src)}): {e}")
+        return False
+
+
+def export_screenshots(paths, assets_dir):
+    """스크린샷({step_key: 경로})을 에셋 디렉토리로 복사 + 썸네일 생성.
+
+    반환: {step_key: (썸네일 src, 원본 src)} — src 는 리포트 HTML 기준 상대 경로
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+    rel_dir = os.path.basename(assets_dir)
+    screenshots = {}
+    for key, path in paths.items():
+        name = os.path.splitext(os.path.basename(path))[0]
+        shutil.copyfile(path, os.path.join(assets_dir, f"{name}.png"))
+        full_src = f"{rel_dir}/{name}.png"
+        if _make_thumbnail(path, os.path.join(assets_dir, f"{name}_thumb.jpg")):
+            screenshots[key] = (f"{rel_dir}/{name}_thumb.jpg", full_src)
+        else:
+            screenshots[key] = (full_src, full_src)
+    return screenshots
+
+
+def linked_screenshots(paths):
+    """라이브 리포트: 러너가 저장한 파일을 그대로 참조 (복사/인코딩 없음)"""
+    return {key: (path, path) for key, path in paths.items()}
+
+
+def inline_screenshots(paths):
+    """단일 파일 모드: 썸네일/원본 모두 base64 data URI"""
+    screenshots = {}
+    for key, path in paths.items():
+        b64 = encode_screenshot(path)
+        if b64:
+            src = f"data:image/png;base64,{b64}"
+            screenshots[key] = (src, src)
     return screenshots
 
 
@@ -95,6 +192,7 @@ COMMON_CSS = """
   .badge.pass { background: var(--pass-bg); color: var(--pass); }
   .badge.fail { background: var(--fail-bg); color: var(--fail); }
   .badge.setup { background: var(--setup-bg); color: var(--setup); }
+  .badge.reused { background: var(--bg); color: var(--text-light); border: 1px solid var(--border); }
   .scenario-title { font-size: 15px; font-weight: 600; flex: 1; }
   .scenario-body {
     display: none; border-top: 1px solid var(--border); padding: 16px 20px;
@@ -139,6 +237,25 @@ COMMON_CSS = """
   }
   .step-screenshot img:hover { transform: scale(1.02); }
   .step-screenshot img.expanded { max-width: 100%; }
+  .step-screenshot img.thumb { width: 360px; max-height: 1080px; object-fit: cover; object-position: top; }
+  .step-screenshot img.thumb.expanded { width: auto; max-height: none; }
+  .step-timing { font-size: 11px; color: var(--text-light); margin-top: 2px; }
+  .profile {
+    background: white; border: 1px solid var(--border); border-radius: 12px;
+    padding: 20px; margin-bottom: 24px;
+  }
+  .profile h2 { font-size: 15px; font-weight: 600; margin-bottom: 8px; }
+  .profile h3 { font-size: 13px; font-weight: 600; margin: 16px 0 6px; color: var(--text-light); }
+  .profile table { width: 100%; border-collapse: collapse; font-size: 12px; }
+  .profile th, .profile td { padding: 4px 6px; border-bottom: 1px solid #f3f4f6; text-align: right; }
+  .profile th:first-child, .profile td:first-child, .profile td.name { text-align: left; }
+  .profile th { color: var(--text-light); font-weight: 500; }
+  .timing-bar { display: flex; height: 10px; border-radius: 5px; overflow: hidden; margin: 8px 0 4px; }
+  .timing-bar span { display: block; height: 100%; }
+  .timing-action { background: #8b5cf6; } .timing-wait { background: var(--warn); }
+  .timing-network { background: var(--setup); } .timing-screenshot { background: var(--pass); }
+  .timing-legend { font-size: 12px; color: var(--text-light); display: flex; gap: 12px; flex-wrap: wrap; }
+  .timing-legend i { display: inline-block; width: 8px; height: 8px; border-radius: 2px; margin-right: 4px; }
   .footer {
     text-align: center; font-size: 12px; color: var(--text-light);
     margin-top: 32px; padding: 16px;
@@ -151,6 +268,26 @@ COMMON_CSS = """
   }
 """
 
+# 에셋 모드: 클릭 시 썸네일 ↔ 원본 교체 (원본은 클릭할 때만 로드)
+SCREENSHOT_JS = """
+function toggleShot(img) {
+  var expand = !img.classList.contains('expanded');
+  img.src = expand ? img.dataset.full : img.dataset.thumb;
+  img.classList.toggle('expanded', expand);
+}
+"""
+
+
+def render_screenshot_html(srcs, alt, extra_style=""):
+    """(썸네일 src, 원본 src) → <img>. 둘이 같으면(base64 단일 파일 모드) 기존처럼 크기만 토글."""
+    thumb, full = srcs
+    style = f' style="{extra_style}"' if extra_style else ""
+    if thumb == full:
+        lazy = "" if full.startswith("data:") else ' loading="lazy"'
+        return f'<div class="step-screenshot"><img src="{full}" alt="{alt}"{lazy} onclick="this.classList.toggle(\'expanded\')"{style} /></div>'
+    return (f'<div class="step-screenshot"><img class="thumb" src="{thumb}" data-thumb="{thumb}" data-full="{full}" '
+            f'alt="{alt}" loading="lazy" onclick="toggleShot(this)"{style} /></div>')
+
 
 def render_steps_html(steps, screenshots):
     html = ""
@@ -163,18 +300,23 @@ def render_steps_html(steps, screenshots):
             error_html = f'<div class="step-error">{step["error"]}</div>'
 
         screenshot_html = ""
-        b64 = screenshots.get(step_num)
-        if b64:
-            screenshot_html = f'<div class="step-screenshot"><img src="data:image/png;base64,{b64}" alt="{step["desc"]}" onclick="this.classList.toggle(\'expanded\')" /></div>'
-        error_b64 = screenshots.get(f"{step_num}_error")
-        if error_b64:
-            screenshot_html += f'<div class="step-screenshot"><img src="data:image/png;base64,{error_b64}" alt="에러" onclick="this.classList.toggle(\'expanded\')" style="border-color:var(--fail);" /></div>'
+        srcs = screenshots.get(step_num)
+        if srcs:
+            screenshot_html = render_screenshot_html(srcs, step["desc"])
+        error_srcs = screenshots.get(f"{step_num}_error")
+        if error_srcs:
+            screenshot_html += render_screenshot_html(error_srcs, "에러", "border-color:var(--fail);")
+
+        timing_html = ""
+        if (step.get("timing") or {}).get("total"):
+            timing_html = f'<div class="step-timing">{format_timing_breakdown(step["timing"])}</div>'
 
         html += f"""    <div class="step">
       <span class="step-num">{step_num}</span>
       <span class="step-icon {step['status']}">{icon}</span>
       <div style="flex:1">
         <div class="step-desc">{step['desc']}</div>
+        {timing_html}
         {error_html}
         {screenshot_html}
       </div>
@@ -183,6 +325,110 @@ def render_steps_html(steps, screenshots):
     return html
 
 
+def _ms(ms):
+    return f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def format_timing_breakdown(timing):
+    """{"total": .., "action": .., ...} → "1.2s — 액션 300ms · 대기 900ms" """
+    parts = [f"{TIMING_LABELS[b]} {_ms(timing.get(b, 0))}" for b in TIMING_BUCKETS if timing.get(b, 0) >= 1]
+    return f"{_ms(timing.get('total', 0))}" + (f" — {' · '.join(parts)}" if parts else "")
+
+
+def render_timing_bar(timing):
+    total = timing.get("total") or 0
+    if not total:
+        return ""
+    spans = "".join(
+        f'<span class="timing-{b}" style="width:{timing.get(b, 0) / total * 100:.1f}%" title="{TIMING_LABELS[b]}"></span>'
+        for b in TIMING_BUCKETS if timing.get(b, 0) > 0
+    )
+    return f'<div class="timing-bar">{spans}</div>'
+
+
+def render_profile_html(all_results, limit=PROFILE_TOP_N):
+    """프로파일 섹션: 버킷별 합계 + action 타입별 롤업 + 가장 느린 스텝 top N"""
+    overall = summarize_timing([step for r in all_results for step in r["steps"]])
+    if not overall.get("total"):
+        return ""
+
+    legend = "".join(
+        f'<span><i class="timing-{b}"></i>{TIMING_LABELS[b]} {_ms(overall[b])} ({overall[b] / overall["total"] * 100:.0f}%)</span>'
+        for b in TIMING_BUCKETS
+    )
+    bucket_headers = "".join(f"<th>{TIMING_LABELS[b]}</th>" for b in TIMING_BUCKETS)
+
+    action_rows = ""
+    for action, entry in timing_by_action(all_results).items():
+        buckets = "".join(f"<td>{_ms(entry[b])}</td>" for b in TIMING_BUCKETS)
+        action_rows += (f'<tr><td class="name">{action}</td><td>{entry["count"]}</td><td>{_ms(entry["total"])}</td>'
+                        f'<td>{_ms(entry["total"] / entry["count"])}</td>{buckets}</tr>\n')
+
+    slow_rows = ""
+    for result, step_num, step in slowest_steps(all_results, limit):
+        buckets = "".join(f"<td>{_ms(step['timing'].get(b, 0))}</td>" for b in TIMING_BUCKETS)
+        slow_rows += (f'<tr><td class="name">{result["name"]} #{step_num}<br>'
+                      f'<span style="color:var(--text-light)">{step["desc"]}</span></td>'
+                      f'<td>{_ms(step["timing"]["total"])}</td>{buckets}</tr>\n')
+
+    return f"""<div class="profile">
+  <h2>실행 프로파일</h2>
+  {render_timing_bar(overall)}
+  <div class="timing-legend">{legend}</div>
+  <h3>가장 느린 스텝 (상위 {limit}개)</h3>
+  <table>
+    <tr><th>스텝</th><th>합계</th>{bucket_headers}</tr>
+{slow_rows}  </table>
+  <h3>action 타입별</h3>
+  <table>
+    <tr><th>action</th><th>횟수</th><th>합계</th><th>평균</th>{bucket_headers}</tr>
+{action_rows}  </table>
+</div>
+"""
+
+
+def render_repeat_html(all_results):
+    """반복 실행(--repeat) 통계 섹션: 시나리오별 통과율/소요 시간 분포 + 실패·불안정 스텝 + 스텝별 소요 시간 분포"""
+    if not any(r.get("round") for r in all_results):
+        return ""
+
+    scenario_rows = ""
+    step_tables = ""
+    for entry in summarize_repeats(all_results):
+        duration = entry["duration"]
+        rate_color = "var(--pass)" if entry["passed"] == entry["rounds"] else "var(--fail)"
+        failing = [step for step in entry["steps"] if step["failed"]]
+        failing_html = "<br>".join(
+            f'{"불안정" if step["flaky"] else "항상 실패"} #{step["num"]} {step["desc"]} ({step["failed"]}/{step["runs"]})'
+            for step in failing
+        ) or "-"
+        scenario_rows += (f'<tr><td class="name">{entry["name"]}</td>'
+                          f'<td style="color:{rate_color}">{entry["passed"]}/{entry["rounds"]} ({entry["passRate"]:.0f}%)</td>'
+                          f'<td>{duration["min"]:.1f}s</td><td>{duration["p50"]:.1f}s</td><td>{duration["p95"]:.1f}s</td>'
+                          f'<td>{duration["max"]:.1f}s</td><td class="name">{failing_html}</td></tr>\n')
+
+        step_rows = ""
+        for step in entry["steps"]:
+            failed = f'<span style="color:var(--fail)">{step["failed"]}</span>' if step["failed"] else "0"
+            errors = "".join(f'<div class="step-error">{error}</div>' for error in step["errors"])
+            step_rows += (f'<tr><td class="name">#{step["num"]} {step["desc"]}{errors}</td><td>{step["runs"]}</td>'
+                          f'<td>{failed}</td><td>{_ms(step["p50"])}</td><td>{_ms(step["p95"])}</td>'
+                          f'<td>{_ms(step["max"])}</td></tr>\n')
+        step_tables += f"""  <h3>{entry["name"]}</h3>
+  <table>
+    <tr><th>스텝</th><th>실행</th><th>실패</th><th>p50</th><th>p95</th><th>최대</th></tr>
+{step_rows}  </table>
+"""
+
+    return f"""<div class="profile">
+  <h2>반복 실행 안정성</h2>
+  <table>
+    <tr><th>시나리오</th><th>통과</th><th>최소</th><th>p50</th><th>p95</th><th>최대</th><th>실패 스텝</th></tr>
+{scenario_rows}  </table>
+{step_tables}</div>
+"""
+
+
 def render_meta_html(now, base_url, extra_items=None):
     extra = ""
     if extra_items:
@@ -217,12 +463,27 @@ def render_meta_html(now, base_url, extra_items=None):
 
 # ── 공통 HTML 리포트 렌더링 ──
 
-def _render_report_html(all_results, base_url, title="instech 시나리오 테스트 리포트", subtitle="", extra_meta=None):
-    """결과 리스트 → HTML 리포트 문자열"""
+def _render_report_html(all_results, base_url, title="instech 시나리오 테스트 리포트", subtitle="", extra_meta=None,
+                        assets_dir=None, live=False, screenshot_paths=None):
+    """결과 리스트 → HTML 리포트 문자열
+
+    assets_dir 가 주어지면 스크린샷을 그 디렉토리에 파일로 내보내고 썸네일만 lazy 로딩으로 참조한다.
+    없으면 기존처럼 base64 로 인라인한 단일 HTML 파일.
+    live=True 면 실행 중 리포트: 자동 새로고침 + 스크린샷 파일 직접 참조 + "running" 상태 표시.
+    screenshot_paths: 결과마다 {step_key: 스크린샷 경로} (매니페스트 렌더링). 없으면 러너가 저장한 /tmp 파일에서 찾음
+    """
+    if live:
+        assets_dir = None
+    elif assets_dir:
+        shutil.rmtree(assets_dir, ignore_errors=True)
+        os.makedirs(assets_dir)
+        if Image is None:
+            print("[INFO] Pillow 미설치 — 썸네일 없이 원본 스크린샷을 lazy 로딩합니다 (pip3 install pillow)")
+
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
     total = len(all_results)
     passed = sum(1 for r in all_results if r["status"] == "pass")
-    failed = total - passed
+    failed = sum(1 for r in all_results if r["status"] == "fail")
     total_steps = sum(len(r["steps"]) for r in all_results)
     passed_steps = sum(1 for r in all_results for s in r["steps"] if s["status"] == "pass")
 
@@ -233,8 +494,10 @@ def _render_report_html(all_results, base_url, title="instech 시나리오 테
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
+{f'<meta http-equiv="refresh" content="{LIVE_REFRESH_SEC}">' if live else ""}
 <title>{title}</title>
 <style>{COMMON_CSS}</style>
+<script>{SCREENSHOT_JS}</script>
 </head>
 <body>
 
@@ -261,22 +524,42 @@ def _render_report_html(all_results, base_url, title="instech 시나리오 테
     <div class="summary-label">스텝 통과율</div>
   </div>
 </div>
+
+{render_repeat_html(all_results)}
+{render_profile_html(all_results)}
 """
 
-    for result in all_results:
-        name = result["name"]
+    for i, result in enumerate(all_results):
+        name = result["name"] + (f" ({result['round']}회차)" if result.get("round") else "")
         status = result["status"]
 
-        scenario_id = result.get("id", name.replace(" ", "-"))
         description = result.get("description", "")
         precondition = result.get("precondition", "")
 
-        badge_text = "통과" if status == "pass" else "실패"
-        open_class = "open" if status == "fail" else ""
+        badge_text = {"pass": "통과", "running": "실행 중"}.get(status, "실패")
+        badge_class = "setup" if status == "running" else status
+        open_class = "open" if status in ("fail", "running") else ""
         step_pass = sum(1 for s in result["steps"] if s["status"] == "pass")
         step_total = len(result["steps"])
 
-        screenshots = find_screenshots(f"/tmp/scenario_{scenario_id}")
+        paths = screenshot_paths[i] if screenshot_paths is not None else result_screenshot_paths(result)
+        if live:
+            screenshots = linked_screenshots(paths)
+        elif assets_dir:
+            screenshots = export_screenshots(paths, assets_dir)
+        else:
+            screenshots = inline_screenshots(paths)
+
+        timing_html = ""
+        if (result.get("timing") or {}).get("total"):
+            timing_html = (f'{render_timing_bar(result["timing"])}'
+                           f'<div class="step-timing" style="margin-bottom:12px">{format_timing_breakdown(result["timing"])}</div>')
+
+        reused_html = ""
+        if result.get("reused"):
+            reused = result["reused"]
+            reused_html = (f'<span class="badge reused" title="이번 실행에서는 실행하지 않고 이전 결과를 표시">'
+                           f'재사용 #{reused["runId"]} · {reused["startedAt"][:16].replace("T", " ")}</span>')
 
         precondition_html = ""
         if precondition:
@@ -286,13 +569,15 @@ def _render_report_html(all_results, base_url, title="instech 시나리오 테
 <div class="scenario {open_class}">
   <div class="scenario-header" onclick="this.parentElement.classList.toggle('open')">
     <span class="arrow">&#9654;</span>
-    <span class="badge {status}">{badge_text}</span>
+    <span class="badge {badge_class}">{badge_text}</span>
+    {reused_html}
     <span class="scenario-title">{name}</span>
     <span style="font-size:13px;color:var(--text-light)">{step_pass}/{step_total} 스텝</span>
   </div>
   <div class="scenario-body">
     {precondition_html}
     <div class="scenario-desc">{description}</div>
+    {timing_html}
 {render_steps_html(result["steps"], screenshots)}  </div>
 </div>
 """
@@ -306,11 +591,89 @@ def _render_report_html(all_results, base_url, title="instech 시나리오 테
     return html
 
 
+# ── 라이브 리포트 (실행 중 자동 새로고침) ──
+
+class LiveReport:
+    """EventLog 리스너. 이벤트가 올 때마다 진행 상황으로 리포트 HTML 을 다시 쓴다.
+    최종 리포트가 같은 경로에 덮어쓰이면 자동 새로고침도 멈춘다.
+    """
+
+    def __init__(self, output_path, base_url, title="instech 시나리오 테스트 리포트"):
+        self.output_path = output_path
+        self.base_url = base_url
+        self.title = title
+        self.total = None
+        self.results = {}  # (scenario id, 회차) → 결과 (실행 중이면 status="running")
+        self._lock = threading.Lock()
+        self._last_render = 0.0
+
+    def __call__(self, event):
+        event_type = event["type"]
+        with self._lock:
+            if event_type == "run_start":
+                self.base_url = event["baseUrl"]
+                self.total = event["total"]
+            elif event_type == "scenario_start":
+                meta = {k: event[k] for k in ("id", "name", "description", "precondition", "round") if k in event}
+                self.results[(event["id"], event.get("round"))] = {**meta, "steps": [], "status": "running"}
+            elif event_type == "step":
+                running = self.results.get((event["id"], event.get("round")))
+                if running is None:
+                    return
+                running["steps"].append({k: event[k] for k in ("status", "desc", "error") if k in event})
+            elif event_type == "scenario_end":
+                self.results[(event["id"], event["result"].get("round"))] = event["result"]
+            else:
+                return
+
+            urgent = event_type != "step" or event.get("status") == "fail"
+            if urgent or time.monotonic() - self._last_render >= LIVE_RENDER_INTERVAL:
+                self._write()
+
+    def write(self):
+        with self._lock:
+            self._write()
+
+    def _write(self):
+        done = sum(1 for r in self.results.values() if r["status"] != "running")
+        progress = f"{done}/{self.total}" if self.total else f"{done}"
+        html = _render_report_html(
+            list(self.results.values()), self.base_url, title=self.title,
+            subtitle=f"실행 중 — {progress} 시나리오 완료 ({LIVE_REFRESH_SEC}초마다 새로고침)", live=True,
+        )
+        tmp_path = f"{self.output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, self.output_path)  # 새로고침 중에 반쯤 쓰인 파일을 읽지 않도록
+        self._last_render = time.monotonic()
+
+
 # ── 전체 시나리오 리포트 ──
 
-def generate_report(base_url, feature_path, auth_state_path, category=None, extra_vars=None, labels=None):
-    all_results = run_all(base_url, feature_path, auth_state_path, category=category, extra_vars=extra_vars, labels=labels)
-    return _render_report_html(all_results, base_url, subtitle="E2E 테스트 결과")
+def write_results_manifest(manifest_path, results, base_url, title="", subtitle="", feature=None):
+    """실행 결과 + 스크린샷을 매니페스트로 보관 (render 모드로 다시 실행하지 않고 리포트 재생성)"""
+    if not manifest_path:
+        return None
+    return write_manifest(manifest_path, results, [result_screenshot_paths(r) for r in results], base_url,
+                          title=title, subtitle=subtitle, feature=feature)
+
+
+def generate_report(base_url, feature_path, auth_state_path, category=None, extra_vars=None, labels=None, engine="sync",
+                    options=None, assets_dir=None, repeat=1, accounts=None, nodes=None, manifest_path=None):
+    """전체 시나리오 실행 + HTML 리포트. nodes([(host, port)]) 가 있으면 노드에 샤드로 나눠 실행한 결과를 병합.
+    manifest_path 가 있으면 결과 매니페스트도 저장"""
+    if nodes:
+        all_results = run_sharded(base_url, feature_path, auth_state_path, nodes, extra_vars=extra_vars, labels=labels,
+                                  engine=engine, options=options, repeat=repeat)
+    else:
+        all_results = run_all(base_url, feature_path, auth_state_path, category=category, extra_vars=extra_vars,
+                              labels=labels, engine=engine, options=options, repeat=repeat, accounts=accounts)
+    subtitle = f"E2E 테스트 결과 ({repeat}회 반복)" if repeat > 1 else "E2E 테스트 결과"
+    reused = sum(1 for r in all_results if r.get("reused"))
+    if reused:
+        subtitle += f" — {len(all_results) - reused}개 실행, {reused}개는 이전 결과 재사용"
+    write_results_manifest(manifest_path, all_results, base_url, subtitle=subtitle, feature=feature_path)
+    return _render_report_html(all_results, base_url, subtitle=subtitle, assets_dir=assets_dir)
 
 
 # ── 단일 시나리오 리포트 ──
@@ -323,8 +686,12 @@ def _normalize_url(base_url):
     return base_url
 
 
-def _run_single(base_url, scenario_path, auth_state_path, extra_vars=None):
-    """단일 시나리오 fetch → 변수 설정 → 실행 → 결과 반환"""
+def _run_single(base_url, scenario_path, auth_state_path, extra_vars=None, engine="sync", options=None, repeat=1,
+                accounts=None):
+    """단일 시나리오 fetch → 변수 설정 → 실행 → (결과 리스트, base_url) 반환.
+    repeat > 1 이면 회차를 동시에 실행 (상담을 취소/생성하는 시나리오는 순차, 계정 풀이 있으면 계정 수만큼 병렬).
+    결과는 회차 순서.
+    """
     base_url = _normalize_url(base_url)
 
     scenario = fetch_scenario(scenario_path)
@@ -335,29 +702,94 @@ def _run_single(base_url, scenario_path, auth_state_path, extra_vars=None):
         variables.update(extra_vars)
 
     screenshot_prefix = f"/tmp/scenario_{scenario['id']}"
+    pool = accounts[:repeat] if repeat > 1 and accounts and is_serial_scenario(scenario) else None
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        result = run_scenario(browser, scenario, variables, auth_state_path, screenshot_prefix)
-        browser.close()
+    # 컴파일 실패(누락 변수 등)는 브라우저를 띄우지 않고 바로 실패 처리
+    # 계정 풀로 실행하면 계정 유저 변수는 임대할 때 계정 변수로 다시 컴파일하며 검사 (lease_task)
+    tasks, failures = compile_tasks(
+        [{"scenario": scenario, "variables": variables, "screenshot_prefix": screenshot_prefix}], engine,
+        ACCOUNT_VARIABLES if pool else (),
+    )
+    if failures:
+        return failures, base_url
+    task = tasks[0]
+    # 세션 만료면 브라우저를 띄우기 전에 중단 (AuthExpiredError)
+    preflight_tasks(tasks, base_url, auth_state_path, options, accounts=pool, use_main=not pool)
+
+    if repeat > 1:
+        if options and options.get("share_prefix"):
+            options = dict(options, share_prefix=False)  # 회차마다 모든 스텝을 실제로 실행
+        max_workers = engine_max_workers(engine, repeat)
+        if pool:
+            workers = len(pool)
+        else:
+            workers = 1 if is_serial_scenario(scenario) else min(repeat, max_workers)
+        print(f"\n[반복] {repeat}회차 실행 ({'순차' if workers == 1 else f'동시 {workers}개'}"
+              f"{', 계정 풀' if pool else ''})")
+        results = _run_tasks(repeat_tasks([task], repeat), auth_state_path, workers, engine, options=options,
+                             accounts=pool)
+        results.sort(key=lambda r: r.get("round", 0))
+    elif engine == "async":
+        import async_runner
+        results = async_runner.run_tasks([task], auth_state_path, concurrency=1, options=options)
+    else:
+        with sync_playwright() as p:
+            browser = launch_browser(p)
+            results = [run_scenario(browser, scenario, variables, auth_state_path, screenshot_prefix, options=options,
+                                    plan=task["plan"])]
+            browser.close()
+
+    record_durations(results)
+    record_run(results, base_url, feature=scenario_path, engine=engine, options=options, variables=extra_vars,
+               variables_by_id={scenario.get("id", ""): variables},
+               hashes_by_id={scenario.get("id", ""): content_hash(scenario, variables)})
+    return results, base_url
+
+
+def generate_single_report(base_url, scenario_path, auth_state_path, extra_vars=None, engine="sync", options=None,
+                           assets_dir=None, repeat=1, accounts=None, manifest_path=None):
+    """단일 시나리오 실행 + HTML 리포트 생성 (repeat > 1 이면 회차 결과와 안정성 통계를 한 리포트에).
+    manifest_path 가 있으면 결과 매니페스트도 저장"""
+    results, base_url = _run_single(base_url, scenario_path, auth_state_path, extra_vars, engine=engine,
+                                    options=options, repeat=repeat, accounts=accounts)
+    result = results[0]
 
-    return result, base_url
+    # 콘솔 요약
+    if len(results) > 1:
+        passed = sum(1 for r in results if r["status"] == "pass")
+        print(f"\n결과: {passed}/{len(results)} 회차 통과")
+        print_repeat_summary(summarize_repeats(results))
+    else:
+        step_pass = sum(1 for s in result["steps"] if s["status"] == "pass")
+        step_total = len(result["steps"])
+        print(f"\n결과: {result['status'].upper()} ({step_pass}/{step_total} 스텝)")
 
+    subtitle = result.get("description", "") + (f" — {len(results)}회 반복" if len(results) > 1 else "")
+    write_results_manifest(manifest_path, results, base_url, title=result["name"], subtitle=subtitle,
+                           feature=scenario_path)
+    return _render_report_html(results, base_url, title=result["name"], subtitle=subtitle, assets_dir=assets_dir)
 
-def generate_single_report(base_url, scenario_path, auth_state_path, extra_vars=None):
-    """단일 시나리오 실행 + HTML 리포트 생성"""
-    result, base_url = _run_single(base_url, scenario_path, auth_state_path, extra_vars)
 
-    # 콘솔 요약
-    step_pass = sum(1 for s in result["steps"] if s["status"] == "pass")
-    step_total = len(result["steps"])
-    print(f"\n결과: {result['status'].upper()} ({step_pass}/{step_total} 스텝)")
-
-    return _render_report_html(
-        [result], base_url,
-        title=result["name"],
-        subtitle=result.get("description", ""),
-    )
+# ── 저장된 결과로 리포트 렌더링 (render) ──
+
+def render_manifests(manifest_paths, assets_dir=None):
+    """매니페스트 여러 개(샤드 / 나눠 돌린 실행)를 합쳐 HTML 리포트 — 시나리오를 다시 실행하지 않음.
+    매니페스트가 없거나 형식이 다르면 ValueError
+    """
+    manifests = [load_manifest(path) for path in manifest_paths]
+    results, screenshot_paths, base_url = merge_manifests(manifests)
+    if len(manifests) == 1:
+        title = manifests[0].get("title") or "instech 시나리오 테스트 리포트"
+        subtitle = manifests[0].get("subtitle", "")
+    else:
+        title = "instech 시나리오 테스트 리포트"
+        subtitle = f"저장된 결과 {len(manifests)}개 병합 — 시나리오 {len(results)}개"
+    sources = ", ".join(f"{os.path.basename(m['path'])} ({m.get('createdAt', '')[:16].replace('T', ' ')})"
+                        for m in manifests)
+    print(f"매니페스트 {len(manifests)}개 → 시나리오 {len(results)}개: {sources}")
+    return _render_report_html(results, base_url, title=title, subtitle=subtitle,
+                               extra_meta=[("결과 출처", sources)], assets_dir=assets_dir,
+                               screenshot_paths=screenshot_paths)
 
 
 # ── CLI ──
@@ -365,9 +797,22 @@ def generate_single_report(base_url, scenario_path, auth_state_path, extra_vars=
 if __name__ == "__main__":
     import sys
 
-    # --var key=value, --label value 파싱
+    # --var key=value, --label value, --engine sync|async|process, --wait event|fixed, --network 프로필, --block-host 패턴,
+    # --har record|replay, --har-dir 경로, --har-strict, --share-prefix, --repeat N, --account-pool 경로,
+    # --nodes host:port,..., --only-failed, --changed, --offline, --assets, --live, --manifest 경로 파싱
+    # 모드: all (전체 실행), single (시나리오 1개), plan (실행 없이 실행 계획 + 예상 소요 시간),
+    #       render (저장된 결과 매니페스트로 리포트만 다시 생성)
     extra_vars = {}
     labels = []
+    engine = "sync"
+    options = {}
+    use_assets = False
+    use_live = False
+    har = {}
+    repeat = 1
+    account_pool_path = None
+    nodes_value = None
+    manifest_path = None
     positional = []
     i = 1
     while i < len(sys.argv):
@@ -378,6 +823,57 @@ if __name__ == "__main__":
         elif sys.argv[i] == "--label" and i + 1 < len(sys.argv):
             labels.append(sys.argv[i + 1])
             i += 2
+        elif sys.argv[i] == "--engine" and i + 1 < len(sys.argv):
+            engine = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--wait" and i + 1 < len(sys.argv):
+            options["wait"] = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--network" and i + 1 < len(sys.argv):
+            options["network"] = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--block-host" and i + 1 < len(sys.argv):
+            options.setdefault("block_hosts", []).append(sys.argv[i + 1])
+            i += 2
+        elif sys.argv[i] == "--har" and i + 1 < len(sys.argv):
+            har["mode"] = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--har-dir" and i + 1 < len(sys.argv):
+            har["dir"] = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--har-strict":
+            har["strict"] = True
+            i += 1
+        elif sys.argv[i] == "--share-prefix":
+            options["share_prefix"] = True
+            i += 1
+        elif sys.argv[i] == "--account-pool" and i + 1 < len(sys.argv):
+            account_pool_path = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--nodes" and i + 1 < len(sys.argv):
+            nodes_value = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--repeat" and i + 1 < len(sys.argv):
+            repeat = int(sys.argv[i + 1]) if sys.argv[i + 1].isdigit() else 0
+            i += 2
+        elif sys.argv[i] == "--only-failed":
+            options["only_failed"] = True
+            i += 1
+        elif sys.argv[i] == "--changed":
+            options["changed"] = True
+            i += 1
+        elif sys.argv[i] == "--offline":
+            scenario_runner.OFFLINE = True
+            i += 1
+        elif sys.argv[i] == "--assets":
+            use_assets = True
+            i += 1
+        elif sys.argv[i] == "--live":
+            use_live = True
+            i += 1
+        elif sys.argv[i] == "--manifest" and i + 1 < len(sys.argv):
+            manifest_path = sys.argv[i + 1]
+            i += 2
         else:
             positional.append(sys.argv[i])
             i += 1
@@ -386,25 +882,128 @@ if __name__ == "__main__":
     base_url = positional[1] if len(positional) > 1 else "https://instech.stg.3o3.co.kr"
     auth_path = positional[2] if len(positional) > 2 else "/tmp/instech_auth_state_stg.json"
 
-    output_path = "/tmp/instech_test_report.html"
-
-    if mode == "all":
+    output_path = REPORT_PATH
+    assets_dir = assets_dir_for(output_path) if use_assets else None
+    manifest_path = manifest_path or manifest_path_for(output_path)
+
+    if mode == "render":
+        # 실행 없이 매니페스트(generate_report.py all/single 이 리포트 옆에 저장)로 리포트만 생성
+        manifest_paths = positional[1:] or [manifest_path]
+        try:
+            report_html = render_manifests(manifest_paths, assets_dir=assets_dir)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(report_html)
+        print(f"Report generated: {output_path}")
+        print(f"File size: {os.path.getsize(output_path):,} bytes")
+        if assets_dir:
+            print(f"Assets: {assets_dir}/")
+        sys.exit(0)
+
+    if engine not in ENGINES:
+        print(f"Unknown engine: {engine} ({' | '.join(ENGINES)})")
+        sys.exit(1)
+    if options.get("wait", "event") not in ("event", "fixed"):
+        print(f"Unknown wait mode: {options['wait']} (event | fixed)")
+        sys.exit(1)
+    if options.get("network", DEFAULT_NETWORK_PROFILE) not in NETWORK_PROFILES:
+        print(f"Unknown network profile: {options['network']} ({' | '.join(NETWORK_PROFILES)})")
+        sys.exit(1)
+    if repeat < 1:
+        print("--repeat 는 1 이상의 정수여야 합니다.")
+        sys.exit(1)
+    accounts = None
+    if account_pool_path:
+        try:
+            accounts = load_account_pool(account_pool_path)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        print(f"계정 풀: {len(accounts)}개 ({', '.join(account['name'] for account in accounts)})")
+    nodes = None
+    if nodes_value:
+        try:
+            nodes = parse_nodes(nodes_value)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        if mode != "all":
+            print("[INFO] --nodes 는 all 모드에서만 적용됩니다.")
+        elif accounts:
+            print("[INFO] --nodes 에서는 --account-pool 을 적용하지 않습니다 (노드는 코디네이터의 인증 상태 1개로 실행).")
+    if any(options.get(key) for key in INCREMENTAL_MODES) and (mode not in ("all", "plan") or repeat > 1):
+        print("[INFO] --only-failed / --changed 는 all / plan 모드(반복 없음)에서만 적용됩니다.")
+    if har:
+        if har.get("mode") not in HAR_MODES:
+            print(f"Unknown HAR mode: {har.get('mode')} (record | replay)")
+            sys.exit(1)
+        options["har"] = har
+        if har["mode"] == "replay":
+            # 재생은 네트워크 없이 돌 수 있어야 하므로 시나리오도 로컬/캐시에서 읽음
+            scenario_runner.OFFLINE = True
+        print(f"HAR {har['mode']}: {har.get('dir') or HAR_DIR}/")
+        if options.get("share_prefix"):
+            print("[INFO] HAR 기록/재생은 시나리오별로 하므로 --share-prefix 는 적용되지 않습니다.")
+
+    if mode == "plan":
+        # 브라우저 / 인증 확인 / 리포트 없이 실행 계획만 출력 (이전 실행의 이벤트 로그도 건드리지 않음)
         feature = positional[3] if len(positional) > 3 else "age-calculation/"
-        report_html = generate_report(base_url, feature, auth_path, extra_vars=extra_vars or None, labels=labels or None)
-    elif mode == "single":
-        scenario_path = positional[3] if len(positional) > 3 else ""
-        if not scenario_path:
-            print("Usage: generate_report.py single <base_url> <auth_state_path> <scenario_path> [--var key=value]")
+        plan = plan_run(base_url, feature, extra_vars=extra_vars or None, labels=labels or None, engine=engine,
+                        options=options, repeat=repeat, accounts=accounts)
+        if plan is None:
             sys.exit(1)
-        report_html = generate_single_report(base_url, scenario_path, auth_path, extra_vars=extra_vars or None)
-    else:
-        print(f"Unknown mode: {mode}")
-        print("Usage:")
-        print("  generate_report.py all    <base_url> <auth_state_path> <feature_folder> [--var k=v] [--label l]")
-        print("  generate_report.py single <base_url> <auth_state_path> <scenario_path>  [--var k=v]")
+        print_plan(plan)
+        sys.exit(0)
+
+    # 진행 이벤트는 항상 JSONL 로 기록, --live 면 리포트도 실행 중에 갱신
+    events = EventLog()
+    options["events"] = events
+    if use_live:
+        live_report = LiveReport(output_path, base_url)
+        events.add_listener(live_report)
+        live_report.write()
+        print(f"Live report: {output_path} (실행 중 자동 새로고침)")
+
+    try:
+        if mode == "all":
+            feature = positional[3] if len(positional) > 3 else "age-calculation/"
+            report_html = generate_report(base_url, feature, auth_path, extra_vars=extra_vars or None,
+                                          labels=labels or None, engine=engine, options=options,
+                                          assets_dir=assets_dir, repeat=repeat, accounts=accounts, nodes=nodes,
+                                          manifest_path=manifest_path)
+        elif mode == "single":
+            scenario_path = positional[3] if len(positional) > 3 else ""
+            if not scenario_path:
+                print("Usage: generate_report.py single <base_url> <auth_state_path> <scenario_path> [--var key=value] [--engine sync|async|process] [--wait event|fixed] [--network off|trackers|fast] [--block-host pattern] [--har record|replay] [--har-dir path] [--har-strict] [--share-prefix] [--repeat N] [--account-pool path] [--nodes host:port,...] [--offline] [--assets] [--live] [--manifest path]")
+                sys.exit(1)
+            report_html = generate_single_report(base_url, scenario_path, auth_path, extra_vars=extra_vars or None,
+                                                 engine=engine, options=options, assets_dir=assets_dir, repeat=repeat,
+                                                 accounts=accounts, manifest_path=manifest_path)
+        else:
+            print(f"Unknown mode: {mode}")
+            print("Usage:")
+            print("  generate_report.py all    <base_url> <auth_state_path> <feature_folder[,...]> [--var k=v] [--label l] [--engine sync|async|process] [--wait event|fixed] [--network off|trackers|fast] [--block-host pattern] [--har record|replay] [--har-dir path] [--har-strict] [--share-prefix] [--repeat N] [--account-pool path] [--nodes host:port,...] [--only-failed] [--changed] [--offline] [--assets] [--live] [--manifest path]")
+            print("  generate_report.py plan   <base_url> <auth_state_path> <feature_folder[,...]> [--var k=v] [--label l] [--engine sync|async|process] [--wait event|fixed] [--repeat N] [--account-pool path] [--only-failed] [--changed] [--offline]")
+            print("  generate_report.py single <base_url> <auth_state_path> <scenario_path>  [--var k=v] [--engine sync|async|process] [--wait event|fixed] [--network off|trackers|fast] [--block-host pattern] [--har record|replay] [--har-dir path] [--har-strict] [--share-prefix] [--repeat N] [--account-pool path] [--nodes host:port,...] [--offline] [--assets] [--live] [--manifest path]")
+            print("  generate_report.py render [<manifest.json> ...] [--assets]   (기본: 마지막 실행의 매니페스트)")
+            sys.exit(1)
+    except AuthExpiredError as e:
+        print(f"\n{e.relogin_message()}")
+        events.close()
+        sys.exit(1)
+    except NodeError as e:
+        print(f"\n[ERROR] 노드 실행 실패: {e}")
+        events.close()
         sys.exit(1)
 
+    events.close()
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(report_html)
+    print(f"Events: {events.path}")
+    print(f"Manifest: {manifest_path} (render 모드로 다시 실행하지 않고 리포트 재생성)")
     print(f"Report generated: {output_path}")
     print(f"File size: {os.path.getsize(output_path):,} bytes")
+    if assets_dir:
+        print(f"Assets: {assets_dir}/")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+시나리오 브라우저 컨텍스트 네트워크 프로필
+- 검증에 쓰이지 않는 요청(분석/트래킹, 이미지/폰트 등)을 컨텍스트 단위 라우팅으로 차단
+- networkidle 대기가 빨리 끝나고 워커별 대역폭/CPU 사용이 줄어듦
+- 실행 단위: options["network"] (--network), 시나리오 단위: 시나리오 JSON "network" (실행 단위보다 우선)
+- HAR 기록/재생: options["har"] = {"mode": "record" | "replay", "dir": 경로, "strict": bool} (--har)
+  시나리오마다 <dir>/<시나리오 id>.har 하나. 재생 시 백엔드 없이 기록된 응답으로 실행
+
+프로필 값: 이름("off" | "trackers" | "fast") 또는 dict
+  {"blockTypes": ["image", ...], "blockHosts": ["*.example.com", ...]}
+  - blockHosts 에 매칭된 요청은 빈 200 응답으로 대체 (스크립트 onload 를 기다리는 코드가 깨지지 않도록)
+  - blockTypes 에 해당하는 리소스 타입은 abort
+"""
+
+import os
+import re
+
+# 분석/트래킹/광고 호스트 기본 차단 목록 (호스트명 기준, * 와일드카드)
+DEFAULT_BLOCK_HOSTS = (
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "*.googlesyndication.com",
+    "*.googleadservices.com",
+    "*.facebook.net",
+    "*.facebook.com",
+    "*.amplitude.com",
+    "*.mixpanel.com",
+    "*.segment.io",
+    "*.segment.com",
+    "*.hotjar.com",
+    "*.clarity.ms",
+    "*.braze.com",
+    "*.appsflyer.com",
+    "*.onelink.me",
+    "*.branch.io",
+    "*.sentry.io",
+    "*.datadoghq.com",
+    "*.browser-intake-datadoghq.com",
+    "*.channel.io",
+    "wcs.naver.net",
+)
+
+NETWORK_PROFILES = {
+    "off": {"blockTypes": [], "blockHosts": []},
+    "trackers": {"blockTypes": [], "blockHosts": list(DEFAULT_BLOCK_HOSTS)},
+    "fast": {"blockTypes": ["image", "media", "font"], "blockHosts": list(DEFAULT_BLOCK_HOSTS)},
+}
+DEFAULT_NETWORK_PROFILE = "trackers"
+
+HAR_DIR = os.path.expanduser("~/.cache/instech-scenario-test/har")
+HAR_MODES = ("record", "replay")
+
+STUB_CONTENT_TYPES = {
+    "script": "application/javascript",
+    "stylesheet": "text/css",
+    "document": "text/html",
+    "xhr": "application/json",
+    "fetch": "application/json",
+}
+
+
+def resolve_network_profile(options=None, scenario=None):
+    """실행 옵션 + 시나리오 설정으로 최종 프로필 dict 결정. 잘못된 이름이면 ValueError.
+    options["block_hosts"] 의 패턴은 어떤 프로필에든 추가된다.
+    """
+    options = options or {}
+    value = (scenario or {}).get("network") or options.get("network") or DEFAULT_NETWORK_PROFILE
+    if isinstance(value, str):
+        if value not in NETWORK_PROFILES:
+            raise ValueError(f"알 수 없는 네트워크 프로필: {value} ({' | '.join(NETWORK_PROFILES)})")
+        value = NETWORK_PROFILES[value]
+    profile = {
+        "blockTypes": list(value.get("blockTypes", [])),
+        "blockHosts": list(value.get("blockHosts", [])) + list(options.get("block_hosts", [])),
+    }
+    return profile
+
+
+def host_pattern(hosts):
+    """호스트 패턴 목록 → URL 정규식 (scheme://host[:port]/...). 패턴이 없으면 None"""
+    if not hosts:
+        return None
+    alternatives = []
+    for host in hosts:
+        # '*' 는 호스트 안에서만 매칭 (경로/쿼리로 넘어가지 않도록)
+        alternatives.append(re.escape(host).replace(r"\*", r"[^/?#:]*"))
+        if host.startswith("*."):
+            alternatives.append(re.escape(host[2:]))  # *.example.com 은 example.com 자체도 포함
+    return re.compile(r"^[a-z]+://(?:" + "|".join(alternatives) + r")(?::\d+)?(?:[/?#]|$)", re.IGNORECASE)
+
+
+def _stub(request):
+    return {"status": 200, "body": "", "content_type": STUB_CONTENT_TYPES.get(request.resource_type, "text/plain")}
+
+
+def apply_network_profile(ctx, profile):
+    """sync 컨텍스트에 라우팅 설치. 차단 대상이 아니면 route.fallback() 으로 다음 핸들러(HAR 등)에 넘김.
+    호스트 차단은 정규식 라우트라 매칭되는 요청만 가로채고, 리소스 타입 차단이 있을 때만 전체 요청을 가로챈다.
+    """
+    hosts = host_pattern(profile["blockHosts"])
+    block_types = set(profile["blockTypes"])
+
+    if block_types:
+        def on_route(route):
+            if route.request.resource_type in block_types:
+                route.abort()
+            else:
+                route.fallback()
+        ctx.route("**/*", on_route)
+
+    # 나중에 등록한 라우트가 먼저 호출됨 → 호스트 스텁이 타입 차단보다 우선
+    if hosts:
+        ctx.route(hosts, lambda route: route.fulfill(**_stub(route.request)))
+
+
+async def apply_network_profile_async(ctx, profile):
+    """apply_network_profile 의 async 버전"""
+    hosts = host_pattern(profile["blockHosts"])
+    block_types = set(profile["blockTypes"])
+
+    if block_types:
+        async def on_route(route):
+            if route.request.resource_type in block_types:
+                await route.abort()
+            else:
+                await route.fallback()
+        await ctx.route("**/*", on_route)
+
+    if hosts:
+        async def on_host(route):
+            await route.fulfill(**_stub(route.request))
+        await ctx.route(hosts, on_host)
+
+
+# ── HAR 기록/재생 ──
+
+def har_path(har, scenario_id):
+    return os.path.join(har.get("dir") or HAR_DIR, f"{scenario_id}.har")
+
+
+def har_replaying(options):
+    return ((options or {}).get("har") or {}).get("mode") == "replay"
+
+
+def har_missing_error(options, scenario_id):
+    """strict 재생인데 HAR 파일이 없으면 에러 메시지, 아니면 None (브라우저 컨텍스트 생성 전에 확인)"""
+    har = (options or {}).get("har")
+    if not har or har["mode"] != "replay" or not har.get("strict"):
+        return None
+    path = har_path(har, scenario_id)
+    if os.path.exists(path):
+        return None
+    return f"HAR 없음: {path} (--har record 로 먼저 기록)"
+
+
+def _har_route_args(har, scenario_id):
+    """route_from_har 인자. 재생할 HAR 이 없으면 None (실제 네트워크 사용)"""
+    path = har_path(har, scenario_id)
+    if har["mode"] == "record":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 컨텍스트를 닫을 때 파일로 기록됨. 응답 본문은 HAR 안에 포함 (시나리오당 파일 1개)
+        return {"har": path, "update": True, "update_content": "embed"}
+    if not os.path.exists(path):
+        print(f"  [WARN] HAR 없음, 실제 네트워크 사용: {path}")
+        return None
+    # strict: 기록에 없는 요청은 abort / 아니면 실제 네트워크로 fallback
+    return {"har": path, "not_found": "abort" if har.get("strict") else "fallback"}
+
+
+def apply_har(ctx, options, scenario_id):
+    """HAR 라우팅 설치. 네트워크 프로필보다 먼저 설치해야 프로필의 route.fallback() 이 HAR 로 넘어간다."""
+    har = (options or {}).get("har")
+    args = _har_route_args(har, scenario_id) if har else None
+    if args:
+        ctx.route_from_har(args.pop("har"), **args)
+
+
+async def apply_har_async(ctx, options, scenario_id):
+    """apply_har 의 async 버전"""
+    har = (options or {}).get("har")
+    args = _har_route_args(har, scenario_id) if har else None
+    if args:
+        await ctx.route_from_har(args.pop("har"), **args)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+공통 스텝 prefix 공유 실행 (--share-prefix)
+- 컴파일된 시나리오들을 앞부분 스텝이 같은 것끼리 prefix 트리로 묶음
+- 공유 구간은 한 번만 실행하고 상태를 스냅샷 → 갈래마다 새 컨텍스트로 포크해 이어서 실행
+- 실행기는 scenario_runner._run_prefix_forest (sync) / async_runner._run_prefix_forest (async)
+
+스냅샷 = storage state(쿠키, localStorage) + sessionStorage + window.__*_STORE__ 상태 + 현재 URL + 컨텍스트 init script
+포크 = 스냅샷으로 새 컨텍스트 생성 → 백엔드 부작용 스텝 재실행 → URL 이동 → store 복원
+
+공유 가능한 스텝은 SHAREABLE_ACTIONS 뿐. 클릭/입력 이후의 컴포넌트 내부 상태(체크박스, 입력값 등)는
+스냅샷으로 되살릴 수 없으므로 첫 DOM 조작 스텝에서 공유 구간이 끝난다.
+"""
+
+import json
+from urllib.parse import urlparse
+
+# 스냅샷으로 상태를 되살릴 수 있는 스텝 (DOM 조작 없음)
+SHAREABLE_ACTIONS = frozenset({
+    "loadState", "launchBrowser", "navigate", "waitForNavigation", "waitForUrl", "waitFor", "waitForTimeout",
+    "setSessionStorage", "injectStoreData", "fetchAndInjectUserInfo", "screenshot", "expect",
+    "cancelExistingCounsel",
+})
+# 백엔드 상태를 바꾸는 스텝 — 앞 갈래가 실행되면서 상태가 다시 바뀌므로 포크할 때마다 다시 실행
+REPLAY_ACTIONS = frozenset({"cancelExistingCounsel"})
+# 이것만으로는 포크 비용(컨텍스트 생성 + 페이지 이동)을 아낄 수 없는 스텝
+TRIVIAL_ACTIONS = frozenset({"loadState", "launchBrowser"})
+
+SHARED_SCREENSHOT_DIR = "/tmp/instech_shared_prefix"
+
+SNAPSHOT_JS = """() => {
+    const stores = {};
+    for (const key of Object.keys(window)) {
+        const store = /^__\\w+_STORE__$/.test(key) ? window[key] : null;
+        if (store && typeof store.getState === "function") {
+            try { stores[key] = JSON.parse(JSON.stringify(store.getState())); } catch (e) {}
+        }
+    }
+    let session = {};
+    try { session = Object.assign({}, sessionStorage); } catch (e) {}  // about:blank 등
+    return { session, stores };
+}"""
+
+# 복원할 store 가 페이지에 생길 때까지 대기 후 setState (함수 필드는 스냅샷에 없으므로 데이터만 덮어씀)
+STORES_READY_JS = "(names) => names.every((name) => window[name])"
+RESTORE_STORES_JS = """(stores) => {
+    for (const [key, state] of Object.entries(stores)) {
+        if (window[key] && typeof window[key].setState === "function") window[key].setState(state);
+    }
+}"""
+
+
+def restore_session_script(url, items):
+    """sessionStorage 복원 init script — 스냅샷과 같은 origin 에서, 아직 없는 키만 설정"""
+    parsed = urlparse(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    return f"""(() => {{
+    if (location.origin !== {json.dumps(origin)}) return;
+    const items = {json.dumps(items, ensure_ascii=False)};
+    for (const [key, value] of Object.entries(items)) {{
+        if (sessionStorage.getItem(key) === null) sessionStorage.setItem(key, value);
+    }}
+}})()"""
+
+
+class PrefixNode:
+    """prefix 트리 노드.
+    steps: 이 노드에서 한 번만 실행할 공유 스텝 (PlanStep)
+    children: 이어지는 하위 노드 / tasks: 이 노드 이후 나머지 스텝을 단독 실행할 태스크
+    """
+
+    def __init__(self, steps=()):
+        self.steps = list(steps)
+        self.children = []
+        self.tasks = []
+        self._index = {}
+
+    def continuations(self):
+        return self.children + self.tasks
+
+    def all_tasks(self):
+        found = list(self.tasks)
+        for child in self.children:
+            found.extend(child.all_tasks())
+        return found
+
+
+def shared_prefix_length(plan):
+    """plan 앞부분에서 공유 가능한 스텝 수"""
+    count = 0
+    for plan_step in plan.steps:
+        if plan_step.action not in SHAREABLE_ACTIONS:
+            break
+        count += 1
+    return count
+
+
+def _step_key(plan_step):
+    return json.dumps(dict(plan_step.step), sort_keys=True, ensure_ascii=False)
+
+
+def _insert(root, task):
+    node = root
+    plan = task["plan"]
+    for plan_step in plan.steps[:shared_prefix_length(plan)]:
+        key = _step_key(plan_step)
+        child = node._index.get(key)
+        if child is None:
+            child = PrefixNode([plan_step])
+            node._index[key] = child
+            node.children.append(child)
+        node = child
+    node.tasks.append(task)
+
+
+def _compress(node):
+    """갈래가 하나뿐인 노드 체인을 한 노드로 합침"""
+    while len(node.children) == 1 and not node.tasks:
+        child = node.children[0]
+        node.steps.extend(child.steps)
+        node.children = child.children
+        node.tasks = child.tasks
+    for child in node.children:
+        _compress(child)
+
+
+def _worth_sharing(steps):
+    return any(plan_step.action not in TRIVIAL_ACTIONS for plan_step in steps)
+
+
+def _split(node, roots, standalone, ancestors=()):
+    """공유해도 이득이 없는 노드는 풀어서 하위 갈래를 독립 루트로 올림 (조상 스텝은 하위 루트 앞에 붙임)"""
+    steps = list(ancestors) + node.steps
+    if len(node.all_tasks()) > 1 and _worth_sharing(steps):
+        node.steps = steps
+        roots.append(node)
+        return
+    standalone.extend(node.tasks)
+    for child in node.children:
+        _split(child, roots, standalone, steps)
+
+
+def build_prefix_forest(tasks, signature):
+    """컴파일된 태스크 → (공유 실행할 루트 노드 리스트, 단독 실행할 태스크 리스트).
+    signature(task): 컨텍스트 생성 조건(인증, 네트워크 프로필 등) — 같은 값끼리만 묶는다.
+    """
+    groups = {}
+    for task in tasks:
+        groups.setdefault(signature(task), []).append(task)
+
+    roots, standalone = [], []
+    for group in groups.values():
+        root = PrefixNode()
+        for task in group:
+            _insert(root, task)
+        _compress(root)
+        _split(root, roots, standalone)
+    return roots, standalone
+
+
+def step_range(nums):
+    """스텝 번호 목록 → 출력용 범위 (예: Step 1~3, Step 5)"""
+    return f"Step {nums[0]}" if nums[0] == nums[-1] else f"Step {nums[0]}~{nums[-1]}"
+
+
+def shared_screenshot_prefix(node):
+    return f"{SHARED_SCREENSHOT_DIR}/node_{id(node):x}"
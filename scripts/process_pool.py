@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+프로세스 풀 실행 엔진 (--engine process)
+- sync 엔진은 프로세스 1개 안의 스레드마다 브라우저를 띄워서, 스크린샷 인코딩/JSON/출력 같은 드라이버 쪽 Python 작업이
+  GIL 하나를 두고 경쟁하고, 워커 수도 호스트와 무관한 MAX_WORKERS 고정
+- 워커마다 별도 프로세스(spawn) + 브라우저 1개. 워커 수는 CPU 수 / 여유 메모리 / 워커당 메모리 추정치로 자동 결정
+- 실행 중 메모리가 부족하거나 부하가 높으면 새 태스크를 넘기지 않고 기다림 (실행 중인 태스크가 하나는 있도록 유지)
+- 워커 프로세스가 죽으면 그 프로세스가 잡고 있던 태스크만 실패 처리하고 남은 워커로 계속
+- 스텝 이벤트는 워커가 결과 큐로 보내고 부모가 EventLog 에 기록 (--live 진행 표시는 다른 엔진과 동일)
+- 스케줄러(scheduler.py) 모드: 잠금을 잡을 수 있는 태스크만 넘기고, 전처리 훅은 부모 프로세스에서 실행
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+from playwright.sync_api import sync_playwright
+
+from auth_preflight import AuthExpiredError, auth_storage_state, remember_auth_state
+from scenario_runner import (
+    _emit, _order_longest_first, _scenario_meta, compile_scenario, failure_result, launch_browser, lease_task,
+    run_scenario, run_setup_hook, skipped_result,
+)
+
+PROCESS_MEMORY_MB = 350  # 워커 1개 추정치: Python + Playwright 드라이버 + Chromium(컨텍스트 1개)
+MEMORY_RESERVE_MB = 1024  # OS / 다른 프로세스 몫으로 남겨둘 메모리
+LOAD_BACKOFF_RATIO = 1.5  # 1분 load average 가 CPU 수 × 이 값을 넘으면 새 태스크를 잠시 보류
+BACKOFF_POLL_SEC = 1.0
+TASK_FIELDS = ("scenario", "variables", "screenshot_prefix", "labels")  # plan(MappingProxyType)은 피클 불가 → 워커에서 컴파일
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# ── 호스트 자원 ──
+
+def cpu_count():
+    """이 프로세스가 쓸 수 있는 CPU 수 (affinity / 컨테이너 cpuset 반영)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def available_memory_mb():
+    """새 프로세스가 쓸 수 있는 메모리(MB). psutil 이 없으면 /proc/meminfo 의 MemAvailable, 알 수 없으면 None"""
+    if psutil:
+        return psutil.virtual_memory().available / 1024 / 1024
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def auto_workers(task_count=None):
+    """CPU / 여유 메모리 기준 워커 수 → (워커 수, 근거 문자열).
+    CPU: 드라이버/코디네이터 몫으로 1개를 남김. 메모리: (여유 - 예비) / 워커당 추정치
+    """
+    cpus = cpu_count()
+    limits = {"CPU": max(1, cpus - 1)}
+    memory = available_memory_mb()
+    if memory is not None:
+        limits["메모리"] = max(1, int((memory - MEMORY_RESERVE_MB) // PROCESS_MEMORY_MB))
+    if task_count:
+        limits["태스크"] = task_count
+    workers = min(limits.values())
+    memory_info = f", 여유 메모리 {memory / 1024:.1f}GB" if memory is not None else ""
+    reason = f"CPU {cpus}개{memory_info}, 워커당 {PROCESS_MEMORY_MB}MB → " + " / ".join(
+        f"{name} {value}" for name, value in limits.items())
+    return workers, reason
+
+
+def host_pressure():
+    """새 태스크를 보류해야 하는 이유 (메모리 부족 / 부하 과다). 여유가 있으면 None"""
+    memory = available_memory_mb()
+    if memory is not None and memory < MEMORY_RESERVE_MB + PROCESS_MEMORY_MB:
+        return f"여유 메모리 {memory:.0f}MB"
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+    if load > cpu_count() * LOAD_BACKOFF_RATIO:
+        return f"load average {load:.1f}"
+    return None
+
+
+# ── 워커 프로세스 ──
+
+class _ForwardedEvents:
+    """워커 프로세스의 options["events"] — 스텝 이벤트를 결과 큐로 보내 부모의 EventLog 에 기록 (None, type, fields).
+    scenario_start / scenario_end 는 부모가 배분 / 결과 수신 시점에 기록하므로 보내지 않음 (워커가 죽은 태스크도 기록되도록)
+    """
+
+    def __init__(self, result_q):
+        self.result_q = result_q
+
+    def emit(self, event_type, **fields):
+        if event_type == "step":
+            self.result_q.put((None, event_type, fields))
+
+
+def _process_worker(worker_id, task_q, result_q, auth_state_path, auth_state, options, account, forward_events=False):
+    """워커 프로세스 본체 — 브라우저 1개로 받은 태스크를 실행하고 (worker_id, index, 결과) 를 돌려줌. None 이면 종료.
+    forward_events: 부모에 EventLog 가 있으면 스텝 이벤트를 같은 결과 큐로 전달 (결과보다 먼저 도착)
+    """
+    if auth_state is not None:
+        remember_auth_state(auth_state_path, auth_state)
+    if forward_events:
+        options = dict(options, events=_ForwardedEvents(result_q))
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        while True:
+            item = task_q.get()
+            if item is None:
+                break
+            scenario = item["scenario"]
+            leased = item.get("account") or account  # 스케줄러 모드는 태스크마다 임대받은 계정이 따라옴
+            try:
+                if leased:
+                    task = lease_task(item, leased)
+                else:
+                    task = dict(item, plan=compile_scenario(scenario, item["variables"]))
+                result = run_scenario(browser, scenario, task["variables"],
+                                      leased["authState"] if leased else auth_state_path,
+                                      item["screenshot_prefix"], options=options, plan=task["plan"])
+                if leased:
+                    result["account"] = leased["name"]
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+                result = failure_result(scenario, "워커 에러", str(e))
+            result_q.put((worker_id, item["index"], result))
+        browser.close()
+
+
+# ── 디스패처 ──
+
+def _worker_options(options):
+    """워커로 넘길 실행 옵션 — EventLog 는 프로세스 간에 넘길 수 없으므로 제외 (워커에서 _ForwardedEvents 로 대체)"""
+    return {k: v for k, v in (options or {}).items() if k != "events"}
+
+
+def _lost_result(task, error):
+    result = failure_result(task["scenario"], "워커 프로세스", error)
+    if task["scenario"].get("round"):
+        result["round"] = task["scenario"]["round"]
+    return result
+
+
+def run_process_pool(tasks, auth_state_path, workers, options=None, accounts=None, scheduler=None, base_url=None):
+    """태스크를 워커 프로세스 workers 개로 실행 (긴 시나리오 우선). 결과는 태스크 순서.
+    accounts: 계정 풀 — 워커마다 계정 1개를 독점 (워커 수 = 계정 수)
+    scheduler: scheduler.ResourceScheduler — 순서/동시 실행을 스케줄러가 결정 (계정은 스케줄러가 태스크마다 임대)
+    """
+    if not tasks:
+        return []
+    if accounts and scheduler is None:
+        workers = len(accounts)
+    workers = max(1, min(workers, len(tasks)))
+    try:
+        auth_state = auth_storage_state(auth_state_path)
+    except AuthExpiredError:
+        auth_state = None  # 인증 시나리오가 없으면 파일이 없어도 됨 — 필요하면 워커에서 실패 처리
+    worker_options = _worker_options(options)
+    forward_events = bool(options and options.get("events"))
+
+    ctx = multiprocessing.get_context("spawn")  # 스레드/Playwright 상태를 fork 하지 않도록
+    result_q = ctx.Queue()
+    task_qs = [ctx.Queue() for _ in range(workers)]
+    procs = [
+        ctx.Process(target=_process_worker, daemon=True,
+                    args=(wid, task_qs[wid], result_q, auth_state_path, auth_state, worker_options,
+                          accounts[wid] if accounts and scheduler is None else None, forward_events))
+        for wid in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    def payload(task, index, account=None):
+        return dict({k: task[k] for k in TASK_FIELDS if k in task}, index=index, account=account)
+
+    if scheduler is None:
+        pending = _order_longest_first([payload(task, i) for i, task in enumerate(tasks)])
+        pending.reverse()  # pop() 이 가장 긴 태스크부터 꺼내도록
+    else:
+        pending = []
+    jobs = {}  # 태스크 index → 스케줄러 작업
+    results = {}
+    idle = set(range(workers))
+    assigned = {}  # worker_id → 실행 중인 태스크
+    backing_off = False
+
+    def finish(index, result):
+        results[index] = result
+        _emit(options, "scenario_end", id=result["id"], result=result)
+        if index in jobs:
+            scheduler.done(jobs.pop(index), result["status"] == "pass")
+
+    def has_pending():
+        return bool(pending) if scheduler is None else not scheduler.finished
+
+    def next_task():
+        """다음에 넘길 태스크. 스케줄러 모드에서 훅 / 건너뛸 태스크는 여기서 바로 처리"""
+        if scheduler is None:
+            return pending.pop() if pending else None
+        while True:
+            job = scheduler.next_ready()
+            if job is None:
+                return None
+            if job["kind"] == "hook":
+                if not job["skip"]:
+                    with sync_playwright() as p:
+                        run_setup_hook(p, job["hook"], base_url, auth_state_path, options)
+                scheduler.done(job, True)
+            elif job["skip"]:
+                print(f"\n  [SKIP] {job['task']['scenario'].get('name', '')}: {job['skip']}")
+                jobs[job["index"]] = job
+                finish(job["index"], skipped_result(job["task"], job["skip"]))
+            else:
+                jobs[job["index"]] = job
+                return payload(job["task"], job["index"], job["account"])
+
+    try:
+        while has_pending() or assigned:
+            idle = {wid for wid in idle if procs[wid].is_alive()}
+            while has_pending() and idle:
+                pressure = host_pressure()
+                if pressure and assigned:  # 실행 중인 게 없으면 보류하지 않음 (진행은 계속)
+                    if not backing_off:
+                        print(f"  [백오프] {pressure} — 새 태스크 보류 (실행 중 {len(assigned)}개)")
+                    backing_off = True
+                    break
+                if backing_off and not pressure:
+                    print("  [백오프] 해제 — 태스크 배분 재개")
+                    backing_off = False
+                task = next_task()
+                if task is None:
+                    break
+                wid = idle.pop()
+                assigned[wid] = task
+                _emit(options, "scenario_start", **_scenario_meta(task["scenario"]))
+                task_qs[wid].put(task)
+            if not assigned:
+                if not has_pending():
+                    break
+                if any(proc.is_alive() for proc in procs):
+                    # 워커는 남아 있고 지금 넘길 태스크만 없음 (백오프 / 스케줄러 대기) — 잠시 후 다시 배분
+                    time.sleep(BACKOFF_POLL_SEC)
+                    continue
+                while True:  # 살아 있는 워커가 없음
+                    task = next_task()
+                    if task is None:
+                        break
+                    finish(task["index"], _lost_result(task, "실행할 워커 프로세스가 없습니다"))
+                break
+            try:
+                message = result_q.get(timeout=BACKOFF_POLL_SEC)
+            except queue.Empty:
+                for wid in [w for w in assigned if not procs[w].is_alive()]:
+                    task = assigned.pop(wid)
+                    finish(task["index"], _lost_result(task, f"워커 프로세스가 종료됨 (exit {procs[wid].exitcode})"))
+                continue
+            if message[0] is None:  # 워커가 보낸 이벤트 (_ForwardedEvents)
+                _, event_type, fields = message
+                _emit(options, event_type, **fields)
+                continue
+            wid, index, result = message
+            assigned.pop(wid, None)
+            idle.add(wid)
+            finish(index, result)
+    finally:
+        for task_q in task_qs:
+            task_q.put(None)
+        deadline = time.monotonic() + 10
+        for proc in procs:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+    return [results[i] for i in range(len(tasks)) if i in results]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+실행 결과 매니페스트 — 시나리오를 다시 실행하지 않고 저장된 결과로 리포트를 다시 그리기 위한 파일
+- all / single 실행이 끝나면 리포트 옆에 결과 + 스크린샷 경로를 JSON 으로 저장 (기본 /tmp/instech_test_report.json)
+- 스크린샷은 매니페스트 옆 디렉토리에 하드링크(다른 파일시스템이면 복사)로 보관
+  → 다음 실행이 /tmp/scenario_* 를 지워도 매니페스트의 스크린샷은 남음
+- generate_report.py render 가 매니페스트 여러 개(샤드별 / 여러 번 나눠 돌린 실행)를 합쳐 리포트 1개로 렌더링
+
+형식 (MANIFEST_VERSION):
+  {"version": 1, "createdAt", "baseUrl", "title", "subtitle", "feature",
+   "entries": [{"result": 시나리오 결과, "screenshots": {"3": "x_screenshots/scenario_a_3.png", "4_error": ...}}]}
+  스크린샷 경로는 매니페스트 파일 기준 상대 경로 (디렉토리째 옮겨도 렌더링 가능)
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(output_path):
+    """리포트 HTML 옆에 둘 매니페스트 (/tmp/x.html → /tmp/x.json)"""
+    return os.path.splitext(output_path)[0] + ".json"
+
+
+def screenshots_dir_for(manifest_path):
+    """매니페스트 옆 스크린샷 디렉토리 (/tmp/x.json → /tmp/x_screenshots)"""
+    return os.path.splitext(manifest_path)[0] + "_screenshots"
+
+
+def _keep_file(src, dest):
+    """하드링크로 보관 (같은 파일시스템이면 복사 없이 즉시), 안 되면 복사"""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def write_manifest(manifest_path, results, screenshot_paths, base_url, title="", subtitle="", feature=None):
+    """결과 리스트 + 결과마다 {스텝 key: 스크린샷 경로} → 매니페스트 저장. 저장 실패는 경고만 출력하고 None 반환"""
+    shots_dir = screenshots_dir_for(manifest_path)
+    rel_dir = os.path.basename(shots_dir)
+    entries = []
+    try:
+        shutil.rmtree(shots_dir, ignore_errors=True)
+        os.makedirs(shots_dir)
+        for result, paths in zip(results, screenshot_paths):
+            shots = {}
+            for key, src in paths.items():
+                # 파일 이름에 시나리오 id 와 회차가 들어 있어 결과끼리 겹치지 않음
+                name = os.path.basename(src)
+                _keep_file(src, os.path.join(shots_dir, name))
+                shots[str(key)] = f"{rel_dir}/{name}"
+            entries.append({"result": result, "screenshots": shots})
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+            "baseUrl": base_url,
+            "title": title,
+            "subtitle": subtitle,
+            "feature": feature,
+            "entries": entries,
+        }
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        print(f"  [WARN] 결과 매니페스트 저장 실패 ({manifest_path}): {e}")
+        return None
+    return manifest_path
+
+
+def _screenshot_key(key):
+    # find_screenshot_paths 와 같은 key: 스텝 번호는 int, 에러 스크린샷은 "N_error"
+    return int(key) if key.isdigit() else key
+
+
+def load_manifest(manifest_path):
+    """매니페스트 로드 → dict (entries 의 스크린샷은 절대 경로로 변환). 없거나 형식이 다르면 ValueError"""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except OSError as e:
+        raise ValueError(f"매니페스트를 읽을 수 없습니다: {manifest_path} ({e.strerror})")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"매니페스트 JSON 오류: {manifest_path} ({e})")
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"지원하지 않는 매니페스트 버전: {manifest_path} (version {MANIFEST_VERSION} 만 지원)")
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for entry in manifest.get("entries", []):
+        entry["screenshots"] = {_screenshot_key(key): os.path.join(base_dir, rel)
+                                for key, rel in (entry.get("screenshots") or {}).items()}
+    manifest["path"] = manifest_path
+    return manifest
+
+
+def merge_manifests(manifests):
+    """매니페스트 여러 개 → (결과 리스트, 결과마다 스크린샷 경로, base_url).
+    같은 시나리오(같은 회차)가 여러 번 나오면 뒤에 준 매니페스트의 결과로 바꾼다 (실패만 다시 돌린 실행을 덮어쓰기).
+    순서는 처음 나온 위치 유지.
+    """
+    merged = {}
+    for manifest in manifests:
+        for entry in manifest.get("entries", []):
+            result = entry["result"]
+            merged[(result.get("id", result.get("name")), result.get("round"))] = entry
+    base_urls = []
+    for manifest in manifests:
+        if manifest.get("baseUrl") and manifest["baseUrl"] not in base_urls:
+            base_urls.append(manifest["baseUrl"])
+    entries = list(merged.values())
+    return [e["result"] for e in entries], [e["screenshots"] for e in entries], ", ".join(base_urls)
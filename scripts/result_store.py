@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+instech 시나리오 실행 결과 저장소 (SQLite)
+- run_all / 단일 실행이 끝날 때마다 실행·시나리오·스텝 결과를 누적 저장
+- 환경(dev/stg)별 통과율 추이, 느린 스텝, 실행 간 소요 시간 회귀를 조회
+- 시나리오 내용 해시 + 결과 전체를 같이 저장 → 증분 실행(--only-failed / --changed)이 이전 결과를 재사용
+- 최근 통과 실행의 스텝별 평균 소요 시간 → 실행 계획(generate_report.py plan)의 예상 시간
+
+사용법:
+  python3 result_store.py runs    [--env stg] [--limit 20]
+  python3 result_store.py trend   [scenario_id] [--env stg] [--limit 20]
+  python3 result_store.py slowest [--env stg] [--days 14] [--limit 20]
+  python3 result_store.py regress <기준> <비교> [--threshold 20] [--limit 20]
+      기준/비교: run id (숫자) 또는 환경 이름 (해당 환경 최근 REGRESS_WINDOW 회 평균)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+# /tmp 는 재부팅 시 지워지므로 추이 조회용 이력은 홈 캐시에 보관
+DB_PATH = os.path.expanduser("~/.cache/instech-scenario-test/results.sqlite3")
+REGRESS_WINDOW = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    base_url TEXT NOT NULL,
+    env TEXT NOT NULL,
+    feature TEXT,
+    labels TEXT,
+    engine TEXT,
+    wait_mode TEXT,
+    variables TEXT,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS scenario_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    scenario_id TEXT NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL,
+    duration REAL,
+    variables TEXT,
+    content_hash TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS step_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario_result_id INTEGER NOT NULL REFERENCES scenario_results(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    scenario_id TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    action TEXT,
+    desc TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    duration_ms INTEGER,
+    timing TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scenario_results_scenario ON scenario_results(scenario_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_step_results_scenario ON step_results(scenario_id, num, run_id);
+"""
+# 기존 DB 에 없는 컬럼 (CREATE TABLE IF NOT EXISTS 는 컬럼을 추가하지 않음)
+MIGRATIONS = {"scenario_results": {"content_hash": "TEXT", "result": "TEXT"}}
+
+
+def connect(path=DB_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    for table, columns in MIGRATIONS.items():
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, column_type in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+    return conn
+
+
+def content_hash(scenario, variables):
+    """시나리오 JSON + 최종 치환 변수의 해시. 둘 중 하나라도 바뀌면 다른 값 (회차 번호는 제외)"""
+    scenario = {k: v for k, v in scenario.items() if k != "round"}
+    payload = json.dumps({"scenario": scenario, "variables": variables or {}}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def environment(base_url):
+    """base_url → 환경 이름. instech.stg.3o3.co.kr → stg, 그 외에는 호스트명"""
+    host = urlparse(base_url).hostname or base_url
+    parts = host.split(".")
+    if len(parts) > 2 and parts[0] == "instech":
+        return parts[1]
+    return host
+
+
+def _step_duration_ms(step):
+    timing = step.get("timing") or {}
+    if "total" in timing:
+        return timing["total"]
+    return sum(timing.values()) if timing else None
+
+
+def record_run(results, base_url, feature=None, labels=None, engine=None, options=None, variables=None,
+               variables_by_id=None, hashes_by_id=None, path=DB_PATH):
+    """실행 결과 리스트를 저장하고 run id 반환. 저장 실패는 실행 결과에 영향을 주지 않도록 경고만 출력.
+    variables: 실행 단위 사용자 지정 변수 (--var), variables_by_id: 시나리오별 최종 치환 변수,
+    hashes_by_id: 시나리오별 content_hash. 이전 실행에서 재사용한 결과("reused")는 저장하지 않음
+    """
+    results = [r for r in results if not r.get("reused")]
+    if not results:
+        return None
+    variables_by_id = variables_by_id or {}
+    hashes_by_id = hashes_by_id or {}
+    passed = sum(1 for r in results if r["status"] == "pass")
+    try:
+        conn = connect(path)
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (started_at, base_url, env, feature, labels, engine, wait_mode, variables, passed,"
+                " failed, duration) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().isoformat(timespec="seconds"), base_url, environment(base_url), feature,
+                    json.dumps(labels or [], ensure_ascii=False), engine, (options or {}).get("wait", "event"),
+                    json.dumps(variables or {}, ensure_ascii=False),
+                    passed, len(results) - passed, round(sum(r.get("duration") or 0 for r in results), 2),
+                ),
+            ).lastrowid
+            for r in results:
+                scenario_row = conn.execute(
+                    "INSERT INTO scenario_results (run_id, scenario_id, name, status, duration, variables,"
+                    " content_hash, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, r.get("id", ""), r.get("name", ""), r["status"], r.get("duration"),
+                     json.dumps(variables_by_id.get(r.get("id")) or {}, ensure_ascii=False),
+                     hashes_by_id.get(r.get("id")), json.dumps(r, ensure_ascii=False, default=str)),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO step_results (scenario_result_id, run_id, scenario_id, num, action, desc, status,"
+                    " error, duration_ms, timing) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (scenario_row, run_id, r.get("id", ""), num, s.get("action"), s.get("desc"), s["status"],
+                         s.get("error"), _step_duration_ms(s), json.dumps(s.get("timing") or {}))
+                        for num, s in enumerate(r["steps"], 1)
+                    ],
+                )
+        conn.close()
+        return run_id
+    except sqlite3.Error as e:
+        print(f"  [WARN] 결과 저장 실패 ({path}): {e}")
+        return None
+
+
+# ── 조회 ──
+
+def previous_results(base_url, scenario_ids, path=DB_PATH):
+    """증분 실행용 — 같은 환경에서 시나리오마다 가장 최근 결과와 가장 최근 통과 결과.
+    반환 {scenario_id: {"latest": 이전 결과, "passed": 이전 통과 결과}} — 결과 dict 에 "reused"
+    ({"runId", "startedAt", "contentHash"}) 를 붙여 둠. 결과 JSON 이 저장된 실행만 대상, 조회 실패 시 {}
+    """
+    if not scenario_ids or not os.path.exists(path):
+        return {}
+    marks = ",".join("?" * len(scenario_ids))
+    query = f"""
+        SELECT s.scenario_id, s.content_hash, s.result, r.id AS run_id, r.started_at
+        FROM scenario_results s JOIN runs r ON r.id = s.run_id
+        WHERE s.id IN (
+            SELECT MAX(s2.id) FROM scenario_results s2 JOIN runs r2 ON r2.id = s2.run_id
+            WHERE r2.env = ? AND s2.result IS NOT NULL AND s2.scenario_id IN ({marks}) {{status_filter}}
+            GROUP BY s2.scenario_id
+        )
+    """
+    previous = {}
+    try:
+        conn = connect(path)
+        for kind, status_filter in (("latest", ""), ("passed", "AND s2.status = 'pass'")):
+            for row in conn.execute(query.format(status_filter=status_filter),
+                                    [environment(base_url)] + list(scenario_ids)):
+                result = {k: v for k, v in json.loads(row["result"]).items() if k != "round"}
+                result["reused"] = {"runId": row["run_id"], "startedAt": row["started_at"],
+                                    "contentHash": row["content_hash"]}
+                previous.setdefault(row["scenario_id"], {"latest": None, "passed": None})[kind] = result
+        conn.close()
+    except (sqlite3.Error, ValueError) as e:
+        print(f"  [WARN] 이전 결과 조회 실패 ({path}): {e} — 전체 실행")
+        return {}
+    return previous
+
+
+def step_duration_history(base_url, scenario_ids, wait_mode="event", window=REGRESS_WINDOW, path=DB_PATH):
+    """실행 계획(dry_run)용 — 같은 환경 / 대기 모드에서 시나리오마다 최근 window 회 통과 결과의 평균 소요 시간.
+    반환 {scenario_id: {"duration": 평균 초, "samples": 회수, "steps": {num: (action, 평균 ms)}}}, 이력/조회 실패 시 {}
+    """
+    if not scenario_ids or not os.path.exists(path):
+        return {}
+    marks = ",".join("?" * len(scenario_ids))
+    recent = f"""
+        WITH recent AS (
+            SELECT id, scenario_id, duration FROM (
+                SELECT s.id, s.scenario_id, s.duration,
+                       ROW_NUMBER() OVER (PARTITION BY s.scenario_id ORDER BY s.run_id DESC) AS rn
+                FROM scenario_results s JOIN runs r ON r.id = s.run_id
+                WHERE r.env = ? AND r.wait_mode = ? AND s.status = 'pass' AND s.scenario_id IN ({marks})
+            ) WHERE rn <= ?
+        )
+    """
+    params = [environment(base_url), wait_mode] + list(scenario_ids) + [window]
+    history = {}
+    try:
+        conn = connect(path)
+        for row in conn.execute(recent + """
+                SELECT scenario_id, AVG(duration) AS duration, COUNT(*) AS samples FROM recent GROUP BY scenario_id
+                """, params):
+            history[row["scenario_id"]] = {"duration": row["duration"], "samples": row["samples"], "steps": {}}
+        for row in conn.execute(recent + """
+                SELECT st.scenario_id, st.num, MAX(st.action) AS action, AVG(st.duration_ms) AS avg_ms
+                FROM step_results st WHERE st.scenario_result_id IN (SELECT id FROM recent)
+                AND st.duration_ms IS NOT NULL GROUP BY st.scenario_id, st.num
+                """, params):
+            history[row["scenario_id"]]["steps"][row["num"]] = (row["action"], row["avg_ms"])
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"  [WARN] 스텝 소요 시간 이력 조회 실패 ({path}): {e} — 정적 추정만 사용")
+        return {}
+    return history
+
+
+def list_runs(conn, env=None, limit=20):
+    sql = "SELECT * FROM runs"
+    params = []
+    if env:
+        sql += " WHERE env = ?"
+        params.append(env)
+    sql += " ORDER BY id DESC LIMIT ?"
+    return conn.execute(sql, params + [limit]).fetchall()
+
+
+def pass_rate_trend(conn, env=None, limit=20):
+    """시나리오별 전체/최근 limit 회 통과율과 평균 소요 시간"""
+    env_filter = "AND r.env = ?" if env else ""
+    params = [env] if env else []
+    return conn.execute(f"""
+        WITH ranked AS (
+            SELECT s.scenario_id, s.name, s.status, s.duration,
+                   ROW_NUMBER() OVER (PARTITION BY s.scenario_id ORDER BY s.run_id DESC) AS rn
+            FROM scenario_results s JOIN runs r ON r.id = s.run_id
+            WHERE 1 = 1 {env_filter}
+        )
+        SELECT scenario_id, MAX(name) AS name, COUNT(*) AS runs,
+               AVG(status = 'pass') AS pass_rate,
+               AVG(CASE WHEN rn <= ? THEN status = 'pass' END) AS recent_pass_rate,
+               AVG(CASE WHEN rn <= ? THEN duration END) AS recent_duration
+        FROM ranked GROUP BY scenario_id ORDER BY recent_pass_rate, scenario_id
+    """, params + [limit, limit]).fetchall()
+
+
+def scenario_history(conn, scenario_id, env=None, limit=20):
+    env_filter = "AND r.env = ?" if env else ""
+    params = [scenario_id] + ([env] if env else [])
+    return conn.execute(f"""
+        SELECT r.id AS run_id, r.started_at, r.env, s.status, s.duration,
+               (SELECT st.desc || COALESCE(': ' || st.error, '') FROM step_results st
+                WHERE st.scenario_result_id = s.id AND st.status = 'fail' LIMIT 1) AS failure
+        FROM scenario_results s JOIN runs r ON r.id = s.run_id
+        WHERE s.scenario_id = ? {env_filter}
+        ORDER BY r.id DESC LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def slowest_steps(conn, env=None, days=14, limit=20):
+    """기간 내 평균 소요 시간이 긴 스텝. 기간 전반/후반 평균을 같이 보여서 느려지는 추세를 확인."""
+    since = (datetime.now() - timedelta(days=days)).isoformat(timespec="seconds")
+    middle = (datetime.now() - timedelta(days=days / 2)).isoformat(timespec="seconds")
+    env_filter = "AND r.env = ?" if env else ""
+    params = [middle, middle, since] + ([env] if env else [])
+    return conn.execute(f"""
+        SELECT st.scenario_id, st.num, MAX(st.desc) AS desc, MAX(st.action) AS action, COUNT(*) AS samples,
+               AVG(st.duration_ms) AS avg_ms, MAX(st.duration_ms) AS max_ms,
+               AVG(CASE WHEN r.started_at < ? THEN st.duration_ms END) AS earlier_ms,
+               AVG(CASE WHEN r.started_at >= ? THEN st.duration_ms END) AS later_ms
+        FROM step_results st JOIN runs r ON r.id = st.run_id
+        WHERE r.started_at >= ? AND st.duration_ms IS NOT NULL {env_filter}
+        GROUP BY st.scenario_id, st.num
+        ORDER BY avg_ms DESC LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def _run_ids(conn, ref):
+    """regress 기준: run id 또는 환경 이름(최근 REGRESS_WINDOW 회)"""
+    if str(ref).isdigit():
+        return [int(ref)]
+    rows = conn.execute("SELECT id FROM runs WHERE env = ? ORDER BY id DESC LIMIT ?", (ref, REGRESS_WINDOW))
+    return [row["id"] for row in rows]
+
+
+def _avg_durations(conn, table, key_sql, value_col, run_ids):
+    marks = ",".join("?" * len(run_ids))
+    rows = conn.execute(
+        f"SELECT {key_sql} AS key, AVG({value_col}) AS value FROM {table}"
+        f" WHERE run_id IN ({marks}) AND status = 'pass' AND {value_col} IS NOT NULL GROUP BY key",
+        run_ids,
+    )
+    return {row["key"]: row["value"] for row in rows}
+
+
+def duration_regressions(conn, base_ref, target_ref, threshold_pct=20, limit=20):
+    """기준 대비 비교 대상에서 threshold_pct% 이상 느려진 시나리오/스텝 (통과한 실행만 비교).
+    반환: (시나리오 회귀 리스트, 스텝 회귀 리스트) — 각 항목 (key, 기준값, 비교값, 증가율%)
+    """
+    base_ids, target_ids = _run_ids(conn, base_ref), _run_ids(conn, target_ref)
+    if not base_ids or not target_ids:
+        raise ValueError(f"실행 기록 없음: {base_ref if not base_ids else target_ref}")
+
+    def compare(table, key_sql, value_col):
+        base = _avg_durations(conn, table, key_sql, value_col, base_ids)
+        target = _avg_durations(conn, table, key_sql, value_col, target_ids)
+        rows = []
+        for key, before in base.items():
+            after = target.get(key)
+            if after is None or not before:
+                continue
+            pct = (after - before) / before * 100
+            if pct >= threshold_pct:
+                rows.append((key, before, after, pct))
+        rows.sort(key=lambda row: row[2] - row[1], reverse=True)
+        return rows[:limit]
+
+    return (
+        compare("scenario_results", "scenario_id", "duration"),
+        compare("step_results", "scenario_id || ' #' || num || ' ' || COALESCE(desc, '')", "duration_ms"),
+    )
+
+
+# ── CLI ──
+
+def _pct(value):
+    return "-" if value is None else f"{value * 100:.0f}%"
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:,.0f}ms"
+
+
+def _print_runs(conn, env, limit):
+    for run in list_runs(conn, env, limit):
+        print(f"  #{run['id']:<5} {run['started_at']}  {run['env']:<6} {run['feature'] or '-':<20} "
+              f"{run['passed']}/{run['passed'] + run['failed']} 통과  {run['duration'] or 0:.1f}s  "
+              f"engine={run['engine'] or '-'} wait={run['wait_mode'] or '-'}")
+
+
+def _print_trend(conn, scenario_id, env, limit):
+    if scenario_id:
+        for row in scenario_history(conn, scenario_id, env, limit):
+            failure = f"  — {row['failure']}" if row["failure"] else ""
+            print(f"  #{row['run_id']:<5} {row['started_at']}  {row['env']:<6} {row['status'].upper():<4} "
+                  f"{row['duration'] or 0:.1f}s{failure}")
+        return
+    print(f"  {'통과율(최근)':>10} {'통과율(전체)':>10} {'실행':>4} {'평균(최근)':>9}  시나리오")
+    for row in pass_rate_trend(conn, env, limit):
+        print(f"  {_pct(row['recent_pass_rate']):>10} {_pct(row['pass_rate']):>10} {row['runs']:>4} "
+              f"{(row['recent_duration'] or 0):>8.1f}s  {row['scenario_id']}")
+
+
+def _print_slowest(conn, env, days, limit):
+    print(f"  {'평균':>9} {'최대':>9} {'전반':>9} {'후반':>9} {'표본':>4}  스텝")
+    for row in slowest_steps(conn, env, days, limit):
+        print(f"  {_ms(row['avg_ms']):>9} {_ms(row['max_ms']):>9} {_ms(row['earlier_ms']):>9} "
+              f"{_ms(row['later_ms']):>9} {row['samples']:>4}  {row['scenario_id']} #{row['num']} {row['desc'] or ''}")
+
+
+def _print_regressions(conn, base_ref, target_ref, threshold, limit):
+    scenarios, steps = duration_regressions(conn, base_ref, target_ref, threshold, limit)
+    print(f"[시나리오] {base_ref} → {target_ref} ({threshold}% 이상 느려짐)")
+    for key, before, after, pct in scenarios:
+        print(f"  {before:>7.1f}s → {after:>7.1f}s  (+{pct:.0f}%)  {key}")
+    if not scenarios:
+        print("  없음")
+    print("\n[스텝]")
+    for key, before, after, pct in steps:
+        print(f"  {_ms(before):>9} → {_ms(after):>9}  (+{pct:.0f}%)  {key}")
+    if not steps:
+        print("  없음")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "runs"
+
+    # --env, --limit, --days, --threshold, --db 파싱
+    flags = {"env": None, "limit": "20", "days": "14", "threshold": "20", "db": DB_PATH}
+    positional = []
+    i = 2
+    while i < len(sys.argv):
+        name = sys.argv[i][2:] if sys.argv[i].startswith("--") else None
+        if name in flags and i + 1 < len(sys.argv):
+            flags[name] = sys.argv[i + 1]
+            i += 2
+        else:
+            positional.append(sys.argv[i])
+            i += 1
+
+    if not os.path.exists(flags["db"]):
+        print(f"저장된 실행 결과가 없습니다: {flags['db']}")
+        sys.exit(1)
+    conn = connect(flags["db"])
+    limit = int(flags["limit"])
+
+    if command == "runs":
+        _print_runs(conn, flags["env"], limit)
+    elif command == "trend":
+        _print_trend(conn, positional[0] if positional else None, flags["env"], limit)
+    elif command == "slowest":
+        _print_slowest(conn, flags["env"], float(flags["days"]), limit)
+    elif command == "regress" and len(positional) == 2:
+        try:
+            _print_regressions(conn, positional[0], positional[1], float(flags["threshold"]), limit)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+    else:
+        print("Usage:")
+        print("  result_store.py runs    [--env stg] [--limit 20]")
+        print("  result_store.py trend   [scenario_id] [--env stg] [--limit 20]")
+        print("  result_store.py slowest [--env stg] [--days 14] [--limit 20]")
+        print("  result_store.py regress <run_id|env> <run_id|env> [--threshold 20] [--limit 20]")
+        sys.exit(1)
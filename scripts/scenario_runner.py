@@ -3,74 +3,346 @@
 instech 시나리오 범용 러너
 - 시나리오 JSON을 읽어서 모든 step을 자동으로 Playwright 코드로 변환/실행
 - 병렬 실행 지원 (MAX_WORKERS 설정 가능)
+- 실행 엔진 선택: sync (스레드 + 브라우저 N개) / async (async_runner.py, 브라우저 1개 + 컨텍스트 N개)
+  / process (process_pool.py, 프로세스 + 브라우저 N개, N은 CPU/메모리로 자동)
+- 상주 브라우저 데몬(browser_daemon.py)이 실행 중이면 Chromium을 새로 띄우지 않고 붙어서 사용
 """
 
 import glob
 import json
 import os
+import queue
 import re
+import shutil
+import threading
 import time
+import urllib.error
 import urllib.request
+from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from types import MappingProxyType
 from playwright.sync_api import sync_playwright
 
+from account_pool import ACCOUNT_VARIABLES
+from auth_preflight import AuthExpiredError, auth_storage_state, preflight_auth, remember_auth_state
+from browser_daemon import daemon_endpoint
+from event_log import EventLog
+from network_profile import (
+    NETWORK_PROFILES, apply_har, apply_network_profile, har_missing_error, har_replaying, resolve_network_profile,
+)
+from prefix_tree import (
+    REPLAY_ACTIONS, RESTORE_STORES_JS, SHARED_SCREENSHOT_DIR, SNAPSHOT_JS, STORES_READY_JS, PrefixNode,
+    build_prefix_forest, restore_session_script, shared_screenshot_prefix, step_range,
+)
+from result_store import content_hash, previous_results, record_run
+from scheduler import ResourceScheduler, declares_locks, leases_account
+
 SCENARIOS_BASE_URL = "https://hj8902.github.io/instech_scenarios/scenarios"
+SCENARIO_CACHE_DIR = "/tmp/instech_scenario_cache"  # 시나리오 JSON 로컬 캐시 (path 기준)
+LOCAL_SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scenarios")
+OFFLINE = False  # True면 네트워크 없이 로컬 scenarios/ 또는 캐시에서 읽음
+FETCH_WORKERS = 8  # 시나리오 JSON 병렬 fetch 수
 MAX_WORKERS = 4  # 최대 병렬 브라우저 컨텍스트 수
-ACTION_SETTLE_MS = 200  # React 상태 커밋 대기 (fill/blur/click/clear 후)
+ASYNC_MAX_CONCURRENCY = 20  # async 엔진: 브라우저 1개에서 동시에 여는 최대 컨텍스트 수
+ENGINES = ("sync", "async", "process")  # process: 워커마다 프로세스 + 브라우저 (process_pool.py, 워커 수 자동)
+INCREMENTAL_MODES = ("only_failed", "changed")  # 증분 실행 옵션 키 (--only-failed / --changed)
+ACTION_SETTLE_MS = 200  # React 상태 커밋 대기 (fill/blur/click/clear 후) — event 모드에서는 상한값
+DEFAULT_WAIT_MODE = "event"  # "event": 실제 신호(DOM/store/네트워크) 기반 대기, "fixed": 고정 sleep
+SETTLE_QUIET_MS = 50  # DOM 변경/store 커밋이 이 시간 동안 없으면 안정된 것으로 판단
+DURATIONS_PATH = "/tmp/instech_scenario_durations.json"  # 시나리오별 학습된 소요 시간
+# cancelExistingCounsel API 경로 — 실제 서비스에서 확인한 경로가 없으므로 기본은 화면에서 취소 (None).
+# 스텝의 historyApi / cancelApi, 또는 여기에 둘 다 지정했을 때만 API 로 먼저 시도 (전처리 훅은 여기 값만 사용)
+# 예: bench_app 대역 앱은 "/api/counsel/history" / "/api/counsel/cancel" ({"id": ...})
+COUNSEL_HISTORY_API = None
+COUNSEL_CANCEL_API = None
+COUNSEL_API_TIMEOUT_MS = 10000
+COUNSEL_API_MISSING_STATUSES = (404, 405, 501)  # 라우트 자체가 없다고 보는 응답 (프로세스 동안 화면 경로로 고정)
+# 화면의 "상담 취소하기" 버튼이 보이는 상태 (스텝의 cancellableStatuses 로 변경 가능). 상태 필드가 없는 항목은 취소 대상
+COUNSEL_CANCELLABLE_STATUSES = ("REQUESTED", "RECEIVED", "WAITING", "ASSIGNED", "SCHEDULED", "ACTIVE")
+GA_REQUEST_TIMEOUT_MS = 10000  # retryUntilGa: 클릭 후 available-ga 요청이 가로채질 때까지 최대 대기
+GA_POLL_MS = 20
 
 
 # ── JSON fetch ──
 
-def fetch_json(url):
-    # GitHub Pages CDN 캐시 우회
+def _cache_paths(path):
+    body_path = os.path.join(SCENARIO_CACHE_DIR, path)
+    return body_path, body_path + ".meta"
+
+
+def _read_cache(path):
+    """캐시된 (본문 dict, 메타 dict). 없으면 (None, {})"""
+    body_path, meta_path = _cache_paths(path)
+    try:
+        with open(body_path, encoding="utf-8") as f:
+            body = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    return body, meta
+
+
+def _write_cache(path, raw, headers):
+    body_path, meta_path = _cache_paths(path)
+    os.makedirs(os.path.dirname(body_path), exist_ok=True)
+    meta = {"etag": headers.get("ETag"), "lastModified": headers.get("Last-Modified")}
+    for target, content in ((body_path, raw), (meta_path, json.dumps(meta).encode("utf-8"))):
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, target)
+
+
+def _read_offline(path):
+    """오프라인 모드: 로컬 scenarios/ 디렉토리 → 캐시 순으로 조회"""
+    local_path = os.path.join(LOCAL_SCENARIOS_DIR, path)
+    if os.path.exists(local_path):
+        with open(local_path, encoding="utf-8") as f:
+            return json.load(f)
+    body, _ = _read_cache(path)
+    if body is None:
+        raise FileNotFoundError(f"오프라인 모드: 로컬/캐시에 없음 — {path}")
+    return body
+
+
+def fetch_json(path):
+    """SCENARIOS_BASE_URL 기준 path의 JSON을 가져온다.
+    캐시가 있으면 ETag/Last-Modified 조건부 요청 → 304면 캐시 사용.
+    네트워크 실패 시 캐시로 대체, OFFLINE이면 네트워크 없이 로컬/캐시만 사용.
+    """
+    if OFFLINE:
+        return _read_offline(path)
+
+    cached, meta = _read_cache(path)
+    headers = {"User-Agent": "scenario-runner"}
+    if cached is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("lastModified"):
+            headers["If-Modified-Since"] = meta["lastModified"]
+
+    # GitHub Pages CDN 캐시 우회 (조건부 요청은 원본 ETag 기준으로 검증됨)
     cache_bust = f"?_={int(time.time())}"
-    req = urllib.request.Request(url + cache_bust, headers={"User-Agent": "scenario-runner"})
-    with urllib.request.urlopen(req) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    req = urllib.request.Request(f"{SCENARIOS_BASE_URL}/{path}{cache_bust}", headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            raw = resp.read()
+            _write_cache(path, raw, resp.headers)
+            return json.loads(raw.decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            return cached
+        raise
+    except urllib.error.URLError as e:
+        if cached is not None:
+            print(f"  [WARN] 네트워크 실패, 캐시 사용: {path} ({e.reason})")
+            return cached
+        raise
 
 
 def fetch_index():
-    return fetch_json(f"{SCENARIOS_BASE_URL}/index.json")
+    return fetch_json("index.json")
 
 
 def fetch_scenario(path):
-    return fetch_json(f"{SCENARIOS_BASE_URL}/{path}")
+    return fetch_json(path)
+
+
+def fetch_scenarios(paths):
+    """여러 시나리오 JSON을 병렬로 가져와 {path: scenario} 반환"""
+    unique = list(dict.fromkeys(paths))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(unique))) as executor:
+        return dict(zip(unique, executor.map(fetch_scenario, unique)))
+
+
+# ── 브라우저 ──
+
+def launch_browser(p):
+    """상주 브라우저 데몬(browser_daemon.py)이 있으면 붙고, 없으면 headless Chromium을 새로 띄운다.
+    데몬에 붙은 경우 browser.close()는 이 연결에서 만든 컨텍스트만 닫고 데몬은 유지된다.
+    """
+    endpoint = daemon_endpoint()
+    if endpoint:
+        try:
+            return p.chromium.connect_over_cdp(endpoint)
+        except Exception as e:
+            print(f"  [WARN] 브라우저 데몬 연결 실패, 새로 실행: {e}")
+    return p.chromium.launch(headless=True)
 
 
 # ── 변수 치환 ──
 
-def substitute_variables(obj, variables):
-    """JSON 내의 {{변수명}} 패턴을 치환"""
+TEMPLATE_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def _render(obj, variables, missing=None):
+    """{{변수명}} 을 정규식 한 번으로 치환. 없는 변수는 그대로 두고 missing에 기록."""
     if isinstance(obj, str):
-        for key, value in variables.items():
-            obj = obj.replace(f"{{{{{key}}}}}", value)
-        return obj
+        if "{{" not in obj:
+            return obj
+
+        def replace(match):
+            name = match.group(1)
+            if name in variables:
+                return str(variables[name])
+            if missing is not None:
+                missing.add(name)
+            return match.group(0)
+
+        return TEMPLATE_RE.sub(replace, obj)
     if isinstance(obj, dict):
-        return {k: substitute_variables(v, variables) for k, v in obj.items()}
+        return {k: _render(v, variables, missing) for k, v in obj.items()}
     if isinstance(obj, list):
-        return [substitute_variables(item, variables) for item in obj]
+        return [_render(item, variables, missing) for item in obj]
     return obj
 
 
+def substitute_variables(obj, variables):
+    """JSON 내의 {{변수명}} 패턴을 치환"""
+    return _render(obj, variables)
+
+
+# ── 대기 (이벤트 기반) ──
+
+# DOM 변경(MutationObserver)과 window.__*_STORE__ 커밋(subscribe)이 quietMs 동안 없으면 resolve.
+# timeoutMs 에 도달하면 그대로 resolve (상한).
+SETTLE_JS = """({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    const started = performance.now();
+    const unsubscribes = [];
+    let quietTimer = null;
+    const observer = new MutationObserver(() => bump());
+    const done = () => {
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        observer.disconnect();
+        unsubscribes.forEach((unsubscribe) => { try { unsubscribe(); } catch (e) {} });
+        resolve(performance.now() - started);
+    };
+    const bump = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(done, quietMs);
+    };
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    for (const key of Object.keys(window)) {
+        const store = /^__\\w+_STORE__$/.test(key) ? window[key] : null;
+        if (store && typeof store.subscribe === "function") unsubscribes.push(store.subscribe(bump));
+    }
+    const capTimer = setTimeout(done, timeoutMs);
+    bump();
+})"""
+
+
+def _wait_mode(context):
+    return context.get("options", {}).get("wait", DEFAULT_WAIT_MODE)
+
+
+@contextmanager
+def _timed(context, bucket):
+    """블록 실행 시간을 context["timing"][bucket] 에 ms 단위로 누적.
+    중첩되면 바깥 블록의 버킷에만 누적한다 (같은 시간을 두 번 세지 않도록).
+    """
+    if context.get("timing_active"):
+        yield
+        return
+    context["timing_active"] = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        context["timing_active"] = False
+        timing = context.setdefault("timing", {})
+        timing[bucket] = timing.get(bucket, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def _glob_to_regex(pattern):
+    """Playwright URL glob(**, *)을 정규식으로 변환"""
+    escaped = re.escape(pattern).replace(r"\*\*", ".*").replace(r"\*", "[^/]*")
+    return re.compile(f"^{escaped}$")
+
+
+def _url_matches(url, pattern):
+    return bool(_glob_to_regex(pattern).match(url.split("?", 1)[0]))
+
+
+def attach_page_listeners(page, context):
+    """event 대기에 필요한 신호 수집: 진행 중인 fetch/xhr 수, 최근 응답 URL"""
+    context["inflight"] = 0
+    context["responses"] = []
+
+    def on_request(request):
+        if request.resource_type in ("fetch", "xhr"):
+            context["inflight"] += 1
+
+    def on_request_done(request):
+        if request.resource_type in ("fetch", "xhr"):
+            context["inflight"] = max(0, context["inflight"] - 1)
+
+    page.on("request", on_request)
+    page.on("requestfinished", on_request_done)
+    page.on("requestfailed", on_request_done)
+    page.on("response", lambda response: context["responses"].append(response.url))
+
+
+def _settle(page, context, cap_ms):
+    """DOM/store가 잠잠해지고 진행 중인 fetch/xhr가 끝날 때까지 대기 (최대 cap_ms)"""
+    deadline = time.monotonic() + cap_ms / 1000
+    try:
+        page.evaluate(SETTLE_JS, {"quietMs": SETTLE_QUIET_MS, "timeoutMs": cap_ms})
+    except Exception:
+        # 네비게이션으로 실행 컨텍스트가 교체된 경우 — 다음 스텝의 대기에 맡긴다
+        return
+    while context.get("inflight", 0) > 0 and time.monotonic() < deadline:
+        page.wait_for_timeout(50)
+
+
+def pause(page, context, fixed_ms):
+    """fixed 모드: fixed_ms 고정 대기. event 모드: 실제 신호로 안정될 때까지 대기하되 fixed_ms를 상한으로."""
+    with _timed(context, "wait"):
+        if _wait_mode(context) == "fixed":
+            page.wait_for_timeout(fixed_ms)
+        else:
+            _settle(page, context, fixed_ms)
+
+
+def wait_for_state(page, context, locator, state, fixed_ms):
+    """fixed 모드: fixed_ms 고정 대기. event 모드: locator가 state가 될 때까지 (최대 fixed_ms). 미충족은 무시."""
+    with _timed(context, "wait"):
+        if _wait_mode(context) == "fixed":
+            page.wait_for_timeout(fixed_ms)
+            return
+        try:
+            locator.wait_for(state=state, timeout=fixed_ms)
+        except Exception:
+            pass
+
+
 # ── 약관 동의 공통 처리 ──
 
-def handle_terms(page):
+def handle_terms(page, context=None):
     """약관 동의 바텀시트 처리 - 공통 패턴"""
-    page.wait_for_timeout(1000)
-    dialog = page.locator("[role='dialog'][aria-modal='true']")
+    context = context if context is not None else {}
+    dialog = page.locator(TERMS_DIALOG)
+    wait_for_state(page, context, dialog.first, "visible", 1000)
     if dialog.count() > 0 and dialog.first.is_visible():
         checkboxes = dialog.locator("input[type='checkbox']")
         for i in range(checkboxes.count()):
             cb = checkboxes.nth(i)
             if cb.is_visible() and not cb.is_checked():
                 cb.click(force=True)
-                page.wait_for_timeout(300)
+                pause(page, context, 300)
 
-        page.wait_for_timeout(500)
+        pause(page, context, 500)
         agree_btn = dialog.locator("button").last
         if agree_btn.is_visible() and agree_btn.is_enabled():
             agree_btn.click()
-            page.wait_for_timeout(1000)
+            wait_for_state(page, context, dialog.first, "hidden", 1000)
             return "약관 동의 완료"
         return "동의 버튼 비활성"
     return "약관 바텀시트 미노출 (이미 동의됨)"
@@ -78,412 +350,1171 @@ def handle_terms(page):
 
 # ── Step 실행 ──
 
-def execute_step(page, step, context):
-    """단일 step을 실행하고 결과를 반환"""
+def _desc(step):
+    return step.get("description", step.get("action", ""))
+
+
+def _pass(step):
+    return {"status": "pass", "desc": _desc(step)}
+
+
+def _fail(step, error):
+    return {"status": "fail", "desc": _desc(step), "error": error}
+
+
+# ── 엔진 공통 순수 로직 ──
+# sync 핸들러와 async_runner 핸들러가 같이 쓰는 셀렉터 / URL / 결과 조립.
+# 엔진별 핸들러에는 Playwright 호출(sync 는 그대로, async 는 await)과 대기만 남긴다.
+
+PAGE_TIMEOUT_MS = 10000  # 셀렉터/네비게이션 기본 타임아웃 (Playwright 기본 30초 → 단축)
+EXPECT_TIMEOUT_MS = 5000  # expect visible / disabled / enabled 대기
+WAIT_FOR_TIMEOUT_MS = 10000  # waitFor 스텝
+RESPONSE_FALLBACK_MS = 3000  # waitForResponse: fixed 모드 / urlPattern 없음 → 간이 대기
+LOGIN_PATH = "/web-login"  # 세션 만료 시 리다이렉트되는 경로
+TERMS_DIALOG = "[role='dialog'][aria-modal='true']"
+GA_ROUTE = "**/available-ga**"
+GA_CLICK_SELECTOR = "button:has-text('확인했어요')"
+GA_MAX_RETRIES = 20
+COUNSEL_HISTORY_PATH = "/car-insurance/history"
+COUNSEL_CANCEL_BUTTON = "button:has-text('상담 취소하기')"
+COUNSEL_MODAL = "[role='dialog'], [aria-modal='true']"
+COUNSEL_CONFIRM_BUTTON = "button:has-text('상담 취소')"
+COUNSEL_UI_MAX_CANCELS = 10
+
+
+def _unknown_step_result(step, handlers):
+    """컴파일되지 않은 step 의 action / expect type 확인 — 실행할 수 없으면 실패 결과, 아니면 None"""
     action = step.get("action", "")
-    desc = step.get("description", action)
-    screenshot_path = context.get("screenshot_path")
-    step_num = context.get("step_num", 0)
+    if action not in handlers:
+        return _fail(step, f"알 수 없는 action: {action}")
+    if action == "expect" and step.get("type", "") not in EXPECT_HANDLERS:
+        return _fail(step, f"알 수 없는 expect type: {step.get('type', '')}")
+    return None
+
+
+def _field_selector(step):
+    """fill / blur / clear 대상 (기본: 첫 input)"""
+    return step.get("selector", "input")
+
+
+def _navigate_result(step, url):
+    # 세션 만료 체크
+    if LOGIN_PATH in url:
+        return _fail(step, f"세션 만료 — {LOGIN_PATH}으로 리다이렉트됨")
+    return _pass(step)
+
+
+def _step_screenshot_target(context):
+    """screenshot 스텝 저장 경로 (스크린샷 prefix 가 없으면 None)"""
+    prefix = context.get("screenshot_path")
+    return f"{prefix}_{context.get('step_num', 0)}.png" if prefix else None
+
+
+def _expect_url_result(step, url):
+    value = step.get("value", "")
+    if value in url:
+        return _pass(step)
+    return _fail(step, f"URL 불일치: 기대 '{value}', 실제 '{url}'")
+
+
+def _selector_candidates(step):
+    """expect visible — 쉼표로 분리된 복수 셀렉터 (하나라도 visible 이면 통과)"""
+    return [s.strip() for s in step.get("selector", "").split(",")]
+
+
+def _visible_result(step, found):
+    return _pass(step) if found else _fail(step, f"셀렉터 미발견: {step.get('selector', '')}")
+
+
+def _hidden_result(step, visible):
+    return _fail(step, f"셀렉터가 여전히 visible: {step.get('selector', '')}") if visible else _pass(step)
+
+
+def _enabled_result(step, expect_enabled, enabled):
+    if enabled == expect_enabled:
+        return _pass(step)
+    expected, actual = ("enabled", "disabled") if expect_enabled else ("disabled", "enabled")
+    return _fail(step, f"기대: {expected}, 실제: {actual} — {step.get('selector', '')}")
+
+
+def _response_seen(context, url_pattern):
+    """직전 액션 이후 이미 도착한 응답인지 (waitForResponse 즉시 통과)"""
+    return any(_url_matches(url, url_pattern) for url in context.get("responses", []))
+
+
+def _session_storage_js(step):
+    return f"sessionStorage.setItem('{step.get('key', '')}', '{step.get('value', '')}')"
+
+
+def _auth_state_target(context):
+    return context.get("auth_state_path", "/tmp/instech_auth_state.json")
+
+
+def _manual_result(step):
+    print(f"  [수동] {step.get('instruction', '')}")
+    return {"status": "pass", "desc": f"{_desc(step)} (수동)"}
+
+
+def _step_noop(page, step, context):
+    # loadState: context 생성 시 이미 처리됨 / launchBrowser: 러너 레벨에서 처리
+    return _pass(step)
 
-    if action == "loadState":
-        # loadState는 context 생성 시 이미 처리됨
-        return {"status": "pass", "desc": desc}
 
-    elif action == "navigate":
-        url = step.get("url", "")
-        page.goto(url)
+def _step_navigate(page, step, context):
+    with _timed(context, "network"):
+        page.goto(step.get("url", ""))
         page.wait_for_load_state("networkidle")
-        # 세션 만료 체크
-        if "/web-login" in page.url:
-            return {"status": "fail", "desc": desc, "error": "세션 만료 — /web-login으로 리다이렉트됨"}
-        return {"status": "pass", "desc": desc}
-
-    elif action == "fill":
-        selector = step.get("selector", "input")
-        value = step.get("value", "")
-        el = page.locator(selector).first
-        el.fill(value)
-        page.wait_for_timeout(ACTION_SETTLE_MS)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "blur":
-        selector = step.get("selector", "input")
-        page.locator(selector).first.blur()
-        page.wait_for_timeout(ACTION_SETTLE_MS)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "clear":
-        selector = step.get("selector", "input")
-        page.locator(selector).first.fill("")
-        page.wait_for_timeout(ACTION_SETTLE_MS)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "click":
-        selector = step.get("selector", "")
-        page.locator(selector).first.click()
-        page.wait_for_timeout(ACTION_SETTLE_MS)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "screenshot":
-        if screenshot_path:
-            path = f"{screenshot_path}_{step_num}.png"
+    return _navigate_result(step, page.url)
+
+
+def _step_fill(page, step, context):
+    page.locator(_field_selector(step)).first.fill(step.get("value", ""))
+    pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+def _step_blur(page, step, context):
+    page.locator(_field_selector(step)).first.blur()
+    pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+def _step_clear(page, step, context):
+    page.locator(_field_selector(step)).first.fill("")
+    pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+def _step_click(page, step, context):
+    page.locator(step.get("selector", "")).first.click()
+    pause(page, context, ACTION_SETTLE_MS)
+    return _pass(step)
+
+
+def _step_screenshot(page, step, context):
+    path = _step_screenshot_target(context)
+    if path:
+        with _timed(context, "screenshot"):
             page.screenshot(path=path, full_page=True)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "expect":
-        expect_type = step.get("type", "")
-        if expect_type == "url":
-            value = step.get("value", "")
-            if value in page.url:
-                return {"status": "pass", "desc": desc}
-            else:
-                return {"status": "fail", "desc": desc, "error": f"URL 불일치: 기대 '{value}', 실제 '{page.url}'"}
-
-        elif expect_type == "visible":
-            selector = step.get("selector", "")
-            # 쉼표로 분리된 복수 셀렉터 중 하나라도 visible이면 통과
-            selectors = [s.strip() for s in selector.split(",")]
-            for sel in selectors:
-                try:
-                    loc = page.locator(sel).first
-                    loc.wait_for(state="visible", timeout=5000)
-                    return {"status": "pass", "desc": desc}
-                except Exception:
-                    continue
-            return {"status": "fail", "desc": desc, "error": f"셀렉터 미발견: {selector}"}
-
-        elif expect_type == "hidden":
-            selector = step.get("selector", "")
-            try:
-                loc = page.locator(selector)
-                if loc.count() == 0 or not loc.first.is_visible():
-                    return {"status": "pass", "desc": desc}
-                # 잠시 대기 후 재확인
-                page.wait_for_timeout(1000)
-                if loc.count() == 0 or not loc.first.is_visible():
-                    return {"status": "pass", "desc": desc}
-                return {"status": "fail", "desc": desc, "error": f"셀렉터가 여전히 visible: {selector}"}
-            except Exception:
-                return {"status": "pass", "desc": desc}
+    return _pass(step)
 
-        elif expect_type == "disabled":
-            selector = step.get("selector", "")
-            try:
-                loc = page.locator(selector).first
-                loc.wait_for(state="attached", timeout=5000)
-                if loc.is_disabled():
-                    return {"status": "pass", "desc": desc}
-                return {"status": "fail", "desc": desc, "error": f"기대: disabled, 실제: enabled — {selector}"}
-            except Exception as e:
-                return {"status": "fail", "desc": desc, "error": str(e)}
 
-        elif expect_type == "enabled":
-            selector = step.get("selector", "")
-            try:
-                loc = page.locator(selector).first
-                loc.wait_for(state="attached", timeout=5000)
-                if loc.is_enabled():
-                    return {"status": "pass", "desc": desc}
-                return {"status": "fail", "desc": desc, "error": f"기대: enabled, 실제: disabled — {selector}"}
-            except Exception as e:
-                return {"status": "fail", "desc": desc, "error": str(e)}
+def _expect_url(page, step, context):
+    return _expect_url_result(step, page.url)
+
+
+def _expect_visible(page, step, context):
+    for sel in _selector_candidates(step):
+        try:
+            page.locator(sel).first.wait_for(state="visible", timeout=EXPECT_TIMEOUT_MS)
+            return _visible_result(step, True)
+        except Exception:
+            continue
+    return _visible_result(step, False)
+
 
-    elif action == "waitForNavigation":
+def _is_shown(loc):
+    return loc.count() > 0 and loc.first.is_visible()
+
+
+def _expect_hidden(page, step, context):
+    try:
+        loc = page.locator(step.get("selector", ""))
+        if not _is_shown(loc):
+            return _pass(step)
+        # 사라질 때까지 잠시 대기 후 재확인
+        wait_for_state(page, context, loc.first, "hidden", 1000)
+        return _hidden_result(step, _is_shown(loc))
+    except Exception:
+        return _pass(step)
+
+
+def _expect_enabled_state(page, step, expect_enabled):
+    try:
+        loc = page.locator(step.get("selector", "")).first
+        loc.wait_for(state="attached", timeout=EXPECT_TIMEOUT_MS)
+        enabled = loc.is_enabled() if expect_enabled else not loc.is_disabled()
+        return _enabled_result(step, expect_enabled, enabled)
+    except Exception as e:
+        return _fail(step, str(e))
+
+
+def _expect_disabled(page, step, context):
+    return _expect_enabled_state(page, step, False)
+
+
+def _expect_enabled(page, step, context):
+    return _expect_enabled_state(page, step, True)
+
+
+EXPECT_HANDLERS = {
+    "url": _expect_url,
+    "visible": _expect_visible,
+    "hidden": _expect_hidden,
+    "disabled": _expect_disabled,
+    "enabled": _expect_enabled,
+}
+
+
+def _step_expect(page, step, context):
+    return EXPECT_HANDLERS[step.get("type", "")](page, step, context)
+
+
+def _step_wait_for_navigation(page, step, context):
+    with _timed(context, "network"):
         page.wait_for_load_state("networkidle")
-        return {"status": "pass", "desc": desc}
-
-    elif action == "waitFor":
-        selector = step.get("selector", "")
-        state = step.get("state", "visible")
-        page.locator(selector).first.wait_for(state=state, timeout=10000)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "waitForResponse":
-        url_pattern = step.get("urlPattern", "")
-        page.wait_for_timeout(3000)  # 간이 대기
-        return {"status": "pass", "desc": desc}
-
-    elif action == "waitForTimeout":
-        timeout = step.get("timeout", 1000)
-        page.wait_for_timeout(timeout)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "waitForUrl":
-        pattern = step.get("pattern", "")
-        exclude = step.get("exclude", "")
-        timeout = step.get("timeout", 30000)
-        if exclude:
-            page.wait_for_url(
-                lambda url, p=pattern, e=exclude: re.search(p.replace("**", ".*"), url) and e not in url,
-                timeout=timeout
-            )
-        else:
-            page.wait_for_url(lambda url, p=pattern: re.search(p.replace("**", ".*"), url), timeout=timeout)
-        return {"status": "pass", "desc": desc}
-
-    elif action == "handleTermsAgreement":
-        required = step.get("required", False)
-        result_msg = handle_terms(page)
-        if "비활성" in result_msg:
-            return {"status": "fail", "desc": f"{desc} — {result_msg}"}
-        if "미노출" in result_msg and required:
-            return {"status": "fail", "desc": f"{desc} — 바텀시트가 나타나야 하나 미노출 (required=true)"}
-        return {"status": "pass", "desc": f"{desc} — {result_msg}"}
-
-    elif action == "injectStoreData":
-        store = step.get("store", "")
-        data = step.get("data", {})
-        store_var = f"__{'COUNSEL' if store == 'COUNSEL' else store}_STORE__"
-        js_data = json.dumps(data)
-        page.evaluate(f"""() => {{
+    return _pass(step)
+
+
+def _step_wait_for(page, step, context):
+    with _timed(context, "wait"):
+        page.locator(step.get("selector", "")).first.wait_for(state=step.get("state", "visible"),
+                                                              timeout=WAIT_FOR_TIMEOUT_MS)
+    return _pass(step)
+
+
+def _step_wait_for_response(page, step, context):
+    url_pattern = step.get("urlPattern", "")
+    if _wait_mode(context) == "fixed" or not url_pattern:
+        with _timed(context, "wait"):
+            page.wait_for_timeout(RESPONSE_FALLBACK_MS)  # 간이 대기
+        return _pass(step)
+    if not _response_seen(context, url_pattern):
+        with _timed(context, "network"):
+            page.wait_for_event("response", predicate=lambda r: _url_matches(r.url, url_pattern),
+                                timeout=step.get("timeout", 10000))
+    return _pass(step)
+
+
+def _step_wait_for_timeout(page, step, context):
+    timeout = step.get("timeout", 1000)
+    if step.get("fixed"):
+        with _timed(context, "wait"):
+            page.wait_for_timeout(timeout)
+    else:
+        pause(page, context, timeout)
+    return _pass(step)
+
+
+def _url_predicate(step):
+    pattern = step.get("pattern", "")
+    exclude = step.get("exclude", "")
+    regex = re.compile(pattern.replace("**", ".*"))
+    if exclude:
+        return lambda url: bool(regex.search(url)) and exclude not in url
+    return lambda url: bool(regex.search(url))
+
+
+def _step_wait_for_url(page, step, context):
+    with _timed(context, "network"):
+        page.wait_for_url(_url_predicate(step), timeout=step.get("timeout", 30000))
+    return _pass(step)
+
+
+def _terms_result(step, result_msg):
+    desc = _desc(step)
+    if "비활성" in result_msg:
+        return {"status": "fail", "desc": f"{desc} — {result_msg}"}
+    if "미노출" in result_msg and step.get("required", False):
+        return {"status": "fail", "desc": f"{desc} — 바텀시트가 나타나야 하나 미노출 (required=true)"}
+    return {"status": "pass", "desc": f"{desc} — {result_msg}"}
+
+
+def _step_handle_terms(page, step, context):
+    return _terms_result(step, handle_terms(page, context))
+
+
+def _store_var(step):
+    store = step.get("store", "")
+    return f"__{'COUNSEL' if store == 'COUNSEL' else store}_STORE__"
+
+
+def _inject_store_js(step):
+    return f"""() => {{
+        const store = window.{_store_var(step)};
+        if (store) store.setState({json.dumps(step.get("data", {}))});
+    }}"""
+
+
+def _inject_user_info_js(step):
+    store_var = _store_var(step)
+    js_data = json.dumps(step.get("userData"), ensure_ascii=False)
+    return f"""() => {{
+        try {{
             const store = window.{store_var};
-            if (store) store.setState({js_data});
-        }}""")
-        return {"status": "pass", "desc": desc}
-
-    elif action == "fetchAndInjectUserInfo":
-        store = step.get("store", "")
-        store_var = f"__{'COUNSEL' if store == 'COUNSEL' else store}_STORE__"
-        user_data = step.get("userData")
-        if not user_data:
-            return {"status": "fail", "desc": desc, "error": "userData 필드가 없습니다. 시나리오에 userData를 추가하세요."}
-        js_data = json.dumps(user_data, ensure_ascii=False)
-        result = page.evaluate(f"""() => {{
-            try {{
-                const store = window.{store_var};
-                if (!store) return {{ error: 'window.{store_var} not found' }};
-                store.setState({{ userInfo: {js_data} }});
-                return {{ ok: true }};
-            }} catch (e) {{
-                return {{ error: String(e) }};
-            }}
-        }}""")
-        if result and result.get("error"):
-            return {"status": "fail", "desc": f"{desc} — {result['error']}"}
-        name = user_data.get("name", "?")
-        gender = user_data.get("gender", "(없음)")
-        return {"status": "pass", "desc": f"{desc} [name={name}, gender={gender or '(없음)'}]"}
-
-    elif action == "setSessionStorage":
-        key = step.get("key", "")
-        value = step.get("value", "")
-        if page.url == "about:blank":
-            # 아직 navigate 전 — init script로 등록하면 다음 페이지 JS 실행 전에 설정됨
-            context["browser_context"].add_init_script(f"sessionStorage.setItem('{key}', '{value}')")
-        else:
-            page.evaluate(f"sessionStorage.setItem('{key}', '{value}')")
-        return {"status": "pass", "desc": desc}
+            if (!store) return {{ error: 'window.{store_var} not found' }};
+            store.setState({{ userInfo: {js_data} }});
+            return {{ ok: true }};
+        }} catch (e) {{
+            return {{ error: String(e) }};
+        }}
+    }}"""
+
+
+def _user_info_result(step, result):
+    desc = _desc(step)
+    if result and result.get("error"):
+        return {"status": "fail", "desc": f"{desc} — {result['error']}"}
+    user_data = step.get("userData")
+    name = user_data.get("name", "?")
+    gender = user_data.get("gender", "(없음)")
+    return {"status": "pass", "desc": f"{desc} [name={name}, gender={gender or '(없음)'}]"}
+
+
+def _step_inject_store_data(page, step, context):
+    page.evaluate(_inject_store_js(step))
+    return _pass(step)
+
+
+def _missing_user_data(step):
+    if step.get("userData"):
+        return None
+    return _fail(step, "userData 필드가 없습니다. 시나리오에 userData를 추가하세요.")
+
+
+def _step_fetch_and_inject_user_info(page, step, context):
+    return _missing_user_data(step) or _user_info_result(step, page.evaluate(_inject_user_info_js(step)))
+
+
+def _step_set_session_storage(page, step, context):
+    script = _session_storage_js(step)
+    if page.url == "about:blank":
+        # 아직 navigate 전 — init script로 등록하면 다음 페이지 JS 실행 전에 설정됨
+        context["browser_context"].add_init_script(script)
+        context.setdefault("init_scripts", []).append(script)  # 공유 prefix 포크 시 다시 등록
+    else:
+        page.evaluate(script)
+    return _pass(step)
+
+
+def _step_save_state(page, step, context):
+    path = _auth_state_target(context)
+    remember_auth_state(path, context["browser_context"].storage_state(path=path))
+    return _pass(step)
+
+
+def _target_ga_id(step):
+    """targetGaCompanyId → int. 변수 치환 후 문자열이 되므로 변환 (API 응답은 정수). 실패 시 에러 결과 반환."""
+    raw = step.get("targetGaCompanyId")
+    if not raw:
+        return None, {"status": "fail", "desc": _desc(step), "error": "targetGaCompanyId가 지정되지 않았습니다."}
+    try:
+        return int(raw), None
+    except (ValueError, TypeError):
+        return None, {"status": "fail", "desc": _desc(step), "error": f"targetGaCompanyId가 숫자가 아닙니다: {raw}"}
+
+
+def _ga_attempt(response_data, started):
+    """available-ga 시도 1회 기록 — 배정된 GA + 요청 지연(ms)"""
+    return {"gaCompanyId": response_data.get("gaCompanyId"), "gaCompanyName": response_data.get("gaCompanyName", ""),
+            "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def _ga_result(step, target_ga_id, attempts, clicks, max_retries):
+    """retryUntilGa 결과 — attempts(시도별 GA/지연)를 결과에 남긴다"""
+    desc = _desc(step)
+    latencies = [a["ms"] for a in attempts if "ms" in a]
+    latency = f", 시도 평균 {sum(latencies) / len(latencies):.0f}ms" if latencies else ""
+    last = attempts[-1] if attempts else {}
+    if last.get("gaCompanyId") == target_ga_id:
+        return {"status": "pass", "attempts": attempts,
+                "desc": f"{desc} — {len(attempts)}회차에 GA 매칭 (id={target_ga_id}, {last['gaCompanyName']})"
+                        f" [클릭 {clicks}회{latency}]"}
+    error = f"{max_retries}회 시도 후 원하는 GA(id={target_ga_id})를 배정받지 못함{latency}"
+    if last.get("error"):
+        error += f" — 마지막 에러: {last['error']}"
+    return {"status": "fail", "desc": desc, "error": error, "attempts": attempts}
+
+
+def _ga_options(step):
+    """retryUntilGa → (최대 시도 수, 클릭 셀렉터)"""
+    return step.get("maxRetries", GA_MAX_RETRIES), step.get("clickSelector", GA_CLICK_SELECTOR)
+
+
+def _ga_matched(attempts, target_ga_id):
+    return bool(attempts) and attempts[-1].get("gaCompanyId") == target_ga_id
+
+
+def _log_ga_mismatch(attempts, max_retries):
+    found = attempts[-1]
+    print(f"    [{len(attempts)}/{max_retries}] GA 불일치: id={found['gaCompanyId']} ({found['gaCompanyName']})")
+
+
+def _ga_click_failed(step, error, attempts):
+    return {"status": "fail", "desc": _desc(step), "error": f"클릭 실패: {error}", "attempts": attempts}
+
 
-    elif action == "saveState":
-        path = context.get("auth_state_path", "/tmp/instech_auth_state.json")
-        context["browser_context"].storage_state(path=path)
-        return {"status": "pass", "desc": desc}
+def _ga_request_timeout(step, attempts):
+    return {"status": "fail", "desc": _desc(step), "attempts": attempts,
+            "error": f"클릭 후 {GA_REQUEST_TIMEOUT_MS}ms 안에 available-ga 요청 없음"}
 
-    elif action == "launchBrowser":
-        # 브라우저 재실행은 러너 레벨에서 처리
-        return {"status": "pass", "desc": desc}
 
-    elif action == "retryUntilGa":
-        target_ga_id_raw = step.get("targetGaCompanyId")
-        max_retries = step.get("maxRetries", 20)
-        click_selector = step.get("clickSelector", "button:has-text('확인했어요')")
+def _ga_replay_missing(step, error):
+    return _fail(step, f"기록된 available-ga 응답 없음: {error}")
 
-        if not target_ga_id_raw:
-            return {"status": "fail", "desc": desc, "error": "targetGaCompanyId가 지정되지 않았습니다."}
 
-        # 변수 치환 후 문자열이 되므로 int 변환 (API 응답은 정수)
+def _ga_replay_result(step, target_ga_id, data):
+    """HAR 재생 모드 — 기록된 available-ga 응답(data)이 대상 GA 인지"""
+    if data.get("gaCompanyId") != target_ga_id:
+        return _fail(step, f"기록된 GA(id={data.get('gaCompanyId')})가 대상(id={target_ga_id})과 다름 — HAR 을 다시 기록하세요")
+    return {"status": "pass",
+            "desc": f"{_desc(step)} — HAR 재생 GA 매칭 (id={target_ga_id}, {data.get('gaCompanyName', '')})"}
+
+
+def _step_retry_until_ga(page, step, context):
+    """대상 GA 가 배정될 때까지 available-ga 재시도.
+    라우트를 한 번만 설치하고, 가로챈 요청을 핸들러 안에서 route.fetch() 로 다시 보내며 대상 GA 를 찾는다
+    (시도마다 화면 클릭/대기 없음). 매칭되면 그 응답을 전달하고(onSuccess → complete 이동), maxRetries 를
+    다 쓰면 abort(onError → 바텀시트 유지). 핸들러가 에러로 끝나면 남은 횟수만큼 다시 클릭한다.
+    """
+    max_retries, click_selector = _ga_options(step)
+    target_ga_id, error = _target_ga_id(step)
+    if error:
+        return error
+    if har_replaying(context["options"]):
+        return _retry_until_ga_replay(page, step, context, target_ga_id, click_selector)
+
+    attempts = []
+    handled = []  # 핸들러 처리 완료 횟수 (클릭 1번 = available-ga 요청 1번)
+
+    def handle_route(route):
         try:
-            target_ga_id = int(target_ga_id_raw)
-        except (ValueError, TypeError):
-            return {"status": "fail", "desc": desc, "error": f"targetGaCompanyId가 숫자가 아닙니다: {target_ga_id_raw}"}
-
-        for attempt in range(1, max_retries + 1):
-            matched = [False]
-            ga_id_found = [None]
-            ga_name_found = [None]
-
-            def handle_route(route):
-                """available-ga 응답을 인터셉트하여 GA ID 확인.
-                매칭 시 응답을 그대로 전달 (→ onSuccess → complete 이동).
-                불일치 시 abort (→ onError → ConfirmBottomSheet 유지 → 재클릭).
-                """
-                try:
-                    response = route.fetch()
-                    body = response.json()
-                    ga_id = body.get("data", {}).get("gaCompanyId")
-                    ga_name_found[0] = body.get("data", {}).get("gaCompanyName", "")
-                    ga_id_found[0] = ga_id
-                    if ga_id == target_ga_id:
-                        matched[0] = True
-                        route.fulfill(response=response)
-                    else:
-                        route.abort()
-                except Exception:
-                    route.abort()
-
-            page.route("**/available-ga**", handle_route)
+            while len(attempts) < max_retries:
+                started = time.perf_counter()
+                response = route.fetch()
+                attempts.append(_ga_attempt(response.json().get("data", {}), started))
+                if _ga_matched(attempts, target_ga_id):
+                    route.fulfill(response=response)
+                    return
+                _log_ga_mismatch(attempts, max_retries)
+            route.abort()
+        except Exception as e:
+            attempts.append({"error": str(e)})
+            try:
+                route.abort()
+            except Exception:
+                pass
+        finally:
+            handled.append(True)
 
+    clicks = 0
+    page.route(GA_ROUTE, handle_route)
+    try:
+        while len(attempts) < max_retries:
+            before = len(handled)
             try:
                 page.locator(click_selector).first.click()
-                page.wait_for_timeout(1500)
             except Exception as e:
-                page.unroute("**/available-ga**")
-                return {"status": "fail", "desc": desc, "error": f"클릭 실패: {e}"}
+                return _ga_click_failed(step, e, attempts)
+            clicks += 1
+            # 고정 대기 대신 핸들러가 요청을 처리할 때까지 대기
+            deadline = time.monotonic() + GA_REQUEST_TIMEOUT_MS / 1000
+            with _timed(context, "network"):
+                while len(handled) == before and time.monotonic() < deadline:
+                    page.wait_for_timeout(GA_POLL_MS)
+            if len(handled) == before:
+                return _ga_request_timeout(step, attempts)
+            if _ga_matched(attempts, target_ga_id):
+                pause(page, context, 1500)  # complete 이동
+                break
+            pause(page, context, 500)  # onError 후 바텀시트 재활성화
+    finally:
+        page.unroute(GA_ROUTE)
+    return _ga_result(step, target_ga_id, attempts, clicks, max_retries)
+
+
+def _retry_until_ga_replay(page, step, context, target_ga_id, click_selector):
+    """HAR 재생 모드: route.fetch() 는 HAR 을 거치지 않고 실제 네트워크로 나가므로 인터셉트하지 않고
+    기록된 available-ga 응답을 그대로 확인한다. 재생 응답은 매번 같으므로 1회만 시도."""
+    try:
+        with page.expect_response(GA_ROUTE) as response_info:
+            page.locator(click_selector).first.click()
+        data = response_info.value.json().get("data", {})
+    except Exception as e:
+        return _ga_replay_missing(step, e)
+    pause(page, context, 1500)
+    return _ga_replay_result(step, target_ga_id, data)
+
+
+# ── 기존 상담 취소 (cancelExistingCounsel) ──
+# 기본: 이력 화면에서 버튼을 눌러 취소.
+# API 경로를 지정한 경우만 빠른 경로: 저장된 인증 상태를 쓰는 APIRequestContext 로 상담 목록 조회 → 취소할 수 있는 상태의
+# 상담만 건별 취소. 응답이 예상과 다르면(HTTP 오류, JSON 아님, 형식/상태를 모름, 전송 에러) 화면 경로로 대체.
+# 응답 분류 / 취소 대상 선정은 async_runner 와 공유하는 순수 함수 — 엔진별 코드는 request 호출만 다름
+
+_counsel_api_unavailable = {}  # history API URL → 사용 불가 사유 (라우트가 없을 때만 — 이후 바로 화면 경로)
+
+
+def _counsel_api_urls(step, base_url=None):
+    """(history URL, cancel URL). 스텝 또는 COUNSEL_*_API 로 두 경로가 모두 지정되지 않았으면 None (화면 경로)"""
+    history_api = step.get("historyApi", COUNSEL_HISTORY_API)
+    cancel_api = step.get("cancelApi", COUNSEL_CANCEL_API)
+    if not (history_api and cancel_api):
+        return None
+    base = (base_url or step.get("baseUrl", "")).rstrip("/")
+    return base + history_api, base + cancel_api
+
+
+def _counsel_history_unusable(response):
+    """history 응답을 쓸 수 없으면 (사유, 캐시 여부), 쓸 수 있으면 None.
+    라우트가 없는 응답(404/405/501, JSON 이 아닌 200)만 캐시 — 401/500 같은 일시 오류는 이번 호출만 화면 경로"""
+    if response.status in COUNSEL_API_MISSING_STATUSES:
+        return f"HTTP {response.status}", True
+    if not response.ok:
+        return f"상담 목록 조회 HTTP {response.status}", False
+    if "json" not in response.headers.get("content-type", ""):
+        return f"JSON 이 아닌 응답 ({response.headers.get('content-type', '?')})", True
+    return None
+
+
+def _counsel_cancellable(item, statuses):
+    for key in ("cancellable", "cancelable"):
+        if isinstance(item.get(key), bool):
+            return item[key]
+    status = item.get("status") or item.get("counselStatus")
+    return status is None or str(status).upper() in statuses
+
+
+def _cancellable_counsel_ids(body, step):
+    """history 응답 → (취소할 상담 id 리스트, None) 또는 쓸 수 없으면 (None, (사유, 캐시 여부)).
+    {"data": [...]} / {"data": {"content" | "items" | "list": [...]}} 형식 지원. 완료/취소된 상담은 제외하지만,
+    목록이 비어 있지 않은데 취소 대상이 0건이면 상태 값을 모르는 것으로 보고 화면 경로로 대체 (이번 호출만)"""
+    data = body.get("data", body) if isinstance(body, dict) else body
+    if isinstance(data, dict):
+        data = next((data[key] for key in ("content", "items", "list") if isinstance(data.get(key), list)), None)
+    if not isinstance(data, list):
+        return None, ("알 수 없는 응답 형식", True)
+    statuses = {s.upper() for s in step.get("cancellableStatuses", COUNSEL_CANCELLABLE_STATUSES)}
+    ids = [item.get("id") or item.get("counselId") for item in data
+           if isinstance(item, dict) and (item.get("id") or item.get("counselId"))
+           and _counsel_cancellable(item, statuses)]
+    if data and not ids:
+        return None, (f"상담 {len(data)}건 중 취소 대상으로 아는 상태 없음", False)
+    return ids, None
+
+
+def _counsel_cancel_unusable(counsel_id, response, cancelled):
+    """취소 요청 실패 → (사유, 캐시 여부). 첫 건부터 라우트가 없는 응답이면 캐시"""
+    cache = response.status in COUNSEL_API_MISSING_STATUSES and not cancelled
+    return f"취소 API HTTP {response.status} (id={counsel_id})", cache
+
+
+def _counsel_api_fallback(history_url, reason, cache, cancelled=0):
+    """API 를 쓸 수 없음 → 화면 경로로 대체. 반환은 cancel_counsels_via_api 형식"""
+    if cache:
+        _counsel_api_unavailable[history_url] = reason
+    scope = "" if cache else " (이번 호출만)"
+    done = f", API 로 {cancelled}건 취소 후" if cancelled else ""
+    print(f"  [INFO] 상담 취소 API 사용 불가{scope} ({history_url}: {reason}{done}) — 화면에서 취소")
+    return cancelled, reason
+
+
+def cancel_counsels_via_api(request, step, base_url=None):
+    """APIRequestContext(request)로 취소할 수 있는 기존 상담을 모두 취소 (API 경로가 지정된 경우만 호출).
+    반환: (실제 취소 건수, 사용 불가 사유) — 사유가 있으면 화면 경로로 대체 (HTTP / JSON / 형식 / 전송 에러 모두)
+    """
+    history_url, cancel_url = _counsel_api_urls(step, base_url)
+    if history_url in _counsel_api_unavailable:
+        return 0, _counsel_api_unavailable[history_url]
+    cancelled = 0
+    try:
+        response = request.get(history_url, timeout=COUNSEL_API_TIMEOUT_MS)
+        unusable = _counsel_history_unusable(response)
+        if unusable:
+            return _counsel_api_fallback(history_url, *unusable)
+        ids, unusable = _cancellable_counsel_ids(response.json(), step)
+        if unusable:
+            return _counsel_api_fallback(history_url, *unusable)
+        for counsel_id in ids:
+            response = request.post(cancel_url, data={"id": counsel_id}, timeout=COUNSEL_API_TIMEOUT_MS)
+            if not response.ok:
+                return _counsel_api_fallback(history_url, *_counsel_cancel_unusable(counsel_id, response, cancelled),
+                                             cancelled)
+            cancelled += 1
+        return cancelled, None
+    except Exception as e:
+        return _counsel_api_fallback(history_url, f"API 에러: {str(e).splitlines()[0]}", False, cancelled)
+
+
+def _counsel_api_result(step, cancelled, unavailable):
+    """API 취소 결과 → 스텝 결과. 화면 경로로 대체해야 하면 None"""
+    if unavailable:
+        return None
+    return {"status": "pass", "desc": f"{_desc(step)} — API {cancelled}건 취소"}
+
 
-            page.unroute("**/available-ga**")
+def _counsel_history_page(step):
+    return f"{step.get('baseUrl', '')}{COUNSEL_HISTORY_PATH}"
 
-            if matched[0]:
-                return {"status": "pass", "desc": f"{desc} — {attempt}회차에 GA 매칭 (id={ga_id_found[0]}, {ga_name_found[0]})"}
 
-            # GA 불일치 — abort로 onError 발생, ConfirmBottomSheet 유지
-            print(f"    [{attempt}/{max_retries}] GA 불일치: id={ga_id_found[0]} ({ga_name_found[0]})")
-            page.wait_for_timeout(500)
+def _left_counsel_history(url):
+    # 상담이 없거나 전부 취소되면 history.back() 으로 이동하므로 URL 로 판별
+    return COUNSEL_HISTORY_PATH not in url
 
-        return {"status": "fail", "desc": desc, "error": f"{max_retries}회 시도 후 원하는 GA(id={target_ga_id})를 배정받지 못함"}
 
-    elif action == "cancelExistingCounsel":
-        base_url = step.get("baseUrl", "")
-        page.goto(f"{base_url}/car-insurance/history")
+def _cancel_ui_result(step, cancelled):
+    """화면 경로 취소 결과. cancelled 가 None 이면 기존 상담 없음"""
+    if cancelled is None:
+        return {"status": "pass", "desc": f"{_desc(step)} — 기존 상담 없음 (skip)"}
+    return {"status": "pass", "desc": f"{_desc(step)} — {cancelled}건 취소"}
+
+
+def _step_cancel_existing_counsel(page, step, context):
+    # HAR 재생 중에는 API 요청이 HAR 을 거치지 않으므로 화면 경로만 사용
+    if _counsel_api_urls(step) and not har_replaying(context["options"]):
+        with _timed(context, "network"):
+            api_result = _counsel_api_result(step, *cancel_counsels_via_api(context["browser_context"].request, step))
+        if api_result:
+            return api_result
+    return _cancel_counsels_ui(page, step, context)
+
+
+def _cancel_counsels_ui(page, step, context):
+    """이력 화면에서 "상담 취소하기" → 모달 "상담 취소" 를 반복 클릭해 취소 (API 를 쓸 수 없을 때)"""
+    with _timed(context, "network"):
+        page.goto(_counsel_history_page(step))
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(1000)
+    pause(page, context, 1000)
 
-        # 상담 없으면 history.back()으로 이동하므로 URL로 판별
-        if "/car-insurance/history" not in page.url:
-            return {"status": "pass", "desc": f"{desc} — 기존 상담 없음 (skip)"}
+    if _left_counsel_history(page.url):
+        return _cancel_ui_result(step, None)
+
+    # 상담 항목 있음 — 모든 "상담 취소하기" 버튼 클릭
+    cancelled = 0
+    for _ in range(COUNSEL_UI_MAX_CANCELS):
+        cancel_btn = page.locator(COUNSEL_CANCEL_BUTTON).first
+        try:
+            cancel_btn.wait_for(state="visible", timeout=3000)
+        except Exception:
+            break  # 더 이상 취소할 항목 없음
 
-        # 상담 항목 있음 — 모든 "상담 취소하기" 버튼 클릭
-        cancelled = 0
-        max_attempts = 10
-        for _ in range(max_attempts):
-            cancel_btn = page.locator("button:has-text('상담 취소하기')").first
+        cancel_btn.click()
+        pause(page, context, 500)
+
+        # 모달 "상담 취소" 버튼 클릭
+        modal = page.locator(COUNSEL_MODAL)
+        if modal.count() > 0:
+            confirm_btn = modal.locator(COUNSEL_CONFIRM_BUTTON).first
             try:
-                cancel_btn.wait_for(state="visible", timeout=3000)
+                confirm_btn.wait_for(state="visible", timeout=3000)
+                confirm_btn.click()
+                pause(page, context, 1500)  # API 응답 + 리스트 갱신 대기
+                cancelled += 1
             except Exception:
-                break  # 더 이상 취소할 항목 없음
-
-            cancel_btn.click()
-            page.wait_for_timeout(500)
-
-            # 모달 "상담 취소" 버튼 클릭
-            modal = page.locator("[role='dialog'], [aria-modal='true']")
-            if modal.count() > 0:
-                confirm_btn = modal.locator("button:has-text('상담 취소')").first
-                try:
-                    confirm_btn.wait_for(state="visible", timeout=3000)
-                    confirm_btn.click()
-                    page.wait_for_timeout(1500)  # API 응답 + 리스트 갱신 대기
-                    cancelled += 1
-                except Exception:
-                    break
-
-            # 상담 전부 취소되면 history.back() 발생
-            if "/car-insurance/history" not in page.url:
                 break
 
-        return {"status": "pass", "desc": f"{desc} — {cancelled}건 취소"}
+        if _left_counsel_history(page.url):
+            break
+
+    return _cancel_ui_result(step, cancelled)
+
+
+def _step_manual_action(page, step, context):
+    return _manual_result(step)
+
+
+STEP_HANDLERS = {
+    "loadState": _step_noop,
+    "launchBrowser": _step_noop,
+    "navigate": _step_navigate,
+    "fill": _step_fill,
+    "blur": _step_blur,
+    "clear": _step_clear,
+    "click": _step_click,
+    "screenshot": _step_screenshot,
+    "expect": _step_expect,
+    "waitForNavigation": _step_wait_for_navigation,
+    "waitFor": _step_wait_for,
+    "waitForResponse": _step_wait_for_response,
+    "waitForTimeout": _step_wait_for_timeout,
+    "waitForUrl": _step_wait_for_url,
+    "handleTermsAgreement": _step_handle_terms,
+    "injectStoreData": _step_inject_store_data,
+    "fetchAndInjectUserInfo": _step_fetch_and_inject_user_info,
+    "setSessionStorage": _step_set_session_storage,
+    "saveState": _step_save_state,
+    "retryUntilGa": _step_retry_until_ga,
+    "cancelExistingCounsel": _step_cancel_existing_counsel,
+    "manualAction": _step_manual_action,
+}
 
-    elif action == "manualAction":
-        instruction = step.get("instruction", "")
-        print(f"  [수동] {instruction}")
-        return {"status": "pass", "desc": f"{desc} (수동)"}
 
-    else:
-        return {"status": "fail", "desc": desc, "error": f"알 수 없는 action: {action}"}
+def execute_step(page, step, context):
+    """단일 step을 실행하고 결과를 반환 (컴파일되지 않은 step용 — 핸들러 테이블에서 조회)"""
+    return _unknown_step_result(step, STEP_HANDLERS) or STEP_HANDLERS[step["action"]](page, step, context)
+
+
+# ── 시나리오 컴파일 ──
+
+# action별 필수 필드 (변수 치환 후 비어 있으면 컴파일 에러)
+REQUIRED_FIELDS = {
+    "navigate": ("url",),
+    "click": ("selector",),
+    "waitFor": ("selector",),
+    "waitForUrl": ("pattern",),
+    "setSessionStorage": ("key",),
+    "retryUntilGa": ("targetGaCompanyId",),
+    "cancelExistingCounsel": ("baseUrl",),
+    "fetchAndInjectUserInfo": ("userData",),
+}
+
+PlanStep = namedtuple("PlanStep", ["num", "action", "step", "handler"])
+ScenarioPlan = namedtuple("ScenarioPlan", ["id", "name", "steps", "errors"])
+
+
+def compile_scenario(scenario, variables, handlers=None, deferred=()):
+    """시나리오 JSON → 불변 실행 계획(ScenarioPlan).
+    변수 치환을 한 번에 끝내고, 각 step에 핸들러를 미리 바인딩한다.
+    누락 변수 / 알 수 없는 action·expect type / 필수 필드 누락은 errors에 모아 브라우저 실행 전에 보고.
+    handlers: 엔진별 핸들러 테이블 (기본 STEP_HANDLERS, async 엔진은 async_runner.STEP_HANDLERS)
+    deferred: 누락이어도 에러로 보지 않을 변수 (계정 풀 유저 변수 — lease_task 가 계정 변수로 다시 컴파일하며 검사)
+    """
+    handlers = handlers if handlers is not None else STEP_HANDLERS
+    errors = []
+    missing = set()
+    steps = []
+    for i, raw_step in enumerate(scenario.get("steps", [])):
+        num = i + 1
+        step = _render(raw_step, variables, missing)
+        action = step.get("action", "")
+        handler = handlers.get(action)
+        if handler is None:
+            errors.append(f"Step {num}: 알 수 없는 action: {action}")
+        elif action == "expect" and step.get("type", "") not in EXPECT_HANDLERS:
+            errors.append(f"Step {num}: 알 수 없는 expect type: {step.get('type', '')}")
+        for field in REQUIRED_FIELDS.get(action, ()):
+            if not step.get(field):
+                errors.append(f"Step {num}: {action}에 '{field}'가 없습니다.")
+        if action == "retryUntilGa" and step.get("targetGaCompanyId") and "{{" not in str(step["targetGaCompanyId"]):
+            _, error = _target_ga_id(step)
+            if error:
+                errors.append(f"Step {num}: {error['error']}")
+        steps.append(PlanStep(num, action, MappingProxyType(step), handler))
+    network = scenario.get("network")
+    if isinstance(network, str) and network not in NETWORK_PROFILES:
+        errors.append(f"알 수 없는 네트워크 프로필: {network} ({' | '.join(NETWORK_PROFILES)})")
+    missing -= set(deferred)
+    if missing:
+        errors.insert(0, f"누락된 변수: {', '.join(sorted(missing))} (--var key=value 로 지정)")
+    return ScenarioPlan(scenario.get("id", ""), scenario.get("name", ""), tuple(steps), tuple(errors))
+
+
+def failure_result(scenario, desc, error):
+    """브라우저 실행 없이 실패 처리한 시나리오의 결과"""
+    return {
+        "id": scenario.get("id", ""),
+        "name": scenario.get("name", ""),
+        "description": scenario.get("description", ""),
+        "precondition": scenario.get("precondition", ""),
+        "steps": [{"status": "fail", "desc": desc, "error": error}],
+        "status": "fail",
+        "duration": 0.0,
+    }
+
+
+def plan_failure_result(scenario, plan):
+    """컴파일 에러가 있는 시나리오의 결과"""
+    return failure_result(scenario, "시나리오 컴파일", " / ".join(plan.errors))
 
 
 # ── 시나리오 실행 ──
 
-def run_scenario(browser, scenario, variables, auth_state_path, screenshot_prefix, round_label=""):
-    """단일 시나리오를 실행하고 결과 반환"""
-    # 이전 실행의 스크린샷 정리
-    for old in glob.glob(f"{screenshot_prefix}_*.png"):
-        os.remove(old)
+# 스텝 소요 시간 분류 (ms). action = total 에서 나머지 버킷을 뺀 순수 조작/검증 시간
+TIMING_BUCKETS = ("action", "wait", "network", "screenshot")
+TIMING_LABELS = {"action": "액션", "wait": "대기", "network": "네트워크", "screenshot": "스크린샷"}
 
-    label = f"{round_label} " if round_label else ""
-    scenario_name = scenario['name']
-    print(f"\n{'='*50}")
-    print(f"{label}{scenario_name}")
-    print(f"{'='*50}")
 
-    # 변수 치환
-    steps = substitute_variables(scenario.get("steps", []), variables)
+def _step_timing(context, started):
+    """현재 스텝 소요 시간을 버킷별로 분해 (ms, 소수점 1자리).
+    wait: 러너의 sleep / settle 대기, network: 네비게이션·응답 대기, screenshot: 캡처
+    """
+    total = (time.perf_counter() - started) * 1000
+    measured = context.get("timing", {})
+    timing = {bucket: round(measured.get(bucket, 0.0), 1) for bucket in TIMING_BUCKETS[1:]}
+    timing["action"] = round(max(0.0, total - sum(measured.get(b, 0.0) for b in TIMING_BUCKETS[1:])), 1)
+    timing["total"] = round(total, 1)
+    return timing
+
+
+def _format_timing(timing):
+    if timing.get("total", 0) < 1:
+        return ""
+    parts = [f"{TIMING_LABELS[b]} {timing[b]:.0f}" for b in TIMING_BUCKETS if timing.get(b, 0) >= 1]
+    return f" ({timing['total']:.0f}ms{': ' + ' / '.join(parts) if parts else ''})"
+
+
+def summarize_timing(steps):
+    """스텝 리스트의 버킷별 합계 (시나리오 단위 롤업)"""
+    totals = {bucket: 0.0 for bucket in TIMING_BUCKETS + ("total",)}
+    for step in steps:
+        for bucket, ms in (step.get("timing") or {}).items():
+            if bucket in totals:
+                totals[bucket] += ms
+    return {bucket: round(ms, 1) for bucket, ms in totals.items()}
+
+
+def timing_by_action(results):
+    """action 타입별 롤업: {action: {"count": n, "total": ms, "wait": ms, ...}} — total 내림차순"""
+    rollup = {}
+    for r in results:
+        for step in r.get("steps", []):
+            if not step.get("timing"):
+                continue
+            entry = rollup.setdefault(step.get("action", "?"), {"count": 0, **summarize_timing([])})
+            entry["count"] += 1
+            for bucket, ms in summarize_timing([step]).items():
+                entry[bucket] = round(entry[bucket] + ms, 1)
+    return dict(sorted(rollup.items(), key=lambda item: item[1]["total"], reverse=True))
+
+
+def slowest_steps(results, limit=10):
+    """전체 결과에서 total 기준 가장 느린 스텝 limit 개: [(result, step_num, step)]"""
+    steps = [(r, num, step) for r in results for num, step in enumerate(r.get("steps", []), 1)
+             if (step.get("timing") or {}).get("total")]
+    steps.sort(key=lambda item: item[2]["timing"]["total"], reverse=True)
+    return steps[:limit]
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _emit(options, event_type, **fields):
+    """options["events"] (event_log.EventLog) 가 있으면 실행 이벤트 기록"""
+    events = (options or {}).get("events")
+    if events:
+        events.emit(event_type, **fields)
+
+
+def _step_screenshot_file(screenshot_prefix, step_num):
+    """스텝이 남긴 스크린샷 경로 (에러 스크린샷 우선). 없으면 None."""
+    for path in (f"{screenshot_prefix}_{step_num}_error.png", f"{screenshot_prefix}_{step_num}.png"):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _emit_step(options, scenario, step_num, result, screenshot_prefix):
+    if not (options or {}).get("events"):
+        return
+    round_field = {"round": scenario["round"]} if scenario.get("round") else {}
+    _emit(options, "step", id=scenario.get("id", ""), num=step_num, **round_field, **result,
+          screenshot=_step_screenshot_file(screenshot_prefix, step_num))
+
+
+def _scenario_meta(scenario):
+    meta = {
+        "id": scenario.get("id", ""),
+        "name": scenario.get("name", ""),
+        "description": scenario.get("description", ""),
+        "precondition": scenario.get("precondition", ""),
+    }
+    if scenario.get("round"):
+        meta["round"] = scenario["round"]  # --repeat 회차 (repeat_tasks 가 붙임)
+    return meta
 
-    # 컨텍스트 생성
-    if scenario.get("requiresAuth", False):
-        try:
-            ctx = browser.new_context(storage_state=auth_state_path)
-        except Exception:
-            ctx = browser.new_context()
+
+def format_round(scenario):
+    """--repeat 회차 표시 (예: [2회차]). 반복 실행이 아니면 빈 문자열"""
+    return f"[{scenario['round']}회차]" if scenario.get("round") else ""
+
+
+def _new_scenario_context(browser, scenario, auth_state_path, options, storage_state=None):
+    """시나리오용 브라우저 컨텍스트 생성 (인증 상태, HAR, 네트워크 프로필 적용).
+    storage_state: 공유 prefix 스냅샷에서 포크할 때의 storage state (auth_state_path 대신 사용)
+    """
+    if storage_state is not None:
+        ctx = browser.new_context(storage_state=storage_state)
+    elif scenario.get("requiresAuth", False):
+        # 인증 상태를 못 읽으면 비로그인 컨텍스트로 넘어가지 않고 AuthExpiredError (run_scenario 가 실패 처리)
+        ctx = browser.new_context(storage_state=auth_storage_state(auth_state_path))
     else:
         ctx = browser.new_context()
+    apply_har(ctx, options, scenario.get("id", ""))
+    apply_network_profile(ctx, resolve_network_profile(options, scenario))
+    return ctx
 
-    page = ctx.new_page()
-    page.set_default_timeout(10000)  # 셀렉터 타임아웃 10초 (기본 30초 → 단축)
 
-    context = {
+def _step_context(ctx, screenshot_prefix, auth_state_path, options):
+    """스텝 핸들러에 넘기는 context dict (엔진 공통)"""
+    return {
         "screenshot_path": screenshot_prefix,
         "auth_state_path": auth_state_path,
         "browser_context": ctx,
+        "options": options or {},
     }
 
-    results = []
-    scenario_status = "pass"
 
-    for i, step in enumerate(steps):
-        context["step_num"] = i + 1
+def _open_page(ctx, screenshot_prefix, auth_state_path, options):
+    """컨텍스트에 페이지를 열고 스텝 실행용 context dict 와 함께 반환"""
+    page = ctx.new_page()
+    page.set_default_timeout(PAGE_TIMEOUT_MS)
+    context = _step_context(ctx, screenshot_prefix, auth_state_path, options)
+    attach_page_listeners(page, context)
+    return page, context
+
+
+def _begin_step(context, plan_step):
+    """스텝 시작 — 스텝 번호 / 소요 시간 버킷 초기화. 시작 시각 반환"""
+    context["step_num"] = plan_step.num
+    context["timing"] = {}
+    context["timing_active"] = False
+    if not plan_step.action.startswith("wait"):
+        # waitForResponse는 직전 액션 이후 도착한 응답까지 인정
+        context["responses"] = []
+    return time.perf_counter()
+
+
+def _error_screenshot_target(context):
+    return f"{context['screenshot_path']}_{context['step_num']}_error.png"
+
+
+def _step_error_result(plan_step, error):
+    return _fail(plan_step.step, str(error))
+
+
+def _finish_step(context, plan_step, result, started, options, scenario, log):
+    """스텝 결과에 action / 소요 시간을 붙이고 이벤트·로그 출력. 통과면 True"""
+    result["action"] = plan_step.action
+    result["timing"] = _step_timing(context, started)
+    if scenario is not None:
+        _emit_step(options, scenario, plan_step.num, result, context["screenshot_path"])
+
+    icon = "OK" if result["status"] == "pass" else "FAIL"
+    log(f"  [{icon}] Step {plan_step.num}: {result['desc']}{_format_timing(result['timing'])}")
+    if result.get("error"):
+        log(f"         Error: {result['error']}")
+    return result["status"] != "fail"
+
+
+def _run_steps(page, context, plan_steps, options, scenario=None, log=print):
+    """plan_steps 를 순서대로 실행하고 (스텝 결과 리스트, 상태) 반환. 실패하면 즉시 중단.
+    scenario 가 있으면 스텝 이벤트를 발생시킨다 (공유 prefix 구간은 시나리오별로 나중에 발생).
+    """
+    results = []
+    for plan_step in plan_steps:
+        started = _begin_step(context, plan_step)
         try:
-            result = execute_step(page, step, context)
+            result = plan_step.handler(page, plan_step.step, context)
         except Exception as e:
-            # 예외 발생 시 스크린샷 캡처
+            # 예외 발생 시 스크린샷 캡처 (예외로 빠져나온 _timed 블록은 이미 닫혀 있음)
             try:
-                page.screenshot(path=f"{screenshot_prefix}_{i+1}_error.png", full_page=True)
+                with _timed(context, "screenshot"):
+                    page.screenshot(path=_error_screenshot_target(context), full_page=True)
             except Exception:
                 pass
-            result = {"status": "fail", "desc": step.get("description", step.get("action", "")), "error": str(e)}
-
+            result = _step_error_result(plan_step, e)
         results.append(result)
+        if not _finish_step(context, plan_step, result, started, options, scenario, log):
+            return results, "fail"  # 실패 시 이후 스텝은 의미 없으므로 즉시 중단
+    return results, "pass"
 
-        icon = "OK" if result["status"] == "pass" else "FAIL"
-        print(f"  [{icon}] Step {i+1}: {result['desc']}")
-        if result.get("error"):
-            print(f"         Error: {result['error']}")
-
-        if result["status"] == "fail":
-            scenario_status = "fail"
-            break  # 실패 시 이후 스텝은 의미 없으므로 즉시 중단
 
-    ctx.close()
-    return {
-        "id": scenario.get("id", ""),
-        "name": scenario_name,
-        "description": scenario.get("description", ""),
-        "precondition": scenario.get("precondition", ""),
+def _scenario_result(scenario, results, status, duration, options, **extra):
+    """시나리오 결과 dict 생성 + scenario_end 이벤트"""
+    scenario_result = {
+        **_scenario_meta(scenario),
         "steps": results,
-        "status": scenario_status,
+        "status": status,
+        "duration": round(duration, 2),
+        "timing": summarize_timing(results),
+        **extra,
     }
+    _emit(options, "scenario_end", id=scenario_result["id"], result=scenario_result)
+    return scenario_result
+
+
+def _clear_screenshots(screenshot_prefix):
+    """이전 실행의 스크린샷 정리"""
+    for old in glob.glob(f"{screenshot_prefix}_*.png"):
+        os.remove(old)
+
+
+def _banner(title):
+    return ["", "=" * 50, title, "=" * 50]
+
+
+def _scenario_banner(scenario, round_label=""):
+    round_label = round_label or format_round(scenario)
+    return _banner(f"{round_label} {scenario['name']}" if round_label else scenario["name"])
+
+
+def _failed_before_run(scenario, failure, options, log, errors):
+    for error in errors:
+        log(f"  [FAIL] {error}")
+    _emit(options, "scenario_end", id=failure["id"], result=failure)
+    return failure
+
+
+def _preflight_failure(scenario, plan, options, log=print):
+    """브라우저 컨텍스트를 만들기 전 실패 (컴파일 에러 / HAR 없음) → 실패 결과, 없으면 None"""
+    if plan.errors:
+        return _failed_before_run(scenario, plan_failure_result(scenario, plan), options, log, plan.errors)
+    har_error = har_missing_error(options, scenario.get("id", ""))
+    if har_error:
+        return _failed_before_run(scenario, failure_result(scenario, "HAR 재생", har_error), options, log, [har_error])
+    return None
+
+
+def _auth_failure(scenario, error, options, log=print):
+    """인증 상태를 읽지 못한 시나리오 (AuthExpiredError) → 실패 결과"""
+    message = f"{error.reason}: {error.auth_state_path} — 재로그인 필요"
+    return _failed_before_run(scenario, failure_result(scenario, "인증 상태 로드", message), options, log, [message])
+
+
+def run_scenario(browser, scenario, variables, auth_state_path, screenshot_prefix, round_label="", options=None,
+                 plan=None):
+    """단일 시나리오를 실행하고 결과 반환.
+    options: 실행 옵션 dict — {"wait": "event" | "fixed", "events": EventLog, "network": 프로필, "block_hosts": [...],
+             "har": {"mode": "record" | "replay", "dir": ..., "strict": bool}, "share_prefix": bool}
+    plan: compile_scenario 결과 (없으면 여기서 컴파일)
+    """
+    _clear_screenshots(screenshot_prefix)
+    started = time.monotonic()
+    print("\n".join(_scenario_banner(scenario, round_label)))
+
+    plan = plan or compile_scenario(scenario, variables)
+    failure = _preflight_failure(scenario, plan, options)
+    if failure:
+        return failure
+
+    _emit(options, "scenario_start", **_scenario_meta(scenario))
+
+    try:
+        ctx = _new_scenario_context(browser, scenario, auth_state_path, options)
+    except AuthExpiredError as e:
+        return _auth_failure(scenario, e, options)
+    page, context = _open_page(ctx, screenshot_prefix, auth_state_path, options)
+    results, scenario_status = _run_steps(page, context, plan.steps, options, scenario)
+
+    ctx.close()
+    return _scenario_result(scenario, results, scenario_status, time.monotonic() - started, options)
 
 
 # ── 병렬 실행을 위한 워커 함수 ──
 
-def _run_worker_batch(batch):
-    """워커 1개가 브라우저 1개로 할당된 시나리오 그룹을 순차 실행."""
-    auth_state_path = batch["auth_state_path"]
-    results = []
+def lease_task(task, account, handlers=None):
+    """태스크를 계정 풀의 계정에 임대 — 계정 유저 변수로 다시 컴파일한 태스크 반환.
+    컴파일 에러는 plan.errors 로 남겨 run_scenario 가 실패 결과로 처리한다.
+    """
+    variables = dict(task["variables"], **account["variables"])
+    return dict(task, variables=variables, plan=compile_scenario(task["scenario"], variables, handlers))
+
 
+def worker_failure_result(task, error, options=None):
+    """워커 에러(계정 임대 / 실행 / 브라우저 실행 실패)로 결과를 남기지 못한 태스크의 실패 결과.
+    요약 / 리포트 / 실행 이력에서 시나리오가 빠지지 않도록 결과 자리를 채운다.
+    """
+    result = failure_result(task["scenario"], "워커 실행", error)
+    if task["scenario"].get("round"):
+        result["round"] = task["scenario"]["round"]
+    _emit(options, "scenario_end", id=result["id"], result=result)
+    return result
+
+
+def _fill_missing_results(tasks, results, error, options=None):
+    """입력 순서 결과 리스트의 빈 자리(워커가 결과를 남기지 못한 태스크)를 실패 결과로 채워 반환"""
+    return [result if result is not None else worker_failure_result(task, error, options)
+            for task, result in zip(tasks, results)]
+
+
+def _run_worker_queue(task_queue, auth_state_path, results, options=None, account=None):
+    """워커 1개가 브라우저 1개로 공유 큐가 빌 때까지 태스크를 가져가 실행 (work-stealing).
+    account 가 있으면 이 워커가 계정을 독점 — 가져간 태스크를 계정 인증 상태 + 유저 변수로 실행.
+    """
+    if account:
+        auth_state_path = account["authState"]
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        for item in batch["items"]:
-            result = run_scenario(
-                browser, item["scenario"], item["variables"],
-                auth_state_path, item["screenshot_prefix"]
-            )
-            results.append((item["index"], result))
+        browser = launch_browser(p)
+        while True:
+            try:
+                item = task_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if account:
+                    item = lease_task(item, account)
+                result = run_scenario(
+                    browser, item["scenario"], item["variables"],
+                    auth_state_path, item["screenshot_prefix"], options=options, plan=item.get("plan")
+                )
+                if account:
+                    result["account"] = account["name"]
+                results[item["index"]] = result
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+                results[item["index"]] = worker_failure_result(item, str(e), options)
         browser.close()
 
-    return results
 
+# ── 실행 시간 학습 (긴 시나리오 우선 스케줄링) ──
+
+def load_durations():
+    """이전 실행에서 학습한 시나리오별 소요 시간(초) 로드. {scenario_id: seconds}"""
+    try:
+        with open(DURATIONS_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_durations(results):
+    """실행 결과의 duration을 지수이동평균으로 누적 저장"""
+    durations = load_durations()
+    for r in results:
+        if not r or r.get("duration") is None or not r.get("id") or r.get("reused"):
+            continue
+        prev = durations.get(r["id"])
+        durations[r["id"]] = round(r["duration"] if prev is None else (prev + r["duration"]) / 2, 2)
+    try:
+        with open(DURATIONS_PATH, "w", encoding="utf-8") as f:
+            json.dump(durations, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"  [WARN] 실행 시간 기록 실패: {e}")
+
+
+def estimate_duration(scenario):
+    """실행 이력이 없는 시나리오의 정적 소요 시간 추정(초).
+    waitForTimeout 합계 + 스텝당 기본 비용, retryUntilGa/cancelExistingCounsel 가중치.
+    """
+    total = 0.0
+    for step in scenario.get("steps", []):
+        action = step.get("action", "")
+        if action == "waitForTimeout":
+            total += step.get("timeout", 1000) / 1000
+        elif action == "retryUntilGa":
+            # 클릭 1회 + 핸들러 안의 재요청 (시도당 요청 1번 약 0.3초, 평균적으로 절반 시도에서 매칭)
+            total += 1.5 + step.get("maxRetries", 20) * 0.15
+        elif action == "cancelExistingCounsel":
+            total += 1.0 if _counsel_api_urls(step) else 2.5  # API 경로 / 화면 경로 (기본, 취소할 상담이 없을 때)
+        else:
+            total += 0.5
+    return total
+
+
+def expected_durations():
+    """태스크 → 예상 소요 시간(초) 함수. 학습된 소요 시간, 없으면 정적 추정"""
+    durations = load_durations()
 
-# ── 전체 실행 / 반복 실행 ──
+    def expected(task):
+        scenario = task["scenario"]
+        known = durations.get(scenario.get("id", ""))
+        return known if known is not None else estimate_duration(scenario)
+
+    return expected
+
+
+def _order_longest_first(tasks):
+    """학습된 소요 시간(없으면 정적 추정) 기준 내림차순 정렬"""
+    return sorted(tasks, key=expected_durations(), reverse=True)
+
+
+# ── 전체 실행 / 반복 실행 (--repeat) ──
 
 def _matches_labels(scenario_labels, filter_labels):
     """라벨 필터 매칭. 각 filter_label 간은 AND, 쉼표로 구분된 값은 OR.
@@ -496,69 +1527,665 @@ def _matches_labels(scenario_labels, filter_labels):
     return True
 
 
-def _run_parallel(tasks, auth_state_path):
-    """태스크 리스트를 MAX_WORKERS 만큼 병렬 실행하고 결과 리스트 반환."""
+def round_screenshot_prefix(prefix, round_num):
+    """회차별 스크린샷 prefix. '_' 가 아닌 '-r' 로 붙여야 원래 prefix 의 '{prefix}_*.png' 정리/검색에 걸리지 않음"""
+    return f"{prefix}-r{round_num}" if round_num else prefix
+
+
+def repeat_tasks(tasks, repeat):
+    """태스크를 repeat 회차만큼 복제 (회차 순서대로). 회차마다 scenario["round"] 와 스크린샷 prefix 가 다르다."""
+    if repeat <= 1:
+        return tasks
+    return [
+        dict(task, scenario=dict(task["scenario"], round=n),
+             screenshot_prefix=round_screenshot_prefix(task["screenshot_prefix"], n))
+        for n in range(1, repeat + 1) for task in tasks
+    ]
+
+
+def is_serial_scenario(scenario):
+    """백엔드 상태를 바꾸는(상담 취소/생성) 시나리오 — 회차를 동시에 실행하면 서로의 상담을 취소하므로 순차 실행"""
+    return any(step.get("action") == "cancelExistingCounsel" for step in scenario.get("steps", []))
+
+
+def summarize_repeats(results):
+    """회차별 결과 → 시나리오별 안정성 통계 (처음 나온 순서 유지).
+    [{"id", "name", "rounds", "passed", "passRate", "duration": {"min", "p50", "p95", "max"} (초),
+      "steps": [{"num", "desc", "runs", "failed", "flaky", "errors", "p50", "p95", "max"} (ms)]}]
+    flaky: 같은 스텝이 어떤 회차에서는 통과하고 어떤 회차에서는 실패. 실패 이후 실행되지 않은 스텝은 runs 에서 제외
+    """
+    grouped = {}
+    for r in results:
+        grouped.setdefault(r.get("id", ""), []).append(r)
+
+    stats = []
+    for scenario_id, rounds in grouped.items():
+        durations = [r.get("duration") or 0 for r in rounds]
+        passed = sum(1 for r in rounds if r["status"] == "pass")
+        by_num = {}
+        for r in rounds:
+            for num, step in enumerate(r["steps"], 1):
+                by_num.setdefault(num, []).append(step)
+        steps = []
+        for num, runs in sorted(by_num.items()):
+            failed = [step for step in runs if step["status"] == "fail"]
+            totals = [(step.get("timing") or {}).get("total", 0) for step in runs]
+            steps.append({
+                "num": num,
+                "desc": runs[0].get("desc", ""),
+                "runs": len(runs),
+                "failed": len(failed),
+                "flaky": 0 < len(failed) < len(runs),
+                "errors": sorted({step["error"] for step in failed if step.get("error")}),
+                "p50": percentile(totals, 50),
+                "p95": percentile(totals, 95),
+                "max": max(totals),
+            })
+        stats.append({
+            "id": scenario_id,
+            "name": rounds[0].get("name", ""),
+            "rounds": len(rounds),
+            "passed": passed,
+            "passRate": round(passed / len(rounds) * 100, 1),
+            "duration": {
+                "min": min(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "max": max(durations),
+            },
+            "steps": steps,
+        })
+    return stats
+
+
+def print_repeat_summary(stats):
+    print(f"\n{'='*50}")
+    print("반복 실행 안정성")
+    print(f"{'='*50}")
+    for entry in stats:
+        duration = entry["duration"]
+        print(f"  {entry['name']}: {entry['passed']}/{entry['rounds']} 통과 ({entry['passRate']:.0f}%)"
+              f" — 소요 p50 {duration['p50']:.1f}s / p95 {duration['p95']:.1f}s / 최대 {duration['max']:.1f}s")
+        for step in entry["steps"]:
+            if step["failed"]:
+                kind = "불안정" if step["flaky"] else "항상 실패"
+                print(f"    [{kind}] Step {step['num']}: {step['desc']} ({step['failed']}/{step['runs']} 실패)")
+                for error in step["errors"][:3]:
+                    print(f"           {error}")
+
+
+def _run_parallel(tasks, auth_state_path, options=None, max_workers=MAX_WORKERS, accounts=None):
+    """태스크 리스트를 max_workers 만큼 병렬 실행하고 결과 리스트 반환.
+    태스크는 긴 것부터 공유 큐에 넣고, 먼저 끝난 워커가 다음 태스크를 가져간다.
+    accounts 가 있으면 워커마다 계정 1개를 독점 (워커 수 = 계정 수).
+    결과는 입력 순서대로 반환.
+    """
     total = len(tasks)
-    workers = min(MAX_WORKERS, total)
+    workers = min(len(accounts) if accounts else max_workers, total)
     for i, task in enumerate(tasks):
         task["index"] = i
 
-    batches = [{"auth_state_path": auth_state_path, "items": []} for _ in range(workers)]
-    for i, task in enumerate(tasks):
-        batches[i % workers]["items"].append(task)
+    task_queue = queue.Queue()
+    for task in _order_longest_first(tasks):
+        task_queue.put(task)
 
     results = [None] * total
+    # 브라우저 실행 실패 등으로 워커가 모두 죽으면 큐에 남은 태스크는 결과가 없음 → 마지막 워커 에러로 실패 처리
+    error = "워커가 결과를 남기지 못했습니다"
     with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = [executor.submit(_run_worker_batch, batch) for batch in batches]
+        futures = [executor.submit(_run_worker_queue, task_queue, auth_state_path, results, options,
+                                   accounts[n] if accounts else None)
+                   for n in range(workers)]
         for future in as_completed(futures):
             try:
-                for idx, result in future.result():
-                    results[idx] = result
+                future.result()
             except Exception as e:
                 print(f"  워커 에러: {e}")
+                error = f"워커 에러: {e}"
+    return _fill_missing_results(tasks, results, error, options)
+
+
+# ── 공통 prefix 공유 실행 (--share-prefix) ──
+
+# snapshot: 포크할 상태 (None 이면 새 컨텍스트에서 처음부터), shared: 공유 구간 결과 [(num, result, 스크린샷 prefix)],
+# replay: 포크할 때 다시 실행할 스텝, seconds: 공유 구간 누적 소요 시간
+ForkState = namedtuple("ForkState", ["snapshot", "shared", "replay", "seconds"])
+ROOT_FORK = ForkState(None, (), (), 0.0)
+
+
+def _prefix_signature(options):
+    """같은 조건으로 컨텍스트를 만드는 시나리오끼리만 prefix 를 공유"""
+    def signature(task):
+        scenario = task["scenario"]
+        profile = resolve_network_profile(options, scenario)
+        return scenario.get("requiresAuth", False), json.dumps(profile, sort_keys=True)
+    return signature
+
+
+def _prepare_prefix_screenshots(tasks):
+    os.makedirs(SHARED_SCREENSHOT_DIR, exist_ok=True)
+    for old in glob.glob(f"{SHARED_SCREENSHOT_DIR}/*.png"):
+        os.remove(old)
+    for task in tasks:
+        for old in glob.glob(f"{task['screenshot_prefix']}_*.png"):
+            os.remove(old)
+
+
+def _take_snapshot(page, ctx, context):
+    data = page.evaluate(SNAPSHOT_JS)
+    return {"url": page.url, "storage": ctx.storage_state(), "session": data["session"], "stores": data["stores"],
+            "init_scripts": list(context.get("init_scripts", []))}
+
+
+def _fork_context(browser, scenario, auth_state_path, options, fork):
+    """스냅샷에서 새 컨텍스트로 포크. (ctx, page, context, 재실행 스텝 결과, 에러) — 에러는 복원 실패 메시지"""
+    snapshot = fork.snapshot
+    ctx = _new_scenario_context(browser, scenario, auth_state_path, options, storage_state=snapshot["storage"])
+    for script in snapshot["init_scripts"]:
+        ctx.add_init_script(script)
+    if snapshot["session"]:
+        ctx.add_init_script(restore_session_script(snapshot["url"], snapshot["session"]))
+    page, context = _open_page(ctx, None, auth_state_path, options)
+    context["init_scripts"] = list(snapshot["init_scripts"])
+
+    replayed, status = _run_steps(page, context, fork.replay, options)
+    if status == "fail":
+        return ctx, page, context, replayed, None
+    try:
+        with _timed(context, "network"):
+            page.goto(snapshot["url"])
+            page.wait_for_load_state("networkidle")
+        if snapshot["stores"]:
+            page.wait_for_function(STORES_READY_JS, arg=list(snapshot["stores"]), timeout=5000)
+            page.evaluate(RESTORE_STORES_JS, snapshot["stores"])
+            _settle(page, context, ACTION_SETTLE_MS)
+    except Exception as e:
+        return ctx, page, context, replayed, str(e)
+    return ctx, page, context, replayed, None
+
+
+def _merge_replayed(shared, replay, replayed):
+    """포크에서 다시 실행한 스텝 결과로 공유 결과를 교체"""
+    by_num = {plan_step.num: result for plan_step, result in zip(replay, replayed)}
+    return [(num, by_num.get(num, result), None if num in by_num else shot) for num, result, shot in shared]
+
+
+def _begin_shared_task(task, shared, options, log=print):
+    """공유 구간 결과를 시나리오에 붙임 — 스크린샷 복사 + scenario_start / 공유 스텝 이벤트"""
+    scenario = task["scenario"]
+    prefix = task["screenshot_prefix"]
+    log(f"\n{'='*50}")
+    log(f"{format_round(scenario)} {scenario['name']}".strip())
+    log(f"{'='*50}")
+    if shared:
+        log(f"  [공유] {step_range([num for num, _, _ in shared])} 결과 재사용")
+    _emit(options, "scenario_start", **_scenario_meta(scenario))
+    for num, result, shot in shared:
+        if shot:
+            for suffix in ("", "_error"):
+                src = f"{shot}_{num}{suffix}.png"
+                if os.path.exists(src):
+                    shutil.copyfile(src, f"{prefix}_{num}{suffix}.png")
+        _emit_step(options, scenario, num, result, prefix)
+
+
+def _shared_failure_results(tasks, shared, seconds, options, extra_step=None):
+    """공유 구간(또는 포크)이 실패하면 그 아래 시나리오 전부 같은 결과로 실패 처리"""
+    results = {}
+    for task in tasks:
+        _begin_shared_task(task, shared, options)
+        steps = [result for _, result, _ in shared] + ([extra_step] if extra_step else [])
+        results[task["index"]] = _scenario_result(task["scenario"], steps, "fail", seconds, options,
+                                                  sharedSteps=len(shared))
     return results
 
 
-def _pre_cancel_counsel(browser, base_url, auth_state_path):
-    """엣지 케이스 그룹 실행 전 기존 상담 1회 취소"""
-    print(f"\n{'='*50}")
-    print(f"[전처리] 엣지 케이스 실행 전 기존 상담 취소")
-    print(f"{'='*50}")
+def _fork_failure(item, shared, seconds, replayed, error, options):
+    """포크 복원 결과 확인 — 다시 실행한 스텝이 실패했거나 복원 에러면 그 아래 시나리오 결과 dict, 아니면 None"""
+    if not error and not any(result["status"] == "fail" for result in replayed):
+        return None
+    pending = item.all_tasks() if isinstance(item, PrefixNode) else [item]
+    restore_step = {"status": "fail", "desc": "공유 prefix 상태 복원", "error": error, "action": "fork"}
+    return _shared_failure_results(pending, shared, seconds, options, restore_step if error else None)
+
+
+def _node_banner(node):
+    return _banner(f"[공유 구간] 시나리오 {len(node.all_tasks())}개 — {step_range([step.num for step in node.steps])}")
+
+
+def _extend_shared(node, node_results, screenshot_prefix, shared, replay):
+    """공유 구간 실행 결과를 shared / replay 에 이어 붙임"""
+    shared += [(plan_step.num, result, screenshot_prefix) for plan_step, result in zip(node.steps, node_results)]
+    replay += [plan_step for plan_step in node.steps if plan_step.action in REPLAY_ACTIONS]
+
+
+def _fork_jobs(continuations, snapshot, shared, replay, seconds):
+    """첫 갈래를 뺀 나머지 갈래 → 큐에 넣을 작업 (LIFO 큐 — 뒤 갈래부터 넣어 앞 갈래가 먼저 실행되게)"""
+    fork = ForkState(snapshot, tuple(shared), tuple(replay), seconds)
+    return [(other, fork) for other in reversed(continuations[1:])]
+
+
+def _shared_task_result(task, shared, own_results, status, duration, options):
+    return _scenario_result(task["scenario"], [result for _, result, _ in shared] + own_results, status, duration,
+                            options, sharedSteps=len(shared))
+
+
+def _run_prefix_job(browser, job, jobs, results, auth_state_path, options):
+    """작업 1개 실행. job = (PrefixNode 또는 태스크, ForkState).
+    노드는 공유 스텝을 실행한 뒤 첫 갈래는 같은 컨텍스트에서 이어가고, 나머지 갈래는 스냅샷과 함께 큐에 넣는다.
+    """
+    item, fork = job
+    if isinstance(item, dict) and fork.snapshot is None:
+        results[item["index"]] = run_scenario(browser, item["scenario"], item["variables"], auth_state_path,
+                                              item["screenshot_prefix"], options=options, plan=item.get("plan"))
+        return
+
+    lead = item if isinstance(item, dict) else item.all_tasks()[0]  # 트리 안에서는 컨텍스트 생성 조건이 같음
+    line_started = time.monotonic()
+    shared, replay, seconds = list(fork.shared), list(fork.replay), fork.seconds
+    if fork.snapshot is None:
+        ctx = _new_scenario_context(browser, lead["scenario"], auth_state_path, options)
+        page, context = _open_page(ctx, None, auth_state_path, options)
+    else:
+        ctx, page, context, replayed, error = _fork_context(browser, lead["scenario"], auth_state_path, options, fork)
+        shared = _merge_replayed(shared, fork.replay, replayed)
+        failed = _fork_failure(item, shared, seconds, replayed, error, options)
+        if failed:
+            results.update(failed)
+            ctx.close()
+            return
+    fork_seconds = time.monotonic() - line_started
+
     try:
-        ctx = browser.new_context(storage_state=auth_state_path)
-        page = ctx.new_page()
-        page.set_default_timeout(10000)
-        step = {"action": "cancelExistingCounsel", "baseUrl": base_url, "description": "엣지 케이스 전처리 — 기존 상담 취소"}
-        context = {"screenshot_path": None, "auth_state_path": auth_state_path, "browser_context": ctx, "step_num": 0}
-        result = execute_step(page, step, context)
-        icon = "OK" if result["status"] == "pass" else "FAIL"
-        print(f"  [{icon}] {result['desc']}")
+        while isinstance(item, PrefixNode):
+            node = item
+            context["screenshot_path"] = shared_screenshot_prefix(node)
+            print("\n".join(_node_banner(node)))
+            node_started = time.monotonic()
+            node_results, status = _run_steps(page, context, node.steps, options)
+            seconds += time.monotonic() - node_started
+            _extend_shared(node, node_results, context["screenshot_path"], shared, replay)
+            if status == "fail":
+                results.update(_shared_failure_results(node.all_tasks(), shared, seconds, options))
+                return
+
+            continuations = node.continuations()
+            if len(continuations) > 1:
+                for fork_job in _fork_jobs(continuations, _take_snapshot(page, ctx, context), shared, replay, seconds):
+                    jobs.put(fork_job)
+            item = continuations[0]
+
+        task = item
+        own_started = time.monotonic()
+        _begin_shared_task(task, shared, options)
+        context["screenshot_path"] = task["screenshot_prefix"]
+        own_results, status = _run_steps(page, context, task["plan"].steps[len(shared):], options, task["scenario"])
+        duration = seconds + fork_seconds + (time.monotonic() - own_started)
+        results[task["index"]] = _shared_task_result(task, shared, own_results, status, duration, options)
+    finally:
         ctx.close()
+
+
+def _prefix_root_jobs(tasks, options):
+    """공유 prefix 트리 구성 → 처음 큐에 넣을 작업 (LIFO 큐에 넣는 순서: 단독 실행 짧은 것부터, 트리는 마지막)"""
+    for i, task in enumerate(tasks):
+        task["index"] = i
+    roots, standalone = build_prefix_forest(tasks, _prefix_signature(options))
+    _prepare_prefix_screenshots(tasks)
+    shared_count = sum(len(root.all_tasks()) for root in roots)
+    print(f"\n[공유 prefix] 트리 {len(roots)}개 (시나리오 {shared_count}개), 단독 실행 {len(standalone)}개")
+    return ([(task, ROOT_FORK) for task in reversed(_order_longest_first(standalone))]
+            + [(root, ROOT_FORK) for root in roots])
+
+
+def _run_prefix_worker(jobs, results, auth_state_path, options):
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        while True:
+            job = jobs.get()
+            if job is None:
+                jobs.task_done()
+                break
+            try:
+                _run_prefix_job(browser, job, jobs, results, auth_state_path, options)
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+            finally:
+                jobs.task_done()
+        browser.close()
+
+
+def _run_prefix_forest(tasks, auth_state_path, workers, options=None):
+    """공통 prefix 를 공유해 실행. 공유 구간/갈래를 작업 큐에 넣고 workers 개 브라우저가 나눠 실행한다.
+    결과는 입력 순서대로 반환.
+    """
+    jobs = queue.LifoQueue()
+    for job in _prefix_root_jobs(tasks, options):
+        jobs.put(job)
+
+    results = {}
+    threads = [threading.Thread(target=_run_prefix_worker, args=(jobs, results, auth_state_path, options), daemon=True)
+               for _ in range(max(1, min(workers, len(tasks))))]
+    for thread in threads:
+        thread.start()
+    # 브라우저 실행 실패 등으로 워커가 모두 종료되면 남은 작업을 기다리지 않음
+    while jobs.unfinished_tasks and any(thread.is_alive() for thread in threads):
+        time.sleep(0.1)
+    for _ in threads:
+        jobs.put(None)
+    for thread in threads:
+        thread.join()
+    return [results[i] for i in range(len(tasks)) if i in results]
+
+
+def _pre_cancel_step(base_url):
+    """전처리 상담 취소 — 배너 출력 후 실행할 cancelExistingCounsel 스텝"""
+    print("\n".join(_banner("[전처리] 엣지 케이스 실행 전 기존 상담 취소")))
+    return {"action": "cancelExistingCounsel", "baseUrl": base_url, "description": "엣지 케이스 전처리 — 기존 상담 취소"}
+
+
+def _pre_cancel_api_done(step, cancelled, unavailable):
+    """API 취소 결과 출력. 화면에서 다시 취소해야 하면 False"""
+    if not unavailable:
+        print(f"  [OK] {step['description']} — API {cancelled}건 취소")
+        return True
+    return False
+
+
+def _print_hook_result(result):
+    icon = "OK" if result["status"] == "pass" else "FAIL"
+    print(f"  [{icon}] {result['desc']}")
+
+
+def _pre_cancel_counsel(p, base_url, auth_state_path, options=None, browser=None):
+    """엣지 케이스 그룹 실행 전 기존 상담 1회 취소.
+    COUNSEL_*_API 가 지정돼 있으면 브라우저 없이 인증 상태로 만든 APIRequestContext 로 먼저 시도하고,
+    API 를 쓸 수 없거나 지정되지 않았으면 브라우저로 화면에서 취소 (browser 가 없으면 그때 띄움).
+    """
+    step = _pre_cancel_step(base_url)
+    if _counsel_api_urls(step):
+        try:
+            request = p.request.new_context(storage_state=auth_storage_state(auth_state_path))
+            try:
+                api_result = cancel_counsels_via_api(request, step)
+            finally:
+                request.dispose()
+        except Exception as e:
+            api_result = 0, str(e)
+        if _pre_cancel_api_done(step, *api_result):
+            return
+
+    own_browser = browser is None
+    ctx = None
+    try:
+        if own_browser:
+            browser = launch_browser(p)
+        ctx = browser.new_context(storage_state=auth_storage_state(auth_state_path))
+        apply_network_profile(ctx, resolve_network_profile(options))
+        page, context = _open_page(ctx, None, auth_state_path, options)
+        context["step_num"] = 0
+        _print_hook_result(execute_step(page, step, context))
     except Exception as e:
         print(f"  [FAIL] 상담 취소 실패: {e}")
+    finally:
         try:
-            ctx.close()
+            if ctx is not None:
+                ctx.close()
+            if own_browser and browser is not None:
+                browser.close()
         except Exception:
             pass
 
 
-def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=None, labels=None):
-    """특정 기능의 전체 시나리오 실행.
-    counsel 기능은 상담 충돌 방지를 위해 단일 워커로 순차 실행.
-    labels: 라벨 필터 리스트. 각 항목 간 AND, 쉼표 구분 시 OR.
-      예: ["happy-path", "inperson,phone"] → happy-path AND (inperson OR phone)
+def _engine_handlers(engine):
+    if engine == "async":
+        import async_runner
+        return async_runner.STEP_HANDLERS
+    return STEP_HANDLERS
+
+
+def engine_max_workers(engine, task_count=None):
+    """엔진별 최대 워커 수. process 는 호스트 CPU / 여유 메모리 / 워커당 메모리 추정치로 자동 결정"""
+    if engine == "async":
+        return ASYNC_MAX_CONCURRENCY
+    if engine == "process":
+        import process_pool
+        workers, reason = process_pool.auto_workers(task_count)
+        print(f"[프로세스 풀] 워커 {workers}개 ({reason})")
+        return workers
+    return MAX_WORKERS
+
+
+def compile_tasks(tasks, engine="sync", deferred=()):
+    """태스크마다 plan을 컴파일해 붙인다. (실행할 태스크, 컴파일 실패 결과) 반환.
+    deferred: 누락 검사를 미룰 변수 (compile_scenario)
+    """
+    handlers = _engine_handlers(engine)
+    runnable, failures = [], []
+    for task in tasks:
+        plan = compile_scenario(task["scenario"], task["variables"], handlers, deferred)
+        if plan.errors:
+            print(f"\n[컴파일 실패] {task['scenario'].get('name', '')}")
+            for error in plan.errors:
+                print(f"  - {error}")
+            failures.append(plan_failure_result(task["scenario"], plan))
+        else:
+            runnable.append(dict(task, plan=plan))
+    return runnable, failures
+
+
+def _auth_probe_url(tasks, base_url):
+    """인증 확인 요청 대상 — 인증 시나리오가 처음 navigate 하는 URL (세션 만료가 드러나는 바로 그 요청)"""
+    for task in tasks:
+        for plan_step in task["plan"].steps:
+            if plan_step.action == "navigate" and plan_step.step.get("url", "").startswith(base_url):
+                return plan_step.step["url"]
+    return base_url
+
+
+def preflight_tasks(tasks, base_url, auth_state_path, options=None, accounts=None, use_main=True):
+    """워커를 띄우기 전 인증 사전 점검 — 인증 시나리오가 있을 때만, 쓰일 인증 상태(기본 + 계정 풀)마다 1회.
+    만료면 AuthExpiredError (호출한 CLI 가 재로그인 안내 후 중단). 통과한 storage state 는 메모리에 캐시되어 워커가 공유.
+    HAR 재생은 실제 백엔드에 요청하지 않으므로 점검하지 않음.
+    use_main: 기본 인증 상태를 쓰는 태스크가 있는지 (계정 풀만 쓰는 실행이면 False)
+    """
+    auth_tasks = [t for t in tasks if t["scenario"].get("requiresAuth", False)]
+    if not auth_tasks or har_replaying(options):
+        return
+    targets = [(auth_state_path, None)] if use_main or not accounts else []
+    targets += [(account["authState"], account["name"]) for account in accounts or []]
+    probe_url = _auth_probe_url(auth_tasks, base_url)
+    print(f"\n[인증 확인] {probe_url}")
+    with sync_playwright() as p:
+        for path, account in targets:
+            preflight_auth(p, base_url, path, probe_url, account=account)
+
+
+def _run_sequential(tasks, auth_state_path, pre_cancel_base_url=None, options=None):
+    """브라우저 1개로 태스크를 순차 실행하고 결과 리스트 반환."""
+    results = []
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        if pre_cancel_base_url:
+            _pre_cancel_counsel(p, pre_cancel_base_url, auth_state_path, options, browser=browser)
+        for task in tasks:
+            result = run_scenario(browser, task["scenario"], task["variables"],
+                                  auth_state_path, task["screenshot_prefix"], options=options, plan=task.get("plan"))
+            results.append(result)
+        browser.close()
+    return results
+
+
+def _run_tasks(tasks, auth_state_path, workers, engine="sync", pre_cancel_base_url=None, options=None, accounts=None):
+    """엔진별 태스크 실행 진입점.
+    sync: workers == 1 이면 순차, 아니면 _run_parallel (스레드마다 브라우저 1개)
+    async: async_runner.run_tasks (브라우저 1개 + 컨텍스트 최대 workers 개)
+    pre_cancel_base_url 지정 시 실행 전에 기존 상담을 1회 취소.
+    options["share_prefix"] 면 공통 prefix 를 공유해 실행 (HAR 기록/재생은 시나리오별 파일이라 제외).
+    process: process_pool.run_process_pool (워커마다 프로세스 + 브라우저 1개, 메모리/부하가 높으면 새 태스크 보류).
+      prefix 공유는 한 프로세스 안에서 포크하는 방식이라 제외
+    accounts: 계정 풀 (account_pool.load_account_pool). 태스크마다 계정 1개를 독점 임대해 계정 수만큼 병렬 실행
+      (auth_state_path / workers 대신 계정의 인증 상태 / 계정 수 사용, prefix 공유는 단일 계정 기준이라 제외)
+    """
+    if engine == "process":
+        import process_pool
+        if pre_cancel_base_url:
+            with sync_playwright() as p:
+                _pre_cancel_counsel(p, pre_cancel_base_url, auth_state_path, options)
+        return process_pool.run_process_pool(tasks, auth_state_path, workers, options, accounts=accounts)
+
+    share_prefix = bool(options and options.get("share_prefix") and not options.get("har") and not accounts)
+    if engine == "async":
+        import async_runner
+        return async_runner.run_tasks(tasks, auth_state_path, concurrency=workers,
+                                      pre_cancel_base_url=pre_cancel_base_url, options=options,
+                                      share_prefix=share_prefix, accounts=accounts)
+
+    if accounts:
+        return _run_parallel(tasks, auth_state_path, options, accounts=accounts)
+
+    if workers == 1 and not share_prefix:
+        return _run_sequential(tasks, auth_state_path, pre_cancel_base_url, options)
+    if pre_cancel_base_url:
+        with sync_playwright() as p:
+            _pre_cancel_counsel(p, pre_cancel_base_url, auth_state_path, options)
+    if share_prefix:
+        return _run_prefix_forest(tasks, auth_state_path, workers, options)
+    return _run_parallel(tasks, auth_state_path, options, max_workers=workers)
+
+
+# ── 리소스 잠금 스케줄 실행 (index.json locks / setup / needs) ──
+
+def skipped_result(task, reason):
+    """스케줄러가 건너뛴 태스크의 결과 (선행 시나리오 실패 / 잠금 교착)"""
+    result = failure_result(task["scenario"], "실행 건너뜀", reason)
+    if task["scenario"].get("round"):
+        result["round"] = task["scenario"]["round"]
+    return result
+
+
+def scheduled_task(job, auth_state_path, handlers=None):
+    """스케줄러 작업 → (실행할 태스크, 인증 상태 경로). 계정을 임대받았으면 계정 유저 변수로 다시 컴파일"""
+    account = job["account"]
+    if account:
+        return lease_task(job["task"], account, handlers), account["authState"]
+    return job["task"], auth_state_path
+
+
+def _hook_to_run(job, options):
+    """실행할 전처리 훅 이름 (scheduler.SETUP_HOOKS). 건너뛴 작업이거나 HAR 재생(백엔드 상태 없음)이면 None"""
+    if job["skip"] or har_replaying(options):
+        return None
+    return job["hook"]
+
+
+def run_setup_hook(p, name, base_url, auth_state_path, options=None, browser=None):
+    """전처리 훅 실행 (scheduler.SETUP_HOOKS). HAR 재생 시에는 백엔드 상태가 없으므로 생략"""
+    if har_replaying(options):
+        return
+    if name == "cancel-counsels":
+        _pre_cancel_counsel(p, base_url, auth_state_path, options, browser=browser)
+
+
+def _record_skipped(job, results, options):
+    """스케줄러가 건너뛴 태스크 결과 기록"""
+    result = results[job["index"]] = skipped_result(job["task"], job["skip"])
+    print(f"\n  [SKIP] {result['name']}: {job['skip']}")
+    _emit(options, "scenario_end", id=result["id"], result=result)
+
+
+def _record_scheduled(job, result, results):
+    """스케줄 실행 결과 기록 (임대 계정 표시). 통과 여부 반환 — scheduler.done(job, ok)"""
+    if job["account"]:
+        result["account"] = job["account"]["name"]
+    results[job["index"]] = result
+    return result["status"] == "pass"
+
+
+def _run_scheduled_worker(scheduler, results, base_url, auth_state_path, options):
+    """워커 1개 — 브라우저 1개로 스케줄러가 내주는 작업(훅 / 태스크)을 끝날 때까지 실행"""
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        while True:
+            job = scheduler.acquire()
+            if job is None:
+                break
+            ok = False
+            try:
+                if job["kind"] == "hook":
+                    hook = _hook_to_run(job, options)
+                    if hook:
+                        run_setup_hook(p, hook, base_url, auth_state_path, options, browser=browser)
+                    ok = True
+                elif job["skip"]:
+                    _record_skipped(job, results, options)
+                else:
+                    task, task_auth = scheduled_task(job, auth_state_path)
+                    ok = _record_scheduled(job, run_scenario(browser, task["scenario"], task["variables"], task_auth,
+                                                             task["screenshot_prefix"], options=options,
+                                                             plan=task.get("plan")), results)
+            except Exception as e:
+                print(f"  워커 에러: {e}")
+            finally:
+                scheduler.done(job, ok)
+        browser.close()
+
+
+def run_scheduled(tasks, base_url, auth_state_path, workers, engine="sync", options=None, accounts=None):
+    """선언된 잠금 / 전처리 / 선행 시나리오를 지키면서 최대 workers 개 동시 실행. 결과는 태스크 순서.
+    sync: 스레드마다 브라우저 1개, async: 브라우저 1개 + 컨텍스트, process: 워커 프로세스 (훅은 부모에서 실행)
+    accounts: 계정 풀 — 계정 리소스를 독점하는 태스크는 빈 계정을 임대 (계정이 다르면 동시에 실행)
+    """
+    if not tasks:
+        return []
+    scheduler = ResourceScheduler(tasks, accounts, expected=expected_durations())
+    print(f"  {scheduler.describe()}")
+    if engine == "process":
+        import process_pool
+        return process_pool.run_process_pool(tasks, auth_state_path, workers, options, scheduler=scheduler,
+                                             base_url=base_url)
+    if engine == "async":
+        import async_runner
+        return async_runner.run_scheduled(scheduler, len(tasks), base_url, auth_state_path, workers, options)
+
+    results = {}
+    threads = [threading.Thread(target=_run_scheduled_worker,
+                                args=(scheduler, results, base_url, auth_state_path, options))
+               for _ in range(max(1, min(workers, len(tasks))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [results[i] for i in range(len(tasks)) if i in results]
+
+
+def feature_paths(feature_path):
+    """기능 폴더 인자 → 폴더 리스트. 쉼표로 여러 기능을 묶어 한 번에 실행 (예: "age-calculation/,counsel/")"""
+    return [f.strip() for f in feature_path.split(",") if f.strip()]
+
+
+def is_counsel_feature(feature_path):
+    return any(f.startswith("counsel") for f in feature_paths(feature_path))
+
+
+def select_tasks(base_url, feature_path, extra_vars=None, labels=None, engine="sync", accounts=None):
+    """기능 폴더 + 라벨 필터로 실행할 태스크 선택 → 변수 설정 → 컴파일.
+    (base_url, tasks, compile_failures, variables_by_id) 반환. 실행할 게 없거나 해피패스/엣지케이스가 섞이면 None.
+    매칭된 시나리오가 모두 locks 를 선언했으면 스케줄러가 충돌을 막으므로 해피패스/엣지케이스가 섞여도 된다.
+    accounts: 계정 풀 — 계정을 임대받을 태스크는 계정 유저 변수(ACCOUNT_VARIABLES) 누락을 검사하지 않음 (_compile_for_pool)
     """
     index = fetch_index()
+    features = feature_paths(feature_path)
     test_scenarios_meta = [
         s for s in index["scenarios"]
-        if s["type"] in ("test", "state-setup") and s["path"].startswith(feature_path)
+        if s["type"] in ("test", "state-setup") and any(s["path"].startswith(f) for f in features)
         and (labels is None or _matches_labels(s.get("labels", []), labels))
     ]
 
-    # ── 해피패스/엣지케이스 동시 실행 방지 ──
+    # ── 해피패스/엣지케이스 동시 실행 방지 (잠금 선언이 없는 경우) ──
     has_happy = any("happy-path" in s.get("labels", []) for s in test_scenarios_meta)
     has_edge = any("edge-case" in s.get("labels", []) for s in test_scenarios_meta)
-    if has_happy and has_edge:
+    if has_happy and has_edge and not all("locks" in s for s in test_scenarios_meta):
         print("\n[ERROR] 해피패스와 엣지케이스를 동시에 실행할 수 없습니다.")
         print("  → --label happy-path 또는 --label edge-case 를 추가하여 분리 실행하세요.")
         print(f"  현재 필터: {labels}")
@@ -566,22 +2193,23 @@ def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=N
         print(f"  매칭된 시나리오 ({len(matched_names)}개):")
         for name in matched_names:
             print(f"    - {name}")
-        return []
+        return None
 
     if not test_scenarios_meta:
         print("실행할 시나리오가 없습니다.")
-        return []
+        return None
 
     # HTTPS 강제
     if base_url.startswith("http://"):
         base_url = base_url.replace("http://", "https://", 1)
         print(f"[INFO] HTTP → HTTPS 자동 변환: {base_url}")
 
-    # 시나리오 JSON 미리 fetch (병렬 실행 전)
+    # 시나리오 JSON 미리 fetch (병렬 실행 전, 동시 요청)
+    scenarios = fetch_scenarios([meta["path"] for meta in test_scenarios_meta])
     variables = {"baseUrl": base_url}
     tasks = []
     for meta in test_scenarios_meta:
-        scenario = fetch_scenario(meta["path"])
+        scenario = scenarios[meta["path"]]
         if scenario.get("defaults"):
             for k, v in scenario["defaults"].items():
                 if k not in variables:
@@ -594,70 +2222,77 @@ def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=N
             "variables": dict(variables),
             "screenshot_prefix": f"/tmp/scenario_{scenario['id']}",
             "labels": meta.get("labels", []),
+            "locks": meta.get("locks"),
+            "setup": meta.get("setup", []),
+            "needs": meta.get("needs", []),
         })
 
-    total = len(tasks)
-    is_counsel = feature_path.startswith("counsel")
+    variables_by_id = {t["scenario"].get("id", ""): t["variables"] for t in tasks}
 
-    # counsel: 해피패스(상담 생성)는 순차, 엣지케이스(UI 검증)는 병렬 가능
-    if is_counsel:
-        happy_tasks = [t for t in tasks if "edge-case" not in t.get("labels", [])]
-        edge_tasks = [t for t in tasks if "edge-case" in t.get("labels", [])]
+    # 컴파일 (브라우저 실행 전에 누락 변수 / 알 수 없는 action 검출)
+    if accounts:
+        tasks, compile_failures = _compile_for_pool(tasks, feature_path, engine)
     else:
-        happy_tasks = tasks
-        edge_tasks = []
+        tasks, compile_failures = compile_tasks(tasks, engine)
+    return base_url, tasks, compile_failures, variables_by_id
 
-    all_results = []
 
-    # ── 해피패스/상태설정: 순차 실행 (상담 충돌 방지) ──
-    if happy_tasks:
-        if is_counsel:
-            print(f"\n[순차] 해피패스/상태설정 {len(happy_tasks)}개 실행 (브라우저 1개)")
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                for task in happy_tasks:
-                    result = run_scenario(browser, task["scenario"], task["variables"],
-                                          auth_state_path, task["screenshot_prefix"])
-                    all_results.append(result)
-                browser.close()
+def _compile_for_pool(tasks, feature_path, engine="sync"):
+    """계정 풀 실행의 컴파일 — 계정을 임대받는 태스크는 계정 유저 변수가 --var 로 없어도 됨
+    (lease_task 가 계정 변수로 다시 컴파일하며 전체 검사). 기본 인증 상태로 실행할 태스크는 전체 검사.
+    임대 여부는 run_all 규칙과 같음: 잠금 스케줄이면 계정 리소스를 독점으로만 잡는 태스크, 아니면 counsel 해피패스
+    """
+    scheduled = declares_locks(tasks)
+    is_counsel = is_counsel_feature(feature_path)
+    runnable, failures = [], []
+    for task in tasks:
+        if scheduled:
+            leased = leases_account(task.get("locks"))
         else:
-            workers = min(MAX_WORKERS, len(happy_tasks))
-            print(f"\n시나리오 {len(happy_tasks)}개 실행 (브라우저 {workers}개{' 순차' if workers == 1 else ' 병렬'})")
-            if workers == 1:
-                with sync_playwright() as p:
-                    browser = p.chromium.launch(headless=True)
-                    for task in happy_tasks:
-                        result = run_scenario(browser, task["scenario"], task["variables"],
-                                              auth_state_path, task["screenshot_prefix"])
-                        all_results.append(result)
-                    browser.close()
-            else:
-                all_results = _run_parallel(happy_tasks, auth_state_path)
-
-    # ── 엣지케이스: 병렬 실행 (상담 미생성, UI 검증만) ──
-    if edge_tasks:
-        workers = min(MAX_WORKERS, len(edge_tasks))
-        print(f"\n[병렬] 엣지케이스 {len(edge_tasks)}개 실행 (브라우저 {workers}개)")
-        # 첫 실행 전 기존 상담 1회 취소
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            _pre_cancel_counsel(browser, base_url, auth_state_path)
-            browser.close()
-        if workers == 1:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                for task in edge_tasks:
-                    result = run_scenario(browser, task["scenario"], task["variables"],
-                                          auth_state_path, task["screenshot_prefix"])
-                    all_results.append(result)
-                browser.close()
+            leased = is_counsel and "edge-case" not in task.get("labels", [])
+        compiled, failed = compile_tasks([task], engine, ACCOUNT_VARIABLES if leased else ())
+        runnable.extend(compiled)
+        failures.extend(failed)
+    return runnable, failures
+
+
+def incremental_tasks(tasks, base_url, options=None):
+    """증분 실행 (--only-failed / --changed) — 다시 실행할 태스크와 이전 결과로 대신할 태스크를 나눔 → (tasks, reused 결과).
+    only_failed: 같은 환경의 가장 최근 결과가 통과가 아니면 (결과가 없어도) 실행
+    changed: 시나리오 JSON + 최종 치환 변수 해시가 가장 최근 통과 결과와 다르면 (통과 결과가 없어도) 실행
+    둘 다 지정하면 어느 쪽에든 해당하면 실행. 재사용 결과에는 "reused" 가 붙고 이력(result_store)에는 다시 저장하지 않음
+    """
+    modes = [mode for mode in INCREMENTAL_MODES if options and options.get(mode)]
+    if not modes or not tasks:
+        return tasks, []
+    previous = previous_results(base_url, sorted({t["scenario"].get("id", "") for t in tasks}))
+    run, reused = [], []
+    for task in tasks:
+        prev = previous.get(task["scenario"].get("id", ""), {})
+        latest, passed = prev.get("latest"), prev.get("passed")
+        failed = latest is None or latest["status"] != "pass"
+        changed = passed is None or passed["reused"]["contentHash"] != content_hash(task["scenario"], task["variables"])
+        if ("only_failed" in modes and failed) or ("changed" in modes and changed):
+            run.append(task)
         else:
-            edge_results = _run_parallel(edge_tasks, auth_state_path)
-            all_results.extend(edge_results)
+            reused.append(passed if "changed" in modes else latest)
+    names = {"only_failed": "실패", "changed": "변경"}
+    print(f"\n[증분] {' + '.join(names[m] for m in modes)} 시나리오만 실행 — 실행 {len(run)}개, 이전 결과 재사용 {len(reused)}개")
+    return run, reused
+
+
+def split_counsel_tasks(tasks, feature_path):
+    """counsel: 해피패스(상담 생성)는 순차, 엣지케이스(UI 검증)는 병렬 가능 → (happy_tasks, edge_tasks)"""
+    if is_counsel_feature(feature_path):
+        return ([t for t in tasks if "edge-case" not in t.get("labels", [])],
+                [t for t in tasks if "edge-case" in t.get("labels", [])])
+    return tasks, []
 
-    # 요약
+
+def print_run_summary(all_results, base_url, repeat=1):
+    """전체 실행 결과 콘솔 요약 → (pass_count, fail_count)"""
     print(f"\n{'='*50}")
-    print(f"전체 시나리오 테스트 결과")
+    print("전체 시나리오 테스트 결과")
     print(f"대상: {base_url}")
     print(f"{'='*50}")
 
@@ -668,6 +2303,9 @@ def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=N
         icon = "PASS" if r["status"] == "pass" else "FAIL"
         step_pass = sum(1 for s in r["steps"] if s["status"] == "pass")
         step_total = len(r["steps"])
+        round_info = f" {r['round']}회차" if r.get("round") else ""
+        round_info += f" @{r['account']}" if r.get("account") else ""
+        round_info += f" (재사용 #{r['reused']['runId']})" if r.get("reused") else ""
         fail_info = ""
         if r["status"] == "fail":
             fail_step = next((s for s in r["steps"] if s["status"] == "fail"), None)
@@ -675,9 +2313,113 @@ def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=N
                 fail_info = f" — {fail_step['desc']}"
                 if fail_step.get("error"):
                     fail_info += f": {fail_step['error']}"
-        print(f"  {icon} {r['name']} ({step_pass}/{step_total} 스텝){fail_info}")
+        print(f"  {icon} {r['name']}{round_info} ({step_pass}/{step_total} 스텝){fail_info}")
+
+    reused_count = sum(1 for r in all_results if r.get("reused"))
+    reused_info = f" (이전 결과 재사용 {reused_count}개)" if reused_count else ""
+    print(f"\n전체: {len(all_results)}개 중 {pass_count}개 성공, {fail_count}개 실패{reused_info}")
+    overall = summarize_timing([step for r in all_results for step in r["steps"]])
+    if overall["total"]:
+        breakdown = " / ".join(f"{TIMING_LABELS[b]} {overall[b] / 1000:.1f}s" for b in TIMING_BUCKETS)
+        print(f"스텝 소요 시간 합계: {overall['total'] / 1000:.1f}s ({breakdown})")
+    if repeat > 1:
+        print_repeat_summary(summarize_repeats(all_results))
+    return pass_count, fail_count
+
+
+def run_all(base_url, feature_path, auth_state_path, category=None, extra_vars=None, labels=None, engine="sync",
+            options=None, repeat=1, accounts=None):
+    """특정 기능의 전체 시나리오 실행. feature_path 는 쉼표로 여러 기능을 묶을 수 있음.
+    선택된 시나리오가 모두 index.json 에 locks 를 선언했으면 run_scheduled (잠금 / 전처리 / 선행 시나리오 기준 병렬).
+    아니면 기존 규칙: counsel 기능은 상담 충돌 방지를 위해 단일 워커로 순차 실행.
+    repeat: 회차 수 (--repeat). 회차는 태스크로 펼쳐 같은 워커 풀에서 동시에 실행하고 (counsel 해피패스는 순차),
+      결과마다 "round" 가 붙는다. 통계는 summarize_repeats 로 집계.
+    accounts: 계정 풀 (--account-pool). counsel 해피패스/상태설정을 계정 수만큼 병렬 실행 (계정마다 독점 임대)
+    engine: "sync" (스레드마다 브라우저 1개), "async" (브라우저 1개 + 컨텍스트 다수),
+      "process" (프로세스마다 브라우저 1개, 워커 수는 호스트 자원으로 자동)
+    options: run_scenario 실행 옵션 (예: {"wait": "fixed"}). "events" 에 EventLog 를 넣으면 진행 이벤트를 JSONL 로 기록
+      "only_failed" / "changed" 가 있으면 해당 시나리오만 실행하고 나머지는 이전 결과 재사용 (incremental_tasks)
+    labels: 라벨 필터 리스트. 각 항목 간 AND, 쉼표 구분 시 OR.
+      예: ["happy-path", "inperson,phone"] → happy-path AND (inperson OR phone)
+    """
+    selection = select_tasks(base_url, feature_path, extra_vars, labels, engine, accounts)
+    if selection is None:
+        return []
+    base_url, tasks, compile_failures, variables_by_id = selection
+    hashes_by_id = {t["scenario"].get("id", ""): content_hash(t["scenario"], t["variables"]) for t in tasks}
+    reused = []
+    if repeat == 1:  # 반복 실행은 회차마다 실제로 실행해야 하므로 증분 선택 안 함
+        tasks, reused = incremental_tasks(tasks, base_url, options)
+
+    if repeat > 1:
+        tasks = repeat_tasks(tasks, repeat)
+        print(f"\n[반복] {repeat}회차 — 시나리오 {len(tasks) // repeat}개 × {repeat} = {len(tasks)}개 실행")
+        if options and options.get("share_prefix"):
+            # 회차마다 모든 스텝을 실제로 실행해야 안정성을 잴 수 있으므로 공유하지 않음
+            print("[INFO] --repeat 에서는 --share-prefix 를 적용하지 않습니다.")
+            options = dict(options, share_prefix=False)
+
+    is_counsel = is_counsel_feature(feature_path)
+    # 모든 시나리오가 locks 를 선언했으면 스케줄러가 충돌을 막음 → 아래 해피패스/엣지케이스 단계 대신 한 번에 실행
+    scheduled = declares_locks(tasks)
+    happy_tasks, edge_tasks = ([], []) if scheduled else split_counsel_tasks(tasks, feature_path)
+
+    # 세션 만료면 워커를 띄우기 전에 중단 (AuthExpiredError)
+    if scheduled:
+        preflight_tasks(tasks, base_url, auth_state_path, options, accounts=accounts)
+    else:
+        pool = accounts if is_counsel and happy_tasks else None
+        preflight_tasks(tasks, base_url, auth_state_path, options, accounts=pool,
+                        use_main=bool(edge_tasks) or not pool)
+
+    _emit(options, "run_start", feature=feature_path, baseUrl=base_url,
+          total=len(tasks) + len(compile_failures) + len(reused))
+    for result in compile_failures + reused:
+        _emit(options, "scenario_end", id=result["id"], result=result)
 
-    print(f"\n전체: {len(all_results)}개 중 {pass_count}개 성공, {fail_count}개 실패")
+    all_results = compile_failures + reused
+    max_workers = engine_max_workers(engine, len(tasks))
+    engine_label = {"async": "컨텍스트", "process": "프로세스"}.get(engine, "브라우저")
+
+    if scheduled and tasks:
+        workers = min(max(max_workers, len(accounts or [])), len(tasks))
+        print(f"\n[스케줄] {engine_label} 최대 {workers}개 — 잠금이 겹치지 않는 시나리오끼리 병렬")
+        all_results.extend(run_scheduled(tasks, base_url, auth_state_path, workers, engine, options, accounts))
+
+    # ── 해피패스/상태설정: 순차 실행 (상담 충돌 방지) ──
+    if happy_tasks:
+        if is_counsel and accounts:
+            # 계정이 1개여도 풀 계정을 임대해 실행 (기본 인증 상태 / --var 대신 계정 인증 상태 + 유저 변수)
+            pool = accounts[:len(happy_tasks)]
+            mode = "순차" if len(pool) == 1 else "병렬"
+            print(f"\n[계정 풀] 해피패스/상태설정 {len(happy_tasks)}개 실행 (계정 {len(pool)}개 {mode}: "
+                  f"{', '.join(account['name'] for account in pool)} — 계정마다 {engine_label} 1개)")
+            all_results.extend(_run_tasks(happy_tasks, auth_state_path, len(pool), engine, options=options,
+                                          accounts=pool))
+        elif is_counsel:
+            print(f"\n[순차] 해피패스/상태설정 {len(happy_tasks)}개 실행 ({engine_label} 1개)")
+            all_results.extend(_run_tasks(happy_tasks, auth_state_path, 1, engine, options=options))
+        else:
+            workers = min(max_workers, len(happy_tasks))
+            print(f"\n시나리오 {len(happy_tasks)}개 실행 ({engine_label} {workers}개{' 순차' if workers == 1 else ' 병렬'})")
+            all_results.extend(_run_tasks(happy_tasks, auth_state_path, workers, engine, options=options))
+
+    # ── 엣지케이스: 병렬 실행 (상담 미생성, UI 검증만) ──
+    if edge_tasks:
+        workers = min(max_workers, len(edge_tasks))
+        print(f"\n[병렬] 엣지케이스 {len(edge_tasks)}개 실행 ({engine_label} {workers}개)")
+        # 첫 실행 전 기존 상담 1회 취소 (HAR 재생 시에는 백엔드 상태가 없으므로 생략)
+        pre_cancel_base_url = None if har_replaying(options) else base_url
+        edge_results = _run_tasks(edge_tasks, auth_state_path, workers, engine, pre_cancel_base_url=pre_cancel_base_url,
+                                  options=options)
+        all_results.extend(edge_results)
+
+    record_durations(all_results)
+    record_run(all_results, base_url, feature=feature_path, labels=labels, engine=engine, options=options,
+               variables=extra_vars, variables_by_id=variables_by_id, hashes_by_id=hashes_by_id)
+
+    pass_count, fail_count = print_run_summary(all_results, base_url, repeat)
+    _emit(options, "run_end", passed=pass_count, failed=fail_count)
     return all_results
 
 
@@ -693,4 +2435,13 @@ if __name__ == "__main__":
     if mode == "all":
         feature = sys.argv[4] if len(sys.argv) > 4 else "age-calculation/"
         category = sys.argv[5] if len(sys.argv) > 5 else None
-        run_all(base_url, feature, auth_path, category=category)
+        engine = sys.argv[6] if len(sys.argv) > 6 else "sync"
+        events = EventLog()
+        try:
+            run_all(base_url, feature, auth_path, category=category, engine=engine, options={"events": events})
+        except AuthExpiredError as e:
+            print(f"\n{e.relogin_message()}")
+            sys.exit(1)
+        finally:
+            events.close()
+        print(f"Events: {events.path}")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+리소스 잠금 + 의존성(DAG) 스케줄러
+- run_all 의 하드코딩 규칙(counsel 해피패스 순차 / 해피패스·엣지케이스 혼합 거부 / 엣지케이스 전 상담 취소)을
+  index.json 선언으로 대체. 선택된 시나리오가 모두 locks 를 선언하면 이 스케줄러로 실행
+  → 라벨이 섞이거나 여러 기능을 묶은 실행도 한 번에, 충돌하지 않는 범위에서 최대한 병렬
+
+index.json 시나리오 항목:
+  "locks": {"counsel-slot:account": "exclusive", "ga-assignment": "exclusive"}
+      exclusive: 같은 리소스를 잡은 다른 작업과 동시에 실행하지 않음 / shared: shared 끼리는 동시에 실행 가능
+      ":account" 로 끝나는 리소스는 계정별. 계정 풀이 있으면 계정 리소스를 독점으로만 잡는 시나리오는 빈 계정을 임대
+      (공유로 잡는 시나리오와 전처리 훅은 기본 인증 상태 계정)
+      {} 는 "충돌 없음" 선언
+  "setup": ["cancel-counsels"]  — 실행 전에 필요한 전처리 훅 (SETUP_HOOKS). 같은 훅은 회차마다 1번
+  "needs": ["scenario-id"]      — 먼저 통과해야 하는 시나리오 (같은 실행에 선택된 경우만, 실패하면 건너뜀)
+
+전처리 훅은 자기 잠금을 독점으로 잡고 실행한 뒤, 그 훅이 필요한 시나리오가 모두 끝날 때까지 예약으로 유지한다
+(예: 상담을 취소한 뒤 엣지케이스가 끝나기 전에 해피패스가 새 상담을 만들지 못하게).
+예약은 공유 잠금처럼 그룹 밖 작업의 독점 잠금을 막지만, 그 훅이 필요한 시나리오는 같은 리소스를 독점으로 잡을 수 있다
+(예: "setup": ["cancel-counsels"] + "counsel-slot:account": "exclusive" 인 해피패스).
+"""
+
+import threading
+
+ACCOUNT_SCOPE = ":account"
+DEFAULT_ACCOUNT = "default"
+LOCK_MODES = ("exclusive", "shared")
+# 전처리 훅 — 실행은 엔진이 담당 (scenario_runner / async_runner 의 SETUP_HOOK 실행부)
+SETUP_HOOKS = {
+    "cancel-counsels": {"locks": {"counsel-slot:account": "exclusive"}, "desc": "기존 상담 취소"},
+}
+
+
+def declares_locks(tasks):
+    """모든 태스크가 locks 를 선언했는지 (하나라도 없으면 기존 run_all 규칙으로 실행)"""
+    return bool(tasks) and all(task.get("locks") is not None for task in tasks)
+
+
+def leases_account(locks):
+    """계정 리소스를 독점으로만 잡는지 — 계정 풀이 있으면 빈 계정을 임대받는 태스크"""
+    scoped = [mode for resource, mode in (locks or {}).items() if resource.endswith(ACCOUNT_SCOPE)]
+    return bool(scoped) and all(mode == "exclusive" for mode in scoped)
+
+
+def _validate_locks(owner, locks):
+    if not isinstance(locks, dict):
+        raise ValueError(f"{owner}: locks 는 {{리소스: 모드}} 객체여야 합니다")
+    for resource, mode in locks.items():
+        if mode not in LOCK_MODES:
+            raise ValueError(f"{owner}: 알 수 없는 잠금 모드 {resource}={mode} ({' | '.join(LOCK_MODES)})")
+
+
+class ResourceScheduler:
+    """태스크 + 전처리 훅을 작업(job) DAG 로 만들고, 의존성이 끝났고 잠금을 잡을 수 있는 작업부터 꺼내준다.
+    job: {"kind": "task" | "hook", "key", "index"(task), "task" | "hook", "account", "skip"(건너뛸 사유 또는 None),
+          "reserved"(hook — 실행 후 그룹이 끝날 때까지 예약한 리소스)}
+    스레드 엔진은 acquire() (대기), 이벤트 루프/디스패처는 next_ready() (즉시 반환) 후 done() 으로 반납
+    (skip 이 있는 작업은 실행하지 않고 바로 done(job, ok=False))
+    expected: 태스크 → 예상 소요 시간(초). 준비된 작업 중 훅 → 긴 태스크 순으로 꺼냄
+    """
+
+    def __init__(self, tasks, accounts=None, expected=None):
+        self.accounts = list(accounts or [])
+        self.jobs = {}
+        self._holders = {}  # 리소스 → {"exclusive": bool, "shared": int, "reserved": 예약한 훅 key set}
+        self._cond = threading.Condition()
+        self._started = set()
+        self._finished = set()
+        self._failed = set()
+
+        keys = {}
+        for i, task in enumerate(tasks):
+            scenario = task["scenario"]
+            owner = scenario.get("id", f"#{i}")
+            locks = task.get("locks") or {}
+            _validate_locks(owner, locks)
+            key = ("task", scenario.get("id", ""), scenario.get("round"))
+            keys[key] = i
+            self.jobs[key] = {"kind": "task", "key": key, "index": i, "task": task, "locks": dict(locks),
+                              "deps": set(), "group": set(), "account": None, "skip": None,
+                              "priority": expected(task) if expected else 0}
+
+        for key, job in list(self.jobs.items()):
+            task, round_num = job["task"], key[2]
+            for name in task.get("setup") or []:
+                if name not in SETUP_HOOKS:
+                    raise ValueError(f"{key[1]}: 알 수 없는 전처리 훅: {name} ({' | '.join(SETUP_HOOKS)})")
+                hook_key = ("hook", name, round_num)
+                hook = self.jobs.setdefault(hook_key, {
+                    "kind": "hook", "key": hook_key, "hook": name, "locks": dict(SETUP_HOOKS[name]["locks"]),
+                    "deps": set(), "group": set(), "account": None, "skip": None, "priority": 0, "held": None,
+                    "reserved": None,
+                })
+                hook["group"].add(key)
+                job["deps"].add(hook_key)
+            for need in task.get("needs") or []:
+                need_key = ("task", need, round_num)
+                if need_key in keys:
+                    job["deps"].add(need_key)
+                else:
+                    print(f"  [INFO] {key[1]}: 선행 시나리오 {need} 가 선택되지 않아 의존성 무시")
+        self._check_cycles()
+
+    def _check_cycles(self):
+        remaining = {key: set(job["deps"]) for key, job in self.jobs.items()}
+        while remaining:
+            ready = [key for key, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"needs 순환 의존: {', '.join(sorted(str(k[1]) for k in remaining))}")
+            for key in ready:
+                del remaining[key]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    # ── 잠금 ──
+
+    def _resolve(self, locks, account):
+        return {(r[:-len(ACCOUNT_SCOPE)] + ":" + account if r.endswith(ACCOUNT_SCOPE) else r): mode
+                for r, mode in locks.items()}
+
+    def _account_candidates(self, job):
+        """계정 리소스를 독점으로만 잡는 태스크는 계정 풀에서, 나머지는 기본 계정"""
+        if job["kind"] == "task" and self.accounts and leases_account(job["locks"]):
+            return self.accounts
+        return [None]
+
+    def _can_hold(self, locks, job):
+        for resource, mode in locks.items():
+            holder = self._holders.get(resource)
+            if holder is None:
+                continue
+            if holder["exclusive"]:
+                return False
+            if mode == "exclusive":
+                # 훅 예약은 그 훅이 필요한 작업의 독점 잠금은 막지 않음
+                others = [k for k in holder["reserved"] if job["key"] not in self.jobs[k]["group"]]
+                if holder["shared"] or others:
+                    return False
+        return True
+
+    def _holder(self, resource):
+        return self._holders.setdefault(resource, {"exclusive": False, "shared": 0, "reserved": set()})
+
+    def _drop_if_free(self, resource):
+        holder = self._holders[resource]
+        if not holder["exclusive"] and not holder["shared"] and not holder["reserved"]:
+            del self._holders[resource]
+
+    def _hold(self, locks):
+        for resource, mode in locks.items():
+            holder = self._holder(resource)
+            if mode == "exclusive":
+                holder["exclusive"] = True
+            else:
+                holder["shared"] += 1
+
+    def _release(self, locks):
+        for resource, mode in locks.items():
+            holder = self._holders[resource]
+            if mode == "exclusive":
+                holder["exclusive"] = False
+            else:
+                holder["shared"] -= 1
+            self._drop_if_free(resource)
+
+    def _reserve(self, hook, resources):
+        hook["reserved"] = list(resources)
+        for resource in hook["reserved"]:
+            self._holder(resource)["reserved"].add(hook["key"])
+
+    def _unreserve(self, hook):
+        for resource in hook["reserved"]:
+            self._holders[resource]["reserved"].discard(hook["key"])
+            self._drop_if_free(resource)
+        hook["reserved"] = None
+
+    # ── 작업 배분 ──
+
+    def _next_ready_locked(self):
+        waiting = [job for key, job in self.jobs.items()
+                   if key not in self._started and job["deps"] <= self._finished]
+        waiting.sort(key=lambda job: (job["kind"] != "hook", -job["priority"]))
+        for job in waiting:
+            # 전처리 훅 실패는 경고로 끝남 (기존 _pre_cancel_counsel 과 동일) — needs 로 건 시나리오 실패만 전파
+            failed = sorted(k[1] for k in job["deps"] & self._failed if k[0] == "task")
+            if failed:
+                return self._skip(job, f"선행 시나리오 실패: {', '.join(failed)}")
+            for account in self._account_candidates(job):
+                locks = self._resolve(job["locks"], account["name"] if account else DEFAULT_ACCOUNT)
+                if self._can_hold(locks, job):
+                    self._hold(locks)
+                    job["held"] = locks
+                    job["account"] = account
+                    self._started.add(job["key"])
+                    return job
+        if waiting and not (self._started - self._finished):
+            # 실행 중인 작업이 없는데 아무것도 잡을 수 없음 — 훅 예약과 needs 가 서로를 기다리는 선언
+            return self._skip(waiting[0], "잠금 교착 (locks / setup / needs 선언 확인)")
+        return None
+
+    def _skip(self, job, reason):
+        job["skip"] = reason
+        job["held"] = None
+        self._started.add(job["key"])
+        return job
+
+    def next_ready(self):
+        """지금 시작할 수 있는 작업 (없으면 None). 꺼낸 작업은 반드시 done() 으로 반납"""
+        with self._cond:
+            return self._next_ready_locked()
+
+    def acquire(self):
+        """시작할 수 있는 작업이 생길 때까지 대기. 모든 작업이 끝났으면 None"""
+        with self._cond:
+            while True:
+                job = self._next_ready_locked()
+                if job is not None or self.finished:
+                    return job
+                self._cond.wait()
+
+    @property
+    def finished(self):
+        return len(self._finished) == len(self.jobs)
+
+    def done(self, job, ok=True):
+        """작업 종료 — 잠금 반납. 훅은 그 훅이 필요한 시나리오가 모두 끝날 때까지 잠금을 예약으로 유지"""
+        with self._cond:
+            key = job["key"]
+            if job.get("held"):
+                self._release(job["held"])
+                if job["kind"] == "hook" and job["group"] - self._finished:
+                    self._reserve(job, job["held"])
+                job["held"] = None
+            self._finished.add(key)
+            if not ok or job["skip"]:
+                self._failed.add(key)
+            for hook_key in job["deps"]:
+                hook = self.jobs[hook_key]
+                if hook["kind"] == "hook" and hook.get("reserved") and not (hook["group"] - self._finished):
+                    self._unreserve(hook)
+            self._cond.notify_all()
+
+    def lock_groups(self):
+        """서로 기다리거나 충돌할 수 있는 태스크 묶음 → [[태스크 인덱스, ...]] (태스크 순서).
+        needs / 같은 전처리 훅으로 이어지거나, 같은 리소스를 한쪽이라도 독점으로 잡으면 같은 묶음.
+        묶음끼리는 잠금이 겹치지 않으므로 따로 실행해도 된다 (shard_node: 묶음마다 노드 1개, 묶음 안은 노드의 스케줄러).
+        계정 리소스는 계정별로 나누지 않음 (노드들이 같은 기본 계정을 쓰므로)
+        """
+        parent = {key: key for key in self.jobs}
+
+        def find(key):
+            while parent[key] != key:
+                key = parent[key]
+            return key
+
+        for key, job in self.jobs.items():
+            for dep in job["deps"]:
+                parent[find(key)] = find(dep)
+        holders = {}
+        for key, job in self.jobs.items():
+            for resource, mode in job["locks"].items():
+                holders.setdefault(resource, []).append((key, mode))
+        for held in holders.values():
+            if any(mode == "exclusive" for _, mode in held):
+                for key, _ in held[1:]:
+                    parent[find(key)] = find(held[0][0])
+
+        groups = {}
+        for job in sorted((j for j in self.jobs.values() if j["kind"] == "task"), key=lambda j: j["index"]):
+            groups.setdefault(find(job["key"]), []).append(job["index"])
+        return list(groups.values())
+
+    def describe(self):
+        """실행 전 요약 한 줄 — 작업 수 / 훅 / 잠금 리소스"""
+        hooks = [job["hook"] for job in self.jobs.values() if job["kind"] == "hook"]
+        resources = sorted({r for job in self.jobs.values() for r in job["locks"]})
+        tasks = len(self.jobs) - len(hooks)
+        hook_info = f", 전처리 {', '.join(sorted(set(hooks)))}" if hooks else ""
+        lock_info = f", 잠금 {', '.join(resources)}" if resources else ", 잠금 없음"
+        account_info = f", 계정 풀 {len(self.accounts)}개" if self.accounts else ""
+        return f"시나리오 {tasks}개{hook_info}{lock_info}{account_info}"
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+멀티 노드 샤드 실행 (--nodes)
+- 머신 1대의 워커 상한(MAX_WORKERS)을 넘는 회귀 테스트를 여러 머신에 나눠 실행
+- 노드: 샤드(태스크 묶음)를 받아 자기 머신에서 _run_tasks 로 실행하고 결과 + 스크린샷을 돌려줌
+- 코디네이터: 시나리오 선택/컴파일/인증 점검은 로컬에서 1번, 태스크를 노드 워커 수만큼씩 나눠주고 (work-stealing)
+  결과와 스크린샷을 모아 리포트 1개로 병합
+- 선택된 시나리오가 모두 locks 를 선언했으면 스케줄러의 잠금 묶음(ResourceScheduler.lock_groups) 단위로 배분:
+  같은 리소스를 독점으로 잡거나 needs / 전처리 훅으로 이어진 태스크는 한 묶음 → 노드 1개에서 노드의 스케줄러로 실행
+  (전처리 훅은 묶음마다 1번, 실패한 선행 시나리오의 후속은 건너뜀). 충돌 없는 태스크는 모든 노드에 나눠 병렬
+- 아니면 counsel 순서 제약은 run_all 과 동일: 해피패스/상태설정은 노드 1개에서 순차(샤드 1개),
+  엣지케이스는 노드 1개에서 기존 상담을 1회 취소한 뒤 모든 노드에 나눠 병렬
+
+사용법:
+  노드:        python3 shard_node.py serve [--host 127.0.0.1] [--port 7801] [--workers 4] [--token 토큰]
+  코디네이터:  INSTECH_NODE_TOKEN=토큰 python3 generate_report.py all <base_url> <auth_state_path> <feature_folder> \
+                   --nodes host1:7801,host2:7801
+
+공유 토큰: 노드는 --token (또는 INSTECH_NODE_TOKEN), 코디네이터는 INSTECH_NODE_TOKEN.
+  모든 요청에 "token" 을 실어 보내고 노드가 매번 확인. 루프백이 아닌 --host 는 토큰 없이 띄울 수 없음
+
+프로토콜: TCP 연결 1개 = 요청 1개. JSON 한 줄 요청 → JSON 한 줄 응답 (UTF-8, '\\n' 종료)
+  {"type": "hello"}                          → {"ok": true, "workers": N}
+  {"type": "preCancel", "baseUrl", "authState", "options"} → {"ok": true}
+  {"type": "run", "tasks", "workers", "engine", "options", "authState", "scheduled", "baseUrl"}
+                                             → {"ok": true, "results": [...], "screenshots": {경로: base64}}
+  실패 시 {"ok": false, "error": "..."}
+  scheduled: 태스크의 locks / setup / needs 로 run_scheduled 실행 (baseUrl 은 전처리 훅용)
+  ※ 인증 상태(세션 쿠키)를 평문으로 보내므로 (토큰이 있어도 암호화는 아님) 로컬/사내망 전용. 노드는 샤드를 한 번에 1개만 실행
+  ※ 스크린샷 prefix 는 SCREENSHOT_ROOT 아래만 허용 — 노드는 그 밖의 prefix 를 거부하고,
+    코디네이터는 보낸 태스크의 '{prefix}_*.png' 에 해당하는 경로만 저장
+"""
+
+import base64
+import fnmatch
+import glob
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+
+from playwright.sync_api import sync_playwright
+
+from auth_preflight import AuthExpiredError, auth_storage_state, remember_auth_state
+from network_profile import har_replaying
+from scenario_runner import (
+    MAX_WORKERS, _emit, _pre_cancel_counsel, _run_tasks, compile_tasks, expected_durations, failure_result,
+    incremental_tasks, is_counsel_feature, preflight_tasks, print_run_summary, record_durations, repeat_tasks,
+    run_scheduled, select_tasks, split_counsel_tasks,
+)
+from result_store import content_hash, record_run
+from scheduler import ResourceScheduler, declares_locks
+
+NODE_PORT = 7801
+NODE_CONNECT_TIMEOUT = 5  # 초 — 연결만. 샤드 실행은 오래 걸리므로 응답은 제한 없이 기다림
+NODE_AUTH_PATH = "/tmp/instech_node_auth_{port}.json"  # 노드가 받은 인증 상태를 저장하는 경로
+TASK_FIELDS = ("scenario", "variables", "screenshot_prefix", "labels")  # 전송할 태스크 필드 (plan 은 노드에서 다시 컴파일)
+SCHEDULE_FIELDS = ("locks", "setup", "needs")  # 잠금 스케줄 실행일 때만 함께 전송
+TOKEN_ENV = "INSTECH_NODE_TOKEN"  # 노드/코디네이터 공유 토큰
+SCREENSHOT_ROOT = "/tmp"  # 스크린샷 prefix 가 있어야 하는 디렉토리 (select_tasks 의 /tmp/scenario_{id})
+
+
+class NodeError(Exception):
+    """노드 연결 실패 / 노드가 요청을 처리하지 못함"""
+
+
+# ── 프로토콜 ──
+
+def parse_nodes(value):
+    """'host1:7801,host2' → [(host, port)]. 형식 오류면 ValueError"""
+    nodes = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if ":" in item else (item, "", str(NODE_PORT))
+        if not host or not port.isdigit():
+            raise ValueError(f"노드 주소 형식 오류: {item} (host:port)")
+        nodes.append((host, int(port)))
+    if not nodes:
+        raise ValueError("--nodes 에 노드가 없습니다")
+    return nodes
+
+
+def _send(sock_file, message):
+    sock_file.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+    sock_file.flush()
+
+
+def _receive(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise NodeError("연결이 끊겼습니다")
+    return json.loads(line)
+
+
+def node_token():
+    return os.environ.get(TOKEN_ENV) or None
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # 호스트 이름 — 어느 인터페이스에 바인딩될지 모르므로 외부로 간주
+
+
+def _under_screenshot_root(path):
+    root = os.path.realpath(SCREENSHOT_ROOT)
+    return os.path.realpath(path).startswith(root + os.sep)
+
+
+def check_screenshot_prefix(prefix):
+    """노드: 클라이언트가 보낸 prefix 확인 (이 prefix 의 '_*.png' 를 읽고 지우므로). 허용되지 않으면 ValueError"""
+    if not isinstance(prefix, str) or not prefix or any(c in prefix for c in "*?[]"):
+        raise ValueError(f"허용되지 않는 스크린샷 경로: {prefix!r}")
+    if not _under_screenshot_root(prefix):
+        raise ValueError(f"스크린샷 경로는 {SCREENSHOT_ROOT}/ 아래만 허용됩니다: {prefix}")
+
+
+def node_request(address, message):
+    """노드에 요청 1개 → 응답 dict. 연결 실패 / 오류 응답이면 NodeError. 공유 토큰이 있으면 실어 보냄"""
+    token = node_token()
+    if token:
+        message = dict(message, token=token)
+    try:
+        with socket.create_connection(address, timeout=NODE_CONNECT_TIMEOUT) as sock:
+            sock.settimeout(None)
+            with sock.makefile("rwb") as sock_file:
+                _send(sock_file, message)
+                response = _receive(sock_file)
+    except (OSError, ValueError) as e:
+        raise NodeError(str(e))
+    if not response.get("ok"):
+        raise NodeError(response.get("error", "알 수 없는 노드 오류"))
+    return response
+
+
+def _node_label(address):
+    return f"{address[0]}:{address[1]}"
+
+
+# ── 노드 ──
+
+def _read_screenshots(tasks):
+    """태스크 스크린샷 → {경로: base64} (run_scenario 가 실행 전에 정리하는 것과 같은 '{prefix}_*.png')"""
+    screenshots = {}
+    for task in tasks:
+        for path in glob.glob(f"{task['screenshot_prefix']}_*.png"):
+            with open(path, "rb") as f:
+                screenshots[path] = base64.b64encode(f.read()).decode("ascii")
+    return screenshots
+
+
+class NodeHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            message = _receive(self.rfile)
+            response = self.server.dispatch(message)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        _send(self.wfile, response)
+
+
+class ShardNode(socketserver.ThreadingTCPServer):
+    """샤드 실행 노드. hello 는 바로 응답하고, 샤드 실행은 잠금으로 1개씩 (브라우저 수를 --workers 로 제한)"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, workers=MAX_WORKERS, token=None):
+        super().__init__(address, NodeHandler)
+        self.workers = workers
+        self.token = token
+        self.auth_state_path = NODE_AUTH_PATH.format(port=self.server_address[1])
+        self._run_lock = threading.Lock()
+
+    def _use_auth_state(self, state):
+        """코디네이터가 보낸 인증 상태를 파일 + 메모리 캐시에 반영 (없으면 기존 파일 사용)"""
+        if state is None:
+            return
+        with open(self.auth_state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.chmod(self.auth_state_path, 0o600)
+        remember_auth_state(self.auth_state_path, state)
+
+    def dispatch(self, message):
+        if self.token and not hmac.compare_digest(str(message.get("token") or ""), self.token):
+            return {"ok": False, "error": "토큰 불일치 (INSTECH_NODE_TOKEN 확인)"}
+        kind = message.get("type")
+        if kind == "hello":
+            return {"ok": True, "workers": self.workers}
+        if kind not in ("preCancel", "run"):
+            return {"ok": False, "error": f"알 수 없는 요청: {kind}"}
+        with self._run_lock:
+            self._use_auth_state(message.get("authState"))
+            options = message.get("options") or {}
+            if kind == "preCancel":
+                with sync_playwright() as p:
+                    _pre_cancel_counsel(p, message["baseUrl"], self.auth_state_path, options)
+                return {"ok": True}
+            engine = message.get("engine", "sync")
+            for task in message.get("tasks", []):
+                check_screenshot_prefix(task.get("screenshot_prefix"))
+            tasks, failures = compile_tasks(message.get("tasks", []), engine)
+            workers = max(1, min(message.get("workers") or self.workers, self.workers))
+            scheduled = bool(message.get("scheduled"))
+            mode = ", 잠금 스케줄" if scheduled else ""
+            print(f"\n[노드] 샤드 {len(tasks) + len(failures)}개 실행 ({engine}, 워커 {workers}{mode})")
+            if scheduled:
+                run = run_scheduled(tasks, message.get("baseUrl", ""), self.auth_state_path, workers, engine, options)
+            else:
+                run = _run_tasks(tasks, self.auth_state_path, workers, engine, options=options) if tasks else []
+            results = list(failures) + run
+            return {"ok": True, "results": results, "screenshots": _read_screenshots(tasks)}
+
+
+def serve(host="127.0.0.1", port=NODE_PORT, workers=MAX_WORKERS, token=None):
+    """노드 실행. 루프백이 아닌 주소에 바인딩하려면 공유 토큰이 있어야 함 (없으면 ValueError)"""
+    if not token and not is_loopback(host):
+        raise ValueError(f"--host {host} 는 외부에서 접속할 수 있으므로 공유 토큰이 필요합니다 "
+                         f"(--token 또는 {TOKEN_ENV})")
+    with ShardNode((host, port), workers, token) as server:
+        auth_info = "토큰 확인" if token else "토큰 없음, 루프백 전용"
+        print(f"[노드] {host}:{server.server_address[1]} 대기 중 (워커 {workers}, {auth_info}) — Ctrl+C 로 종료")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ── 코디네이터 ──
+
+def _wire_options(options):
+    """노드로 보낼 실행 옵션 — EventLog 등 직렬화할 수 없는 값 제외 (이벤트는 코디네이터가 결과로 기록)"""
+    return {k: v for k, v in (options or {}).items() if k != "events"}
+
+
+def _wire_task(task, scheduled=False):
+    fields = TASK_FIELDS + SCHEDULE_FIELDS if scheduled else TASK_FIELDS
+    return {k: task[k] for k in fields if k in task}
+
+
+def _task_key(scenario_or_result):
+    return scenario_or_result.get("id", ""), scenario_or_result.get("round")
+
+
+def _allowed_screenshot(tasks, path):
+    """노드가 보낸 경로가 이번 샤드 태스크의 '{prefix}_*.png' 이고 SCREENSHOT_ROOT 아래인지"""
+    if not isinstance(path, str) or not _under_screenshot_root(path):
+        return False
+    real = os.path.realpath(path)
+    for task in tasks:
+        prefix = os.path.realpath(task["screenshot_prefix"])
+        if (os.path.dirname(real) == os.path.dirname(prefix)
+                and fnmatch.fnmatchcase(os.path.basename(real), f"{os.path.basename(prefix)}_*.png")):
+            return True
+    return False
+
+
+def _store_screenshots(tasks, screenshots, node_label=""):
+    """노드가 보낸 스크린샷을 같은 경로에 저장 (리포트가 로컬 '{prefix}_*.png' 를 찾으므로). 이전 실행 파일은 먼저 정리.
+    보낸 태스크의 스크린샷 경로가 아니면 저장하지 않음 (노드 응답으로 임의 파일을 쓰지 않도록)
+    """
+    for task in tasks:
+        for old in glob.glob(f"{task['screenshot_prefix']}_*.png"):
+            os.remove(old)
+    for path, b64 in screenshots.items():
+        if not _allowed_screenshot(tasks, path):
+            print(f"  [WARN] 노드 {node_label} 가 보낸 스크린샷 경로 무시: {path!r}")
+            continue
+        with open(os.path.realpath(path), "wb") as f:
+            f.write(base64.b64decode(b64))
+
+
+class Coordinator:
+    """노드 목록 + 실행 공통 값(엔진/옵션/인증 상태)으로 샤드를 나눠 실행"""
+
+    def __init__(self, nodes, engine, options, auth_state):
+        self.nodes = nodes  # [{"address", "workers"}] — 실패한 노드는 빠짐
+        self.engine = engine
+        self.options = options
+        self.auth_state = auth_state
+        self._lock = threading.Lock()
+
+    def _drop(self, node, error):
+        with self._lock:
+            if node in self.nodes:
+                self.nodes.remove(node)
+        print(f"  [WARN] 노드 {_node_label(node['address'])} 제외: {error}")
+
+    def _run_shard(self, node, tasks, workers, results, base_url=None):
+        """샤드 1개 실행. base_url 이 있으면 잠금 스케줄 실행 (노드가 locks / setup / needs 로 run_scheduled)"""
+        scheduled = base_url is not None
+        message = {
+            "type": "run", "tasks": [_wire_task(t, scheduled) for t in tasks], "workers": workers,
+            "engine": self.engine, "options": _wire_options(self.options), "authState": self.auth_state,
+        }
+        if scheduled:
+            message.update(scheduled=True, baseUrl=base_url)
+        response = node_request(node["address"], message)
+        _store_screenshots(tasks, response.get("screenshots", {}), _node_label(node["address"]))
+        returned = {_task_key(r): r for r in response.get("results", [])}
+        with self._lock:
+            for task in tasks:
+                result = returned.get(_task_key(task["scenario"])) or failure_result(
+                    task["scenario"], "노드 실행", f"노드 {_node_label(node['address'])} 가 결과를 보내지 않았습니다")
+                if task["scenario"].get("round"):
+                    result.setdefault("round", task["scenario"]["round"])
+                result["node"] = _node_label(node["address"])
+                results[id(task)] = result
+                _emit(self.options, "scenario_end", id=result["id"], result=result)
+            done = len(results)
+        print(f"  [노드 {_node_label(node['address'])}] 샤드 {len(tasks)}개 완료 (누적 {done}개)")
+
+    def run_serial(self, tasks, results):
+        """샤드 1개를 노드 1개에서 순차 실행 (counsel 해피패스). 노드가 실패하면 다음 노드로"""
+        for node in list(self.nodes):
+            try:
+                self._run_shard(node, tasks, 1, results)
+                return
+            except NodeError as e:
+                self._drop(node, e)
+
+    def run_parallel(self, tasks, results):
+        """태스크를 노드에 나눠 병렬 실행 (run_groups 의 태스크 1개짜리 묶음)"""
+        self.run_groups([[task] for task in tasks], results)
+
+    def run_groups(self, groups, results, base_url=None):
+        """노드마다 스레드 1개가 공유 큐에서 묶음을 자기 워커 수가 찰 때까지 가져가 실행 (work-stealing).
+        묶음은 나누지 않음 — 한 묶음은 항상 노드 1개의 샤드 1개 안에서 실행 (긴 묶음부터).
+        노드가 실패하면 그 샤드의 묶음을 큐에 되돌려 남은 노드가 가져감.
+        base_url: 잠금 스케줄 실행 (_run_shard)
+        """
+        expected = expected_durations()
+        pending = queue.Queue()
+        for group in sorted(groups, key=lambda g: sum(expected(task) for task in g), reverse=True):
+            pending.put(group)
+
+        def node_loop(node):
+            while True:
+                taken = []
+                while sum(len(group) for group in taken) < node["workers"]:
+                    try:
+                        taken.append(pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if not taken:
+                    return
+                shard = [task for group in taken for task in group]
+                try:
+                    self._run_shard(node, shard, node["workers"], results, base_url)
+                except NodeError as e:
+                    for group in taken:
+                        pending.put(group)
+                    self._drop(node, e)
+                    return
+
+        while not pending.empty() and self.nodes:
+            threads = [threading.Thread(target=node_loop, args=(node,), daemon=True) for node in list(self.nodes)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    def pre_cancel(self, base_url):
+        """엣지 케이스 전 기존 상담 1회 취소 — 노드 1개에서 (모든 노드가 같은 계정을 쓰므로 1번이면 충분)"""
+        for node in list(self.nodes):
+            try:
+                node_request(node["address"], {"type": "preCancel", "baseUrl": base_url, "authState": self.auth_state,
+                                               "options": _wire_options(self.options)})
+                return
+            except NodeError as e:
+                self._drop(node, e)
+
+
+def connect_nodes(addresses):
+    """hello 로 노드 상태/워커 수 확인 → 응답한 노드 목록 [{"address", "workers"}]"""
+    nodes = []
+    for address in addresses:
+        try:
+            response = node_request(address, {"type": "hello"})
+        except NodeError as e:
+            print(f"  [WARN] 노드 {_node_label(address)} 연결 실패: {e}")
+            continue
+        nodes.append({"address": address, "workers": max(1, int(response.get("workers") or 1))})
+        print(f"  [OK] 노드 {_node_label(address)} (워커 {nodes[-1]['workers']})")
+    return nodes
+
+
+def run_sharded(base_url, feature_path, auth_state_path, addresses, extra_vars=None, labels=None, engine="sync",
+                options=None, repeat=1):
+    """run_all 의 멀티 노드 버전 — 선택/컴파일/인증 점검은 로컬, 실행은 노드에서. 결과는 태스크 순서대로 병합.
+    addresses: [(host, port)]. 응답하는 노드가 없으면 NodeError
+    """
+    selection = select_tasks(base_url, feature_path, extra_vars, labels, engine)
+    if selection is None:
+        return []
+    base_url, tasks, compile_failures, variables_by_id = selection
+    hashes_by_id = {t["scenario"].get("id", ""): content_hash(t["scenario"], t["variables"]) for t in tasks}
+    reused = []
+    if repeat == 1:
+        tasks, reused = incremental_tasks(tasks, base_url, options)
+
+    if repeat > 1:
+        tasks = repeat_tasks(tasks, repeat)
+        print(f"\n[반복] {repeat}회차 — 시나리오 {len(tasks) // repeat}개 × {repeat} = {len(tasks)}개 실행")
+    if options and options.get("share_prefix"):
+        # 공유 prefix 는 한 프로세스 안에서 스냅샷을 포크하는 방식이라 노드 간에는 나눌 수 없음
+        print("[INFO] --nodes 에서는 --share-prefix 를 적용하지 않습니다.")
+        options = dict(options, share_prefix=False)
+
+    # 모든 시나리오가 locks 를 선언했으면 잠금 묶음 단위로 노드에 배분 (묶음 안은 노드의 스케줄러가 잠금 / 훅 / needs 처리)
+    # 아니면 기존 규칙 (counsel 해피패스는 노드 1개 순차, 엣지케이스는 그 다음 병렬)
+    scheduled = declares_locks(tasks)
+    groups = [[tasks[i] for i in group] for group in ResourceScheduler(tasks).lock_groups()] if scheduled else []
+    happy_tasks, edge_tasks = ([], []) if scheduled else split_counsel_tasks(tasks, feature_path)
+    is_counsel = is_counsel_feature(feature_path)
+
+    # 세션 만료면 노드에 보내기 전에 중단 (AuthExpiredError). 통과한 인증 상태를 노드에 그대로 전달
+    preflight_tasks(tasks, base_url, auth_state_path, options)
+    try:
+        auth_state = auth_storage_state(auth_state_path)
+    except AuthExpiredError:
+        auth_state = None  # 인증 시나리오가 없어 점검하지 않았고 파일도 없음 — 노드는 자기 파일 사용
+
+    print(f"\n[노드] {len(addresses)}개 연결 확인")
+    coordinator = Coordinator(connect_nodes(addresses), engine, options, auth_state)
+    if not coordinator.nodes:
+        raise NodeError("응답하는 노드가 없습니다")
+
+    _emit(options, "run_start", feature=feature_path, baseUrl=base_url,
+          total=len(tasks) + len(compile_failures) + len(reused))
+    for result in compile_failures + reused:
+        _emit(options, "scenario_end", id=result["id"], result=result)
+
+    results = {}
+    if groups:
+        workers = sum(node["workers"] for node in coordinator.nodes)
+        print(f"\n[스케줄] 잠금 묶음 {len(groups)}개 실행 (노드 {len(coordinator.nodes)}개, 워커 합계 {workers}개) "
+              f"— 묶음마다 노드 1개")
+        coordinator.run_groups(groups, results, base_url)
+    if happy_tasks:
+        if is_counsel:
+            print(f"\n[순차] 해피패스/상태설정 {len(happy_tasks)}개 실행 (노드 1개, 브라우저 1개)")
+            coordinator.run_serial(happy_tasks, results)
+        else:
+            workers = sum(node["workers"] for node in coordinator.nodes)
+            print(f"\n시나리오 {len(happy_tasks)}개 실행 (노드 {len(coordinator.nodes)}개, 워커 합계 {workers}개)")
+            coordinator.run_parallel(happy_tasks, results)
+    if edge_tasks and coordinator.nodes:
+        print(f"\n[병렬] 엣지케이스 {len(edge_tasks)}개 실행 (노드 {len(coordinator.nodes)}개)")
+        if not har_replaying(options):  # HAR 재생 시에는 백엔드 상태가 없으므로 생략
+            coordinator.pre_cancel(base_url)
+        coordinator.run_parallel(edge_tasks, results)
+
+    all_results = compile_failures + reused
+    for task in tasks:
+        result = results.get(id(task))
+        if result is None:
+            result = failure_result(task["scenario"], "노드 실행", "실행할 수 있는 노드가 남아 있지 않습니다")
+            if task["scenario"].get("round"):
+                result["round"] = task["scenario"]["round"]
+            _emit(options, "scenario_end", id=result["id"], result=result)
+        all_results.append(result)
+
+    record_durations(all_results)
+    record_run(all_results, base_url, feature=feature_path, labels=labels, engine=engine, options=options,
+               variables=extra_vars, variables_by_id=variables_by_id, hashes_by_id=hashes_by_id)
+    pass_count, fail_count = print_run_summary(all_results, base_url, repeat)
+    _emit(options, "run_end", passed=pass_count, failed=fail_count)
+    return all_results
+
+
+if __name__ == "__main__":
+    host = "127.0.0.1"
+    port = NODE_PORT
+    workers = MAX_WORKERS
+    token = node_token()
+
+    args = sys.argv[1:]
+    if not args or args[0] != "serve":
+        print(__doc__)
+        sys.exit(1)
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg == "--host" and value:
+            host = value
+        elif arg == "--port" and value and value.isdigit():
+            port = int(value)
+        elif arg == "--workers" and value and value.isdigit():
+            workers = max(1, int(value))
+        elif arg == "--token" and value:
+            token = value
+        else:
+            print(__doc__)
+            sys.exit(1)
+        i += 2
+
+    try:
+        serve(host, port, workers, token)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+계정 풀 컴파일 테스트 (브라우저 / 네트워크 없음 — 로컬 scenarios/ 사용)
+실행: python3 -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import scenario_runner  # noqa: E402
+from account_pool import load_account_pool  # noqa: E402
+
+ACCOUNT_VARIABLES = {"userId": "qa-1", "userName": "홍길동", "userPhone": "01012345678",
+                     "userBirthDate": "19900101", "userGender": "1"}
+
+
+class PoolCompileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.offline = scenario_runner.OFFLINE
+        scenario_runner.OFFLINE = True
+        self.tmp = tempfile.TemporaryDirectory()
+        auth_state = os.path.join(self.tmp.name, "auth.json")
+        with open(auth_state, "w", encoding="utf-8") as f:
+            json.dump({"cookies": [], "origins": []}, f)
+        pool_path = os.path.join(self.tmp.name, "pool.json")
+        with open(pool_path, "w", encoding="utf-8") as f:
+            json.dump([{"name": "qa-1", "authState": auth_state, "variables": ACCOUNT_VARIABLES}], f)
+        self.accounts = load_account_pool(pool_path)
+
+    def tearDown(self):
+        scenario_runner.OFFLINE = self.offline
+        self.tmp.cleanup()
+
+    def select(self, labels, accounts=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, tasks, failures, _ = scenario_runner.select_tasks("https://x", "counsel/", labels=labels,
+                                                                 accounts=accounts)
+        return tasks, failures
+
+    def test_happy_path_compiles_with_pool_and_no_vars(self):
+        tasks, failures = self.select(["happy-path"], self.accounts)
+        self.assertEqual(failures, [])
+        self.assertTrue(tasks)
+        leased = scenario_runner.lease_task(tasks[0], self.accounts[0])
+        self.assertEqual(leased["plan"].errors, ())
+
+    def test_happy_path_without_pool_still_reports_missing_vars(self):
+        tasks, failures = self.select(["happy-path"])
+        self.assertTrue(failures)
+        self.assertIn("누락된 변수", failures[0]["steps"][0]["error"])
+
+    def test_edge_case_runs_on_main_account_and_keeps_full_check(self):
+        _, failures = self.select(["edge-case"], self.accounts)
+        self.assertTrue(failures)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+scheduler.py 순수 로직 테스트 (브라우저 없음)
+실행: python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from scheduler import ResourceScheduler  # noqa: E402
+
+COUNSEL_EXCLUSIVE = {"counsel-slot:account": "exclusive"}
+
+
+def make_task(scenario_id, locks=None, setup=None, needs=None):
+    return {"scenario": {"id": scenario_id}, "locks": {} if locks is None else locks,
+            "setup": setup or [], "needs": needs or []}
+
+
+def drain_ready(scheduler):
+    """지금 시작할 수 있는 작업을 모두 꺼냄"""
+    jobs = []
+    while True:
+        job = scheduler.next_ready()
+        if job is None:
+            return jobs
+        jobs.append(job)
+
+
+def job_name(job):
+    return job["key"][1]
+
+
+class HookWithExclusiveMemberTest(unittest.TestCase):
+
+    def test_single_member_runs_after_hook(self):
+        scheduler = ResourceScheduler([make_task("happy", COUNSEL_EXCLUSIVE, setup=["cancel-counsels"])])
+
+        hook = scheduler.next_ready()
+        self.assertEqual(hook["kind"], "hook")
+        self.assertIsNone(scheduler.next_ready())
+        scheduler.done(hook)
+
+        task = scheduler.next_ready()
+        self.assertEqual(job_name(task), "happy")
+        self.assertIsNone(task["skip"])
+        scheduler.done(task)
+        self.assertTrue(scheduler.finished)
+
+    def test_exclusive_members_run_one_at_a_time(self):
+        scheduler = ResourceScheduler([
+            make_task("happy-a", COUNSEL_EXCLUSIVE, setup=["cancel-counsels"]),
+            make_task("happy-b", COUNSEL_EXCLUSIVE, setup=["cancel-counsels"]),
+        ])
+        scheduler.done(scheduler.next_ready())
+
+        first = drain_ready(scheduler)
+        self.assertEqual(len(first), 1)
+        self.assertIsNone(first[0]["skip"])
+        scheduler.done(first[0])
+
+        second = drain_ready(scheduler)
+        self.assertEqual(len(second), 1)
+        self.assertIsNone(second[0]["skip"])
+        scheduler.done(second[0])
+        self.assertTrue(scheduler.finished)
+
+    def test_reservation_still_blocks_tasks_outside_group(self):
+        scheduler = ResourceScheduler([
+            make_task("edge", {"counsel-slot:account": "shared"}, setup=["cancel-counsels"]),
+            make_task("happy", COUNSEL_EXCLUSIVE),
+        ])
+        hook = scheduler.next_ready()
+        self.assertEqual(hook["kind"], "hook")
+        scheduler.done(hook)
+
+        ready = drain_ready(scheduler)
+        self.assertEqual([job_name(job) for job in ready], ["edge"])
+        scheduler.done(ready[0])
+
+        happy = scheduler.next_ready()
+        self.assertEqual(job_name(happy), "happy")
+        self.assertIsNone(happy["skip"])
+
+
+class AccountPoolTest(unittest.TestCase):
+    ACCOUNTS = [{"name": "a1"}, {"name": "a2"}]
+
+    def test_exclusive_account_tasks_lease_separate_accounts(self):
+        scheduler = ResourceScheduler([make_task(f"happy-{i}", COUNSEL_EXCLUSIVE) for i in range(3)],
+                                      accounts=self.ACCOUNTS)
+        running = drain_ready(scheduler)
+        self.assertEqual(sorted(job["account"]["name"] for job in running), ["a1", "a2"])
+
+        released = running[0]
+        scheduler.done(released)
+        third = scheduler.next_ready()
+        self.assertEqual(third["account"]["name"], released["account"]["name"])
+
+    def test_shared_account_tasks_use_default_account(self):
+        scheduler = ResourceScheduler([make_task("edge", {"counsel-slot:account": "shared"})],
+                                      accounts=self.ACCOUNTS)
+        job = scheduler.next_ready()
+        self.assertIsNone(job["account"])
+        self.assertEqual(job["held"], {"counsel-slot:default": "shared"})
+
+
+class NeedsTest(unittest.TestCase):
+
+    def test_failed_need_skips_dependents(self):
+        scheduler = ResourceScheduler([
+            make_task("create"),
+            make_task("modify", needs=["create"]),
+            make_task("delete", needs=["modify"]),
+        ])
+        create = scheduler.next_ready()
+        self.assertEqual(job_name(create), "create")
+        self.assertIsNone(scheduler.next_ready())
+        scheduler.done(create, ok=False)
+
+        modify = scheduler.next_ready()
+        self.assertEqual(job_name(modify), "modify")
+        self.assertIn("create", modify["skip"])
+        scheduler.done(modify, ok=False)
+
+        delete = scheduler.next_ready()
+        self.assertIn("modify", delete["skip"])
+        scheduler.done(delete, ok=False)
+        self.assertTrue(scheduler.finished)
+
+    def test_passed_need_runs_dependent(self):
+        scheduler = ResourceScheduler([make_task("create"), make_task("modify", needs=["create"])])
+        scheduler.done(scheduler.next_ready())
+        modify = scheduler.next_ready()
+        self.assertIsNone(modify["skip"])
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ResourceScheduler([make_task("a", needs=["b"]), make_task("b", needs=["a"])])
+
+
+class LockGroupsTest(unittest.TestCase):
+
+    def test_exclusive_resource_and_hook_share_one_group(self):
+        scheduler = ResourceScheduler([
+            make_task("happy", COUNSEL_EXCLUSIVE),
+            make_task("free-a", {}),
+            make_task("edge", {"counsel-slot:account": "shared"}, setup=["cancel-counsels"]),
+            make_task("ga", {"ga-assignment": "exclusive"}),
+            make_task("ga-check", {"ga-assignment": "shared"}),
+            make_task("free-b", {}),
+        ])
+        self.assertEqual(scheduler.lock_groups(), [[0, 2], [1], [3, 4], [5]])
+
+    def test_shared_only_resource_does_not_group(self):
+        scheduler = ResourceScheduler([make_task("a", {"report": "shared"}), make_task("b", {"report": "shared"})])
+        self.assertEqual(scheduler.lock_groups(), [[0], [1]])
+
+    def test_needs_chain_is_one_group(self):
+        scheduler = ResourceScheduler([
+            make_task("delete", {}, needs=["modify"]),
+            make_task("other", {}),
+            make_task("create", {}),
+            make_task("modify", {}, needs=["create"]),
+        ])
+        self.assertEqual(scheduler.lock_groups(), [[0, 2, 3], [1]])
+
+
+if __name__ == "__main__":
+    unittest.main()